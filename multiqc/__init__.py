@@ -7,8 +7,10 @@ Makes the following available under the main multiqc namespace:
 - __version__
 """
 
+import importlib
 import sys
 import warnings
+from typing import TYPE_CHECKING, Any, List
 
 warnings.filterwarnings("ignore", category=SyntaxWarning)
 
@@ -21,32 +23,72 @@ if sys.version_info < tuple(map(int, OLDEST_SUPPORTED_PYTHON_VERSION.split("."))
         "things will break.".format(sys.version_info, OLDEST_SUPPORTED_PYTHON_VERSION)
     )
 
-# Load config and report before anything else:
-from multiqc import (  # noqa: E402
-    config,
-    report,
-)
-from multiqc.base_module import BaseMultiqcModule  # noqa: E402
-from multiqc.interactive import (  # noqa: E402
-    ClConfig,
-    add_custom_content_section,
-    get_general_stats_data,
-    get_module_data,
-    get_plot,
-    list_data_sources,
-    list_modules,
-    list_plots,
-    list_samples,
-    load_config,
-    parse_logs,
-    reset,
-    write_report,
-)
-from multiqc.multiqc import run  # noqa: E402
-from multiqc.plots.plot import PConfig, Plot  # noqa: E402
+# Load config before anything else. The rest of the API is imported on first use, so that
+# the command line and `import multiqc` don't pay for loading plotting libraries and modules:
+from multiqc import config  # noqa: E402
+
+if TYPE_CHECKING:
+    from multiqc import report
+    from multiqc.base_module import BaseMultiqcModule
+    from multiqc.interactive import (
+        ClConfig,
+        add_custom_content_section,
+        get_general_stats_data,
+        get_module_data,
+        get_plot,
+        list_data_sources,
+        list_modules,
+        list_plots,
+        list_samples,
+        load_config,
+        parse_logs,
+        reset,
+        write_report,
+    )
+    from multiqc.multiqc import run
+    from multiqc.plots.plot import PConfig, Plot
 
 __version__ = config.version
 
+# Module that defines each lazily imported name
+_LAZY_IMPORTS = {
+    "report": "multiqc",
+    "BaseMultiqcModule": "multiqc.base_module",
+    "ClConfig": "multiqc.interactive",
+    "add_custom_content_section": "multiqc.interactive",
+    "get_general_stats_data": "multiqc.interactive",
+    "get_module_data": "multiqc.interactive",
+    "get_plot": "multiqc.interactive",
+    "list_data_sources": "multiqc.interactive",
+    "list_modules": "multiqc.interactive",
+    "list_plots": "multiqc.interactive",
+    "list_samples": "multiqc.interactive",
+    "load_config": "multiqc.interactive",
+    "parse_logs": "multiqc.interactive",
+    "reset": "multiqc.interactive",
+    "write_report": "multiqc.interactive",
+    "run": "multiqc.multiqc",
+    "PConfig": "multiqc.plots.plot",
+    "Plot": "multiqc.plots.plot",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name = _LAZY_IMPORTS[name]
+    if module_name == __name__:  # submodule
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
 __all__ = [
     "run",
     "config",
@@ -353,6 +353,13 @@ class BaseMultiqcModule:
                         with io.open(os.path.join(f["root"], f["fn"]), "rb") as fh:
                             # always return file handles
                             yield {**f, "s_name": s_name, "f": fh}
+                    elif (
+                        filecontents
+                        and not filehandles
+                        and (contents := report.file_contents_cache.get(os.path.join(f["root"], f["fn"]))) is not None
+                    ):
+                        # The whole file was already read during the file search
+                        yield {**f, "s_name": s_name, "f": contents}
                     else:
                         # Everything else - should be all text files
                         with io.open(os.path.join(f["root"], f["fn"]), "r", encoding="utf-8") as fh:
@@ -3,7 +3,8 @@ MultiQC config module. Holds a single copy of config variables to be used
 across all other modules.
 
 On import, only loads defaults from config_defaults.yaml. To populate from
-custom parameters, call load_user_config() from the user_config module
+custom parameters, call load_user_config() from the user_config module. The
+search patterns in `sp` are loaded from search_patterns.yaml on first use.
 """
 
 import itertools
@@ -12,18 +13,18 @@ import os
 import subprocess
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional, Set, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Set, Tuple, Union
 
 import importlib_metadata
 import yaml
 from importlib_metadata import EntryPoint
-from jsonschema import validate as validate_json_schema
 
-from multiqc.types import Anchor, ModuleId, SectionId
 from multiqc.utils import pyaml_env
-from multiqc.utils.config_schema import config_to_schema
 from multiqc.utils.util_functions import strtobool, update_dict
 
+if TYPE_CHECKING:
+    from multiqc.types import Anchor, ModuleId, SectionId
+
 # Default logger will be replaced by caller
 logger = logging.getLogger(__name__)
 
@@ -103,11 +104,14 @@ version_check_url: str
 
 make_data_dir: bool
 zip_data_dir: bool
+data_tmp_dir_in_output: bool
 data_dump_file: bool
 data_dump_file_write_raw: Optional[bool]
 megaqc_url: str
 megaqc_access_token: Optional[str]
 megaqc_timeout: float
+megaqc_retries: int
+megaqc_chunk_size: int
 export_plots: bool
 make_report: bool
 make_pdf: bool
@@ -137,10 +141,13 @@ plots_force_flat: bool
 plots_export_font_scale: float
 plots_force_interactive: bool
 plots_flat_numseries: int
+plots_webgl_numpoints: int
+plots_webgl_flat_numseries: int
 plots_defer_loading_numseries: int
 plot_theme: Optional[str]
 num_datasets_plot_limit: int  # DEPRECATED in favour of plots_number_of_series_to_defer_loading
 lineplot_number_of_points_to_hide_markers: int
+lineplot_smooth_method: Literal["first", "minmax", "lttb"]
 barplot_legend_on_bottom: bool
 boxplot_boxpoints: Union[str, bool, None]
 box_min_threshold_outliers: int
@@ -151,6 +158,7 @@ violin_min_threshold_no_points: int
 
 collapse_tables: bool
 max_table_rows: int
+table_virtual_scroll_rows: int
 max_configurable_table_columns: int
 general_stats_columns: Dict[str, Dict]
 table_columns_visible: Dict[str, Union[bool, Dict[str, bool]]]
@@ -200,6 +208,13 @@ versions_table_group_header: str
 data_format_extensions: Dict[str, str]
 export_plot_formats: List[str]
 filesearch_file_shared: List[str]
+filesearch_workers: int
+filesearch_executor: Literal["thread", "process"]
+filesearch_cache: bool
+filesearch_cache_dir: Optional[str]
+filesearch_contents_cache_size: int
+module_workers: int
+data_write_workers: int
 custom_content: Dict
 fn_clean_sample_names: bool
 use_filename_as_sample_name: Union[bool, List[str]]
@@ -211,8 +226,8 @@ module_order: List[Union[str, Dict[str, Dict[str, Union[str, List[str]]]]]]
 preserve_module_raw_data: Optional[bool]
 table_sample_merge: Dict[str, List[CleanPatternT]]
 
-# Module filename search patterns
-sp: Dict = {}
+# Module filename search patterns, loaded on first use
+sp: Dict
 
 # Other defaults that can't be set in YAML
 modules_dir: str
@@ -229,7 +244,8 @@ data_dir: Optional[str]
 plots_dir: Optional[str]
 custom_data: Dict
 report_section_order: Dict[
-    Union[SectionId, ModuleId, Anchor], Union[str, Dict[str, int], Dict[str, Union[SectionId, ModuleId, Anchor]]]
+    "Union[SectionId, ModuleId, Anchor]",
+    "Union[str, Dict[str, int], Dict[str, Union[SectionId, ModuleId, Anchor]]]",
 ]
 output_fn: Optional[str]
 filename: Optional[str]
@@ -239,24 +255,46 @@ avail_modules: Dict[str, EntryPoint]
 avail_templates: Dict[str, EntryPoint]
 
 export_plots_timeout: int
+export_plots_workers: int
+export_plots_cache: bool
+export_plots_cache_dir: Optional[str]
+export_plots_cache_size: int
 
 parquet_format: Literal["long", "wide"]
 
 
+# The C YAML parser is many times faster than the pure Python one, if PyYAML was built with it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _search_patterns() -> Dict:
+    """
+    Module filename search patterns, loaded from search_patterns.yaml on first use
+    """
+    if "sp" not in globals():
+        with (Path(MODULE_DIR) / "search_patterns.yaml").open() as f:
+            globals()["sp"] = yaml.load(f, Loader=_YamlLoader)
+    return globals()["sp"]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "sp":
+        return _search_patterns()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def load_defaults():
     """
     Load config from defaults. Happens before even logger is created
     """
     config_defaults_path = MODULE_DIR / "config_defaults.yaml"
     with config_defaults_path.open() as f:
-        _default_config = yaml.safe_load(f)
+        _default_config = yaml.load(f, Loader=_YamlLoader)
     for c, v in _default_config.items():
         globals()[c] = v
 
-    # Module filename search patterns
-    with (Path(MODULE_DIR) / "search_patterns.yaml").open() as f:
-        global sp
-        sp = yaml.safe_load(f)
+    # Module filename search patterns are loaded again on first use
+    globals().pop("sp", None)
 
     # Other defaults that can't be set in defaults YAML
     global modules_dir, working_dir, analysis_dir, output_dir, megaqc_access_token, kwargs
@@ -416,6 +454,10 @@ def load_config_file(
             if validate_schema:
                 try:
                     # Validate against JSON schema
+                    from jsonschema import validate as validate_json_schema
+
+                    from multiqc.utils.config_schema import config_to_schema
+
                     schema = config_to_schema()
                     validate_json_schema(instance=new_config, schema=schema)
                 except Exception as e:
@@ -511,7 +553,7 @@ def _add_config(conf: Dict, conf_path=None):
             # Merge filename patterns instead of replacing. Add custom pattern to the beginning,
             # so they supersede the default patterns.
             global sp
-            sp = update_dict(sp, v, add_in_the_beginning=True)
+            sp = update_dict(_search_patterns(), v, add_in_the_beginning=True)
             log_filename_patterns.append(v)
         elif c == "extra_fn_clean_exts":
             log_filename_clean_extensions.append(v)
@@ -656,6 +698,8 @@ nondefault_config: Dict = {}
 
 
 def update(u: Dict[str, Any]):
+    if "sp" in u:
+        _search_patterns()
     update_dict(nondefault_config, u)
     return update_dict(globals(), u)
 
@@ -0,0 +1,77 @@
+"""
+Write data files in background threads, so that writing them to disk overlaps with running the next modules.
+
+The file contents are serialized by the caller: modules keep changing the data they pass to
+`report.write_data_file()`, so only the bytes that are ready to be written are handed over to the threads.
+"""
+
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from multiqc import config
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_pending: List[Tuple[Path, Future]] = []
+
+
+def _reset_if_forked() -> None:
+    """
+    A forked module worker process inherits the executor state, but not its threads
+    """
+    global _executor, _executor_pid, _pending
+    if _executor_pid is not None and _executor_pid != os.getpid():
+        _executor = None
+        _executor_pid = None
+        _pending = []
+
+
+def submit(write: Callable[[Path], None], path: Path) -> None:
+    """
+    Call `write(path)` in a background thread, or straight away with `config.data_write_workers` set to 0
+    """
+    global _executor, _executor_pid
+    if config.data_write_workers <= 0:
+        write(path)
+        return
+
+    _reset_if_forked()
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=config.data_write_workers, thread_name_prefix="data_file_writer")
+        _executor_pid = os.getpid()
+    _pending.append((path, _executor.submit(write, path)))
+
+
+def wait() -> None:
+    """
+    Wait for all submitted data files to be written. Errors are logged rather than raised,
+    same as for other auxiliary files that couldn't be written.
+    """
+    global _pending
+    _reset_if_forked()
+    pending, _pending = _pending, []
+    for path, future in pending:
+        try:
+            future.result()
+        except Exception as e:
+            if config.development:
+                raise
+            logger.error(f"Couldn't write data file {path.name}: {e}")
+
+
+def shutdown() -> None:
+    """
+    Wait for the data files to be written and stop the threads, e.g. before forking worker processes.
+    The threads are started again with the next submitted file.
+    """
+    global _executor, _executor_pid
+    wait()
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+        _executor_pid = None
@@ -1,19 +1,33 @@
+import contextlib
+import dataclasses
+import importlib
+import io
 import logging
+import marshal
+import multiprocessing
+import pickle
+import shutil
 import sys
+import tempfile
 import time
 import traceback
 import tracemalloc
-from typing import Callable, Dict, List, Union
+import types
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 
+import polars as pl
 import rich
 from importlib_metadata import EntryPoint
 from rich.syntax import Syntax
 
 from multiqc import config, report
 from multiqc.base_module import BaseMultiqcModule, ModuleNoSamplesFound
-from multiqc.core import plugin_hooks, software_versions
+from multiqc.core import data_file_writer, plot_data_store, plugin_hooks, software_versions, tmp_dir
 from multiqc.core.exceptions import NoAnalysisFound, RunError
-from multiqc.types import Anchor
+from multiqc.types import Anchor, SampleName
 from multiqc.core.special_case_modules.load_multiqc_data import LoadMultiqcData
 
 logger = logging.getLogger(__name__)
@@ -63,129 +77,134 @@ def exec_modules(mod_dicts_in_order: List[Dict[str, Dict]]) -> None:
     sys_exit_code = 0
     total_mods_starttime = time.time()
 
-    for mod_idx, mod_dict in enumerate(mod_dicts_in_order):
-        mod_starttime = time.time()
-        if config.profile_memory:
-            tracemalloc.start()
-
-        this_module: str = list(mod_dict.keys())[0]
-        logger.debug(f"Running module: {this_module}")
-        mod_cust_config = list(mod_dict.values())[0] or {}
-        # noinspection PyBroadException
-        try:
-            entry_point: EntryPoint = config.avail_modules[this_module]
-            module_initializer: Callable[[], Union[BaseMultiqcModule, List[BaseMultiqcModule]]] = entry_point.load()
-            setattr(module_initializer, "mod_cust_config", mod_cust_config)
-            setattr(module_initializer, "mod_id", this_module)
-
-            # *********************************************
-            # RUN MODULE. Heavy part. Run module logic to parse logs and prepare plot data.
-            these_modules: Union[BaseMultiqcModule, List[BaseMultiqcModule]] = module_initializer()
-            # END RUN MODULE
-            # *********************************************
-
-            # Single module initializer can create multiple module objects (see custom_content)
-            if not isinstance(these_modules, list):
-                these_modules = [these_modules]
-
-            # Clean up non-base attribute to save memory.
-            trace_memory("before cleaning up attributes")
-            for module in these_modules:
-                module.clean_child_attributes()
-            trace_memory("after cleaning up attributes")
-
-            # Override duplicated outputs
-            for prev_mod in report.modules:
-                for new_mod in these_modules:
-                    if prev_mod.anchor == new_mod.anchor:
-                        new_mod.merge(prev_mod)
-                        logger.info(f'Updating module "{prev_mod.name}"')
-                        report.modules.remove(prev_mod)
-            report.modules.extend(these_modules)
-
-        except ModuleNoSamplesFound:
-            logger.debug(f"No samples found: {this_module}")
-
-        except UserWarning:  # UserWarning deprecated from 1.16
-            msg = f"DEPRECIATED: Please raise 'ModuleNoSamplesFound' instead of 'UserWarning' in module: {this_module}"
-            if config.strict:
-                logger.error(msg)
-                report.lint_errors.append(msg)
-            else:
-                logger.debug(msg)
-            logger.debug(f"No samples found: {this_module}")
-
-        except KeyboardInterrupt:
-            raise
-
-        except:  # noqa: E722
-            if config.strict:
-                # Crash quickly in the strict mode. This can be helpful for interactive debugging of modules.
+    with _start_module_workers(mod_dicts_in_order) as worker_futures:
+        for mod_idx, mod_dict in enumerate(mod_dicts_in_order):
+            mod_starttime = time.time()
+            if config.profile_memory:
+                tracemalloc.start()
+
+            this_module: str = list(mod_dict.keys())[0]
+            logger.debug(f"Running module: {this_module}")
+            mod_cust_config = list(mod_dict.values())[0] or {}
+            worker_runtime: Optional[float] = None
+            # noinspection PyBroadException
+            try:
+                these_modules: Optional[List[BaseMultiqcModule]] = None
+                if worker_futures:
+                    # Merge the outputs of the module that ran in a worker process. None if it has to run here instead
+                    these_modules, worker_runtime = _collect_module_worker_result(this_module, worker_futures[mod_idx])
+
+                if these_modules is None:
+                    # *********************************************
+                    # RUN MODULE. Heavy part. Run module logic to parse logs and prepare plot data.
+                    these_modules = run_module(this_module, mod_cust_config)
+                    # END RUN MODULE
+                    # *********************************************
+
+                    # Clean up non-base attribute to save memory.
+                    trace_memory("before cleaning up attributes")
+                    for module in these_modules:
+                        module.clean_child_attributes()
+                    trace_memory("after cleaning up attributes")
+
+                # Override duplicated outputs
+                for prev_mod in report.modules:
+                    for new_mod in these_modules:
+                        if prev_mod.anchor == new_mod.anchor:
+                            new_mod.merge(prev_mod)
+                            logger.info(f'Updating module "{prev_mod.name}"')
+                            report.modules.remove(prev_mod)
+                report.modules.extend(these_modules)
+
+            except ModuleNoSamplesFound:
+                logger.debug(f"No samples found: {this_module}")
+
+            except UserWarning:  # UserWarning deprecated from 1.16
+                msg = f"DEPRECIATED: Please raise 'ModuleNoSamplesFound' instead of 'UserWarning' in module: {this_module}"
+                if config.strict:
+                    logger.error(msg)
+                    report.lint_errors.append(msg)
+                else:
+                    logger.debug(msg)
+                logger.debug(f"No samples found: {this_module}")
+
+            except KeyboardInterrupt:
                 raise
 
-            # Flag the error, but carry on
-            class CustomTraceback:
-                type, value, traceback = sys.exc_info()
-
-                def __rich_console__(self, console: rich.console.Console, options: rich.console.ConsoleOptions):
-                    issue_url = (
-                        f"https://github.com/MultiQC/MultiQC/issues/new?template=bug_report.md&title="
-                        f"{this_module}%20module%20-%20{type.__name__}"
-                    )
-                    err_msg = (
-                        f"Please copy this log and report it at [bright_blue][link={issue_url}]"
-                        f"https://github.com/MultiQC/MultiQC/issues[/link][/] \n"
-                        f"[bold underline]Please attach a file that triggers the error.[/] "
+            except:  # noqa: E722
+                if config.strict:
+                    # Crash quickly in the strict mode. This can be helpful for interactive debugging of modules.
+                    raise
+
+                # Flag the error, but carry on
+                class CustomTraceback:
+                    type, value, traceback = sys.exc_info()
+
+                    def __rich_console__(self, console: rich.console.Console, options: rich.console.ConsoleOptions):
+                        issue_url = (
+                            f"https://github.com/MultiQC/MultiQC/issues/new?template=bug_report.md&title="
+                            f"{this_module}%20module%20-%20{type.__name__}"
+                        )
+                        err_msg = (
+                            f"Please copy this log and report it at [bright_blue][link={issue_url}]"
+                            f"https://github.com/MultiQC/MultiQC/issues[/link][/] \n"
+                            f"[bold underline]Please attach a file that triggers the error.[/] "
+                        )
+                        if report.last_found_file:
+                            err_msg += f"The last file found was: [green]{report.last_found_file}[/]\n"
+
+                        yield err_msg
+                        yield Syntax(traceback.format_exc(), "python")
+
+                    def __rich_measure__(self, console: rich.console.Console, options: rich.console.ConsoleOptions):
+                        tb_width = max([len(line) for line in traceback.format_exc().split("\n")])
+                        log_width = 71
+                        if report.last_found_file:
+                            log_width += len(report.last_found_file)
+                        panel_width = max(tb_width, log_width)
+                        return rich.console.Measurement(panel_width, panel_width)
+
+                from multiqc.core.log_and_rich import rich_console_print
+
+                rich_console_print(
+                    rich.panel.Panel(
+                        CustomTraceback(),
+                        title=f"Oops! The '[underline]{this_module}[/]' MultiQC module broke...",
+                        expand=False,
+                        border_style="red",
+                        style="on #272822",
                     )
-                    if report.last_found_file:
-                        err_msg += f"The last file found was: [green]{report.last_found_file}[/]\n"
-
-                    yield err_msg
-                    yield Syntax(traceback.format_exc(), "python")
-
-                def __rich_measure__(self, console: rich.console.Console, options: rich.console.ConsoleOptions):
-                    tb_width = max([len(line) for line in traceback.format_exc().split("\n")])
-                    log_width = 71
-                    if report.last_found_file:
-                        log_width += len(report.last_found_file)
-                    panel_width = max(tb_width, log_width)
-                    return rich.console.Measurement(panel_width, panel_width)
-
-            from multiqc.core.log_and_rich import rich_console_print
-
-            rich_console_print(
-                rich.panel.Panel(
-                    CustomTraceback(),
-                    title=f"Oops! The '[underline]{this_module}[/]' MultiQC module broke...",
-                    expand=False,
-                    border_style="red",
-                    style="on #272822",
                 )
+                # Still log.debug this so that it ends up in the log file - above is just stderr for now
+                logger.debug(
+                    f"Oops! The '{this_module}' MultiQC module broke...\n"
+                    + ("=" * 80)
+                    + "\n"
+                    + traceback.format_exc()
+                    + ("=" * 80)
+                )
+                # Exit code 1 for CI failures etc
+                sys_exit_code = 1
+
+            report.runtimes.mods[mod_names[mod_idx]] = (
+                worker_runtime if worker_runtime is not None else time.time() - mod_starttime
             )
-            # Still log.debug this so that it ends up in the log file - above is just stderr for now
-            logger.debug(
-                f"Oops! The '{this_module}' MultiQC module broke...\n"
-                + ("=" * 80)
-                + "\n"
-                + traceback.format_exc()
-                + ("=" * 80)
-            )
-            # Exit code 1 for CI failures etc
-            sys_exit_code = 1
-
-        report.runtimes.mods[mod_names[mod_idx]] = time.time() - mod_starttime
-        if config.profile_memory:
-            mem_current, mem_peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            report.peak_memory_bytes_per_module[mod_names[mod_idx]] = mem_peak
-            report.diff_memory_bytes_per_module[mod_names[mod_idx]] = mem_current
-            logger.warning(
-                f"{this_module}: memory change: {mem_current:,d}b, peak during module execution: {mem_peak:,d}b"
-            )
-        if config.profile_runtime:
-            logger.warning(f"{this_module}: module run time: {report.runtimes.mods[mod_names[mod_idx]]:.2f}s")
+            if config.profile_memory:
+                mem_current, mem_peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                report.peak_memory_bytes_per_module[mod_names[mod_idx]] = mem_peak
+                report.diff_memory_bytes_per_module[mod_names[mod_idx]] = mem_current
+                logger.warning(
+                    f"{this_module}: memory change: {mem_current:,d}b, peak during module execution: {mem_peak:,d}b"
+                )
+            if config.profile_runtime:
+                logger.warning(f"{this_module}: module run time: {report.runtimes.mods[mod_names[mod_idx]]:.2f}s")
 
     report.runtimes.total_mods = time.time() - total_mods_starttime
+    # The data directory is complete once the modules have run, e.g. for plugins and interactive use
+    data_file_writer.wait()
+    # Contents of the files read during the search are not needed anymore
+    report.file_contents_cache.clear()
 
     # Again, if config.require_logs is set, check if for all explicitly requested
     # modules samples were found.
@@ -202,6 +221,251 @@ def exec_modules(mod_dicts_in_order: List[Dict[str, Dict]]) -> None:
     plugin_hooks.mqc_trigger("after_modules")
 
 
+def run_module(this_module: str, mod_cust_config: Dict) -> List[BaseMultiqcModule]:
+    """
+    Load a module by its ID and run it on the found files
+    """
+    entry_point: EntryPoint = config.avail_modules[this_module]
+    module_initializer: Callable[[], Union[BaseMultiqcModule, List[BaseMultiqcModule]]] = entry_point.load()
+    setattr(module_initializer, "mod_cust_config", mod_cust_config)
+    setattr(module_initializer, "mod_id", this_module)
+
+    these_modules: Union[BaseMultiqcModule, List[BaseMultiqcModule]] = module_initializer()
+
+    # Single module initializer can create multiple module objects (see custom_content)
+    if not isinstance(these_modules, list):
+        these_modules = [these_modules]
+    return these_modules
+
+
+@dataclasses.dataclass
+class ModuleWorkerResult:
+    """
+    Everything a module run in a worker process added to the report, to be merged by the main process
+    in the module order. Modules only add new keys to the report globals, so the outputs of the modules
+    running in parallel don't overlap unless they clash on the same names.
+    """
+
+    runtime: float
+    modules: Optional[List[BaseMultiqcModule]]
+    # ModuleNoSamplesFound or UserWarning raised by the module
+    exception: Optional[Exception]
+    tmp_dir: Path
+    html_ids_by_scope: Dict[Optional[str], Set[Anchor]]
+    general_stats_data: Dict[Any, Any]
+    general_stats_headers: Dict[Any, Any]
+    data_sources: Dict[str, Dict[str, Dict[str, Any]]]
+    software_versions: Dict[str, Dict[str, List[str]]]
+    saved_raw_data_keys: List[str]
+    saved_raw_data: Dict[str, Any]
+    plot_by_id: Dict[Anchor, Any]
+    sample_names: List[SampleName]
+    lint_errors: List[str]
+    last_found_file: Optional[str]
+    plot_frames: List[pl.DataFrame]
+    table_rows_df: Optional[pl.DataFrame]
+
+
+def _rebuild_function(code: bytes, module: str, name: str, defaults: Optional[Tuple], cells: Optional[Tuple]):
+    fn_globals = importlib.import_module(module).__dict__
+    closure = tuple(types.CellType(value) for value in cells) if cells is not None else None
+    return types.FunctionType(marshal.loads(code), fn_globals, name, defaults, closure)
+
+
+class _ModuleOutputPickler(pickle.Pickler):
+    """
+    Also pickles lambdas and local functions, that modules keep in their outputs, e.g. as the
+    `modify` functions of table columns. The functions are pickled by value, so they can
+    only be unpickled by the same interpreter, i.e. in the main process.
+    """
+
+    def reducer_override(self, obj):
+        if isinstance(obj, types.FunctionType) and "<" in obj.__qualname__:
+            cells = tuple(cell.cell_contents for cell in obj.__closure__) if obj.__closure__ is not None else None
+            return _rebuild_function, (
+                marshal.dumps(obj.__code__),
+                obj.__module__,
+                obj.__name__,
+                obj.__defaults__,
+                cells,
+            )
+        return NotImplemented
+
+
+@contextlib.contextmanager
+def _start_module_workers(mod_dicts_in_order: List[Dict[str, Dict]]) -> Iterator[Optional[List[Future]]]:
+    """
+    With `config.module_workers > 1`, start running all modules in a pool of forked processes, and yield
+    the futures of their pickled results in the module order. Yields None when the modules run serially.
+    """
+    n_workers = min(config.module_workers, len(mod_dicts_in_order))
+    if n_workers <= 1:
+        yield None
+        return
+    if config.profile_memory:
+        logger.debug("Running modules serially to profile their memory usage")
+        yield None
+        return
+    if "fork" not in multiprocessing.get_all_start_methods():
+        logger.warning("Running modules in parallel is not supported on this platform, running them serially")
+        yield None
+        return
+
+    logger.debug(f"Running modules using {n_workers} worker processes")
+    # Workers are forked, so they start with the found files and the report state as of now
+    parent_tmp_dir = tmp_dir.get_tmp_dir()
+    data_file_writer.shutdown()
+    executor = ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("fork"))
+    futures = [
+        executor.submit(
+            _run_module_in_worker, list(mod_dict.keys())[0], list(mod_dict.values())[0] or {}, parent_tmp_dir
+        )
+        for mod_dict in mod_dicts_in_order
+    ]
+    try:
+        yield futures
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _run_module_in_worker(this_module: str, mod_cust_config: Dict, parent_tmp_dir: Path) -> Optional[bytes]:
+    """
+    Run a module in a worker process and return its pickled `ModuleWorkerResult`. Returns None if the
+    module failed or its result can't be pickled, in which case it's run again in the main process.
+    """
+    # Data files are written to a separate directory, and moved to the report data directory on merge
+    module_tmp_dir = Path(tempfile.mkdtemp(prefix="module_", dir=parent_tmp_dir))
+    tmp_dir.set_tmp_dir(module_tmp_dir)
+
+    # The worker process is reused for several modules, so keep track of what's added by this one
+    html_ids_before = {scope: set(ids) for scope, ids in report.html_ids_by_scope.items()}
+    general_stats_before = set(report.general_stats_data)
+    saved_raw_data_keys_before = set(report.saved_raw_data_keys)
+    saved_raw_data_before = set(report.saved_raw_data)
+    plots_before = set(report.plot_by_id)
+    num_sample_names = len(report.sample_names)
+    num_lint_errors = len(report.lint_errors)
+    report.data_sources = defaultdict(lambda: defaultdict(lambda: defaultdict()))
+    report.software_versions = defaultdict(lambda: defaultdict(list))
+    plot_data_store.take_buffered()
+
+    starttime = time.time()
+    modules: Optional[List[BaseMultiqcModule]] = None
+    exception: Optional[Exception] = None
+    try:
+        modules = run_module(this_module, mod_cust_config)
+        for module in modules:
+            module.clean_child_attributes()
+    except (ModuleNoSamplesFound, UserWarning) as e:
+        exception = e
+    except Exception:
+        logger.debug(f"{this_module}: failed in a worker process, will run it again serially")
+        data_file_writer.shutdown()
+        shutil.rmtree(module_tmp_dir, ignore_errors=True)
+        return None
+
+    # The data files are moved from the module tmp dir by the main process
+    data_file_writer.shutdown()
+    plot_frames, table_rows_df = plot_data_store.take_buffered()
+    result = ModuleWorkerResult(
+        runtime=time.time() - starttime,
+        modules=modules,
+        exception=exception,
+        tmp_dir=module_tmp_dir,
+        html_ids_by_scope={
+            scope: new_ids
+            for scope, ids in report.html_ids_by_scope.items()
+            if (new_ids := ids - html_ids_before.get(scope, set()))
+        },
+        general_stats_data={k: v for k, v in report.general_stats_data.items() if k not in general_stats_before},
+        general_stats_headers={k: v for k, v in report.general_stats_headers.items() if k not in general_stats_before},
+        data_sources={
+            mod: {section: dict(sources) for section, sources in sections.items()}
+            for mod, sections in report.data_sources.items()
+        },
+        software_versions={group: dict(versions) for group, versions in report.software_versions.items()},
+        saved_raw_data_keys=[k for k in report.saved_raw_data_keys if k not in saved_raw_data_keys_before],
+        saved_raw_data={k: v for k, v in report.saved_raw_data.items() if k not in saved_raw_data_before},
+        plot_by_id={k: v for k, v in report.plot_by_id.items() if k not in plots_before},
+        sample_names=report.sample_names[num_sample_names:],
+        lint_errors=report.lint_errors[num_lint_errors:],
+        last_found_file=report.last_found_file,
+        plot_frames=plot_frames,
+        table_rows_df=table_rows_df,
+    )
+    try:
+        buffer = io.BytesIO()
+        _ModuleOutputPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(result)
+        return buffer.getvalue()
+    except Exception as e:
+        logger.debug(f"{this_module}: could not pickle the module outputs, will run it again serially: {e}")
+        shutil.rmtree(module_tmp_dir, ignore_errors=True)
+        return None
+
+
+def _collect_module_worker_result(
+    this_module: str, future: Future
+) -> Tuple[Optional[List[BaseMultiqcModule]], Optional[float]]:
+    """
+    Wait for a module run in a worker process and merge its outputs into the report. Re-raises
+    ModuleNoSamplesFound and UserWarning raised by the module. Returns None for the modules if the
+    module has to run again in the main process: if it failed, or if its outputs clash with the
+    outputs of the previous modules, which are suffixed to be unique when the modules run serially.
+    """
+    try:
+        pickled = future.result()
+        result: Optional[ModuleWorkerResult] = pickle.loads(pickled) if pickled is not None else None
+    except Exception as e:
+        logger.debug(f"{this_module}: worker process failed, running the module serially: {e}")
+        return None, None
+    if result is None:
+        return None, None
+
+    clashes = (
+        any(ids & report.html_ids_by_scope.get(scope, set()) for scope, ids in result.html_ids_by_scope.items())
+        or any(k in report.general_stats_data for k in result.general_stats_data)
+        or any(k in report.saved_raw_data_keys for k in result.saved_raw_data_keys)
+        or any(k in report.plot_by_id for k in result.plot_by_id)
+    )
+    if clashes:
+        logger.debug(f"{this_module}: outputs clash with the previous modules, running the module serially")
+        shutil.rmtree(result.tmp_dir, ignore_errors=True)
+        return None, None
+
+    for scope, ids in result.html_ids_by_scope.items():
+        report.html_ids_by_scope[scope].update(ids)
+    report.general_stats_data.update(result.general_stats_data)
+    report.general_stats_headers.update(result.general_stats_headers)
+    for mod, sections in result.data_sources.items():
+        for section, sources in sections.items():
+            report.data_sources[mod][section].update(sources)
+    for group, versions in result.software_versions.items():
+        report.software_versions[group].update(versions)
+    for fn in result.saved_raw_data_keys:
+        report.saved_raw_data_keys[fn] = None
+    report.saved_raw_data.update(result.saved_raw_data)
+    report.plot_by_id.update(result.plot_by_id)
+    report.sample_names.extend(result.sample_names)
+    report.lint_errors.extend(result.lint_errors)
+    if result.last_found_file is not None:
+        report.last_found_file = result.last_found_file
+    plot_data_store.add_buffered(result.plot_frames, result.table_rows_df)
+
+    # Move the data files written by the module to the report data directory
+    module_data_dir = result.tmp_dir / "multiqc_data"
+    if module_data_dir.exists():
+        data_dir = tmp_dir.data_tmp_dir()
+        for path in module_data_dir.iterdir():
+            shutil.move(str(path), str(data_dir / path.name))
+    shutil.rmtree(result.tmp_dir, ignore_errors=True)
+
+    if result.exception is not None:
+        raise result.exception
+    return result.modules, result.runtime
+
+
 def required_logs_found(modules_with_logs):
     if config.require_logs:
         required_modules_with_no_logs = [
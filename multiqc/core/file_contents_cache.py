@@ -0,0 +1,50 @@
+"""
+Bounded in-memory cache of the contents of files read to the end during the file search,
+so that `BaseMultiqcModule.find_log_files()` doesn't have to open and read them again.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FileContentsCache:
+    """
+    Least-recently-used cache of file contents keyed by path, holding at most `max_size` characters.
+    """
+
+    def __init__(self, max_size: int = 0):
+        self.max_size = max_size
+        self.size = 0
+        self._contents: "OrderedDict[str, str]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def put(self, path: str, contents: str):
+        """
+        Add the contents of a file, evicting the least recently used files to stay within `max_size`.
+        Files larger than the whole budget are not kept.
+        """
+        if len(contents) > self.max_size:
+            return
+        old = self._contents.pop(path, None)
+        if old is not None:
+            self.size -= len(old)
+        self._contents[path] = contents
+        self.size += len(contents)
+        while self.size > self.max_size:
+            _, evicted = self._contents.popitem(last=False)
+            self.size -= len(evicted)
+
+    def get(self, path: str) -> Optional[str]:
+        contents = self._contents.get(path)
+        if contents is not None:
+            self._contents.move_to_end(path)
+        return contents
+
+    def clear(self):
+        self._contents.clear()
+        self.size = 0
@@ -0,0 +1,172 @@
+"""
+On-disk cache of exported plot images, so that re-running MultiQC doesn't render the plots that
+didn't change through Kaleido again.
+
+Images are stored as files named after a hash of everything that affects the rendered image: the
+figure JSON, the `write_image()` arguments, the image format, the logo added on embedded images,
+and the MultiQC, Plotly and Kaleido versions. The least recently used images are removed when the
+cache grows over `config.export_plots_cache_size`.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import plotly  # type: ignore
+import plotly.graph_objects as go  # type: ignore
+from plotly.utils import PlotlyJSONEncoder  # type: ignore
+
+from multiqc import config
+
+logger = logging.getLogger(__name__)
+
+
+def cache_dir() -> Path:
+    """
+    Directory of the image cache, `config.export_plots_cache_dir` or `$XDG_CACHE_HOME/multiqc/plots`
+    """
+    if config.export_plots_cache_dir:
+        return Path(config.export_plots_cache_dir)
+    return Path(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))) / "multiqc" / "plots"
+
+
+def _renderer_versions() -> Dict[str, Optional[str]]:
+    try:
+        kaleido_version: Optional[str] = version("kaleido")
+    except PackageNotFoundError:
+        kaleido_version = None
+    return {"multiqc": config.version, "plotly": plotly.__version__, "kaleido": kaleido_version}
+
+
+def figure_hash(fig: go.Figure) -> str:
+    """
+    Stable hash of the figure JSON. Computed once per figure, and combined with the export
+    settings in `ImageCache.key()`.
+    """
+    fig_json = json.dumps(fig.to_plotly_json(), cls=PlotlyJSONEncoder, sort_keys=True)
+    return hashlib.sha256(fig_json.encode()).hexdigest()
+
+
+class ImageCache:
+    """
+    Exported images from previous runs. Look them up with `get()` using a `key()`, save newly
+    exported images with `put_file()` or `put_bytes()`, and call `close()` to evict old images.
+    """
+
+    def __init__(self, path: Path, max_size: int):
+        self.path = path
+        self.max_size = max_size
+        self._versions = _renderer_versions()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def open() -> Optional["ImageCache"]:
+        """
+        Open the cache directory, creating it if needed. Returns None if it can't be created,
+        in which case all plots are exported.
+        """
+        path = cache_dir()
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not open the plot image cache {path}, exporting all plots: {e}")
+            return None
+        return ImageCache(path, config.export_plots_cache_size * 1024 * 1024)
+
+    def key(self, fig_hash: str, write_kwargs: Dict, fmt: str, logo: Optional[Dict] = None) -> str:
+        state = {
+            "figure": fig_hash,
+            "write_kwargs": write_kwargs,
+            "format": fmt,
+            "logo": logo,
+            "versions": self._versions,
+        }
+        digest = hashlib.sha256(json.dumps(state, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{digest}.{fmt}"
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Path of the cached image, or None if it's not cached. Marks the image as recently used.
+        """
+        path = self.path / key
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def put_file(self, key: str, src: Path):
+        try:
+            with self._write(key) as fh, open(src, "rb") as src_fh:
+                shutil.copyfileobj(src_fh, fh)
+        except OSError as e:
+            logger.debug(f"Could not save {src} to the plot image cache: {e}")
+
+    def put_bytes(self, key: str, data: bytes):
+        try:
+            with self._write(key) as fh:
+                fh.write(data)
+        except OSError as e:
+            logger.debug(f"Could not save an image to the plot image cache: {e}")
+
+    @contextlib.contextmanager
+    def _write(self, key: str) -> Iterator[BinaryIO]:
+        """
+        Write to a temporary file renamed to the key, so that runs sharing the cache never read
+        a partially written image
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                yield fh
+            os.replace(tmp_path, self.path / key)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    def close(self):
+        """
+        Remove the least recently used images until the cache fits in the size limit
+        """
+        if self.hits or self.misses:
+            logger.debug(f"Plot image cache: {self.hits} images reused, {self.misses} exported")
+        entries: List[Tuple[float, int, Path]] = []
+        try:
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if entry.name.startswith(".tmp_") or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, Path(entry.path)))
+        except OSError as e:
+            logger.debug(f"Could not list the plot image cache {self.path}: {e}")
+            return
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total_size -= size
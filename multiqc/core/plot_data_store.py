@@ -2,18 +2,22 @@
 Module for handling plot data storage in a single parquet file.
 This replaces the individual plot parquet files with a single file that contains data from all plots.
 It also stores all report metadata (modules, data sources, configs) to make reports fully reproducible.
+
+Plot frames are buffered in memory as modules run, and the parquet file is written once
+by `write_parquet()` when the results are written, instead of re-reading and re-writing the
+whole compressed file on every plot save.
 """
 
 import json
 import logging
 import os
 from re import Pattern
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import polars as pl
 from pydantic import ValidationError  # type: ignore
 
-from multiqc import config, report
+from multiqc import config
 from multiqc.core import tmp_dir
 from multiqc.types import Anchor, ColumnKey
 from multiqc.utils.config_schema import MultiQCConfig
@@ -24,6 +28,12 @@ logger = logging.getLogger(__name__)
 _saved_anchors: Set[Anchor] = set()
 # Keep track of metric column names
 _metric_col_names: Set[ColumnKey] = set()
+# Plot data frames buffered in memory in the order they were saved
+_frames: List[pl.DataFrame] = []
+# Wide-format table rows, merged across tables into a single row per sample
+_table_rows_df: Optional[pl.DataFrame] = None
+# Report metadata row, replaced on each save so repeated write_report calls keep a single row
+_metadata_df: Optional[pl.DataFrame] = None
 
 
 def wide_table_to_parquet(table_df: pl.DataFrame, metric_col_names: Set[ColumnKey]) -> None:
@@ -36,13 +46,12 @@ def wide_table_to_parquet(table_df: pl.DataFrame, metric_col_names: Set[ColumnKe
 
     The resulting table must have single row per sample.
     """
+    global _table_rows_df
+
     # Fix creation date
     table_df = fix_creation_date(table_df)
 
-    existing_df = _read_or_create_df()
-
-    # Get all rows that are table_row
-    existing_table_rows = existing_df.filter(pl.col("type") == "table_row")
+    existing_table_rows = _table_rows_df if _table_rows_df is not None else _empty_df()
 
     # Merge existing and new tables, keeping one row per sample (defined by join_cols)
     if existing_table_rows.height > 0 and table_df.height > 0:
@@ -53,9 +62,7 @@ def wide_table_to_parquet(table_df: pl.DataFrame, metric_col_names: Set[ColumnKe
         # If one of the dataframes is empty, just use diagonal concat
         new_df = pl.concat([existing_table_rows, table_df], how="diagonal")
 
-    existing_other_rows_df = existing_df.filter(pl.col("type") != "table_row")
-    new_df = pl.concat([existing_other_rows_df, new_df], how="diagonal")
-    _write_parquet(new_df)
+    _table_rows_df = new_df
 
 
 def fix_creation_date(df: pl.DataFrame) -> pl.DataFrame:
@@ -70,12 +77,30 @@ def append_to_parquet(df: pl.DataFrame) -> None:
     """
     Save plot data to the parquet file.
 
-    This function adds/updates data for a specific plot in the file.
+    The frame is buffered in memory and written out with the rest of the data by `write_parquet()`.
+    """
+    _frames.append(fix_creation_date(df))
+
+
+def take_buffered() -> Tuple[List[pl.DataFrame], Optional[pl.DataFrame]]:
     """
-    df = fix_creation_date(df)
-    existing_df = _read_or_create_df()
-    df = pl.concat([existing_df, df], how="diagonal")
-    _write_parquet(df)
+    Take the plot frames and table rows buffered so far, leaving the buffers empty.
+    Used to hand over the data saved by modules that run in worker processes.
+    """
+    global _frames, _table_rows_df
+    frames, table_rows_df = _frames, _table_rows_df
+    _frames = []
+    _table_rows_df = None
+    return frames, table_rows_df
+
+
+def add_buffered(frames: List[pl.DataFrame], table_rows_df: Optional[pl.DataFrame]) -> None:
+    """
+    Add the plot frames and table rows taken with `take_buffered()` in a worker process.
+    """
+    _frames.extend(frames)
+    if table_rows_df is not None:
+        wide_table_to_parquet(table_rows_df, set())
 
 
 def get_report_metadata(df: pl.DataFrame) -> Optional[Dict[str, Any]]:
@@ -129,6 +154,9 @@ def save_report_metadata() -> None:
 
     This includes modules, data sources, creation date, config, and plot data.
     """
+    # Imported here as the report imports this module when it is reset
+    from multiqc import report
+
     # Prepare metadata row
     modules_data: List[Dict[str, Any]] = []
     for mod in report.modules:
@@ -199,10 +227,24 @@ def save_report_metadata() -> None:
         }
     )
 
-    append_to_parquet(metadata_df)
+    global _metadata_df
+    _metadata_df = fix_creation_date(metadata_df)
 
 
-def _write_parquet(df: pl.DataFrame) -> None:
+def write_parquet() -> None:
+    """
+    Write all buffered plot data, table rows and report metadata to the parquet file in one go.
+
+    Frames are concatenated diagonally, so the file has the same layout as if the rows
+    were appended one plot at a time.
+    """
+    frames = [_empty_df()] + _frames
+    if _table_rows_df is not None:
+        frames.append(_table_rows_df)
+    if _metadata_df is not None:
+        frames.append(_metadata_df)
+    df = pl.concat(frames, how="diagonal")
+
     parquet_file = tmp_dir.parquet_file()
     # Ensure directory exists
     os.makedirs(parquet_file.parent, exist_ok=True)
@@ -215,22 +257,7 @@ def _write_parquet(df: pl.DataFrame) -> None:
         raise
 
 
-def _read_or_create_df() -> pl.DataFrame:
-    parquet_file = tmp_dir.parquet_file()
-
-    # Update existing file or create new one
-    if parquet_file.exists():
-        try:
-            return pl.read_parquet(parquet_file)
-
-        except Exception as e:
-            logger.error(f"Error updating parquet file with metadata: {e}")
-            if config.strict:
-                raise e
-    else:
-        # Create directory if needed
-        os.makedirs(parquet_file.parent, exist_ok=True)
-
+def _empty_df() -> pl.DataFrame:
     return pl.DataFrame(
         {
             "anchor": [],
@@ -251,52 +278,16 @@ def _read_or_create_df() -> pl.DataFrame:
     )
 
 
-# def _update_parquet(df: pl.DataFrame, anchor: Anchor) -> None:
-#     """
-#     Update the parquet file with new data.
-
-#     This function handles both creating a new file and updating an existing one.
-#     """
-#     parquet_file = tmp_dir.parquet_file()
-
-#     # Check if file already exists
-#     if parquet_file.exists():
-#         try:
-#             # Read existing data
-#             existing_df = pl.read_parquet(parquet_file)
-
-#             # Remove any existing data for this anchor
-#             if "anchor" in existing_df.columns:
-#                 existing_df = existing_df.filter(pl.col("anchor") != str(anchor))
-
-#             # Append new data
-#             merged_df = pl.concat([existing_df, df], how="diagonal")
-#         except Exception as e:
-#             logger.error(f"Error reading existing parquet file: {e}")
-#             # If there was an error, just use the new data
-#             merged_df = df
-#     else:
-#         # Create new file with just this data
-#         merged_df = df
-
-#     # Ensure directory exists
-#     os.makedirs(parquet_file.parent, exist_ok=True)
-
-#     # Write to file
-#     try:
-#         merged_df.write_parquet(parquet_file, compression="gzip")
-#     except Exception as e:
-#         logger.error(f"Error writing parquet file: {e}")
-#         raise
-
-
 def reset():
     """
     Reset the module state.
     """
-    global _saved_anchors, _metric_col_names
+    global _saved_anchors, _metric_col_names, _frames, _table_rows_df, _metadata_df
     _saved_anchors = set()
     _metric_col_names = set()
+    _frames = []
+    _table_rows_df = None
+    _metadata_df = None
 
 
 def parse_value(value: Any, value_type: str) -> Any:
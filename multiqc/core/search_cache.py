@@ -0,0 +1,179 @@
+"""
+On-disk cache of file search results, so that re-running MultiQC over a growing directory
+only opens the new and modified files.
+
+Results are stored in an SQLite database keyed by the absolute file path. A result is only
+reused if the file size, modification time and inode are unchanged, and if the search patterns
+and the search settings hash to the same value as when the result was stored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from multiqc import config
+from multiqc.types import ModuleId
+
+if TYPE_CHECKING:
+    from multiqc.report import SearchPattern
+
+logger = logging.getLogger(__name__)
+
+# Config fields that affect the result of the file search, in addition to the search patterns
+_CONFIG_KEYS = [
+    "log_filesize_limit",
+    "ignore_images",
+    "fn_ignore_dirs",
+    "fn_ignore_paths",
+    "fn_ignore_files",
+    "filesearch_lines_limit",
+    "filesearch_file_shared",
+]
+
+# Reasons to skip a file that don't only depend on the file contents, e.g. read permissions
+_UNCACHED_STATS = {"skipped_not_a_file", "skipped_file_contents_search_errors"}
+
+# Size, modification time in nanoseconds, and inode of a file
+FileStat = Tuple[int, int, int]
+
+
+class CachedResult(NamedTuple):
+    matched: bool
+    modules: List[ModuleId]
+    stats: List[str]
+
+
+def cache_dir() -> Path:
+    """
+    Directory of the search cache, `config.filesearch_cache_dir` or `$XDG_CACHE_HOME/multiqc`
+    """
+    if config.filesearch_cache_dir:
+        return Path(config.filesearch_cache_dir)
+    return Path(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))) / "multiqc"
+
+
+def search_config_hash(spatterns: List[Dict[ModuleId, List["SearchPattern"]]]) -> str:
+    """
+    Hash of the effective search patterns and settings. Cached results are ignored when it changes.
+    """
+
+    def _default(value: Any):
+        if isinstance(value, re.Pattern):
+            return value.pattern
+        if isinstance(value, (set, frozenset)):
+            return sorted(value, key=str)
+        return str(value)
+
+    state = {
+        "version": config.version,
+        "config": {key: getattr(config, key, None) for key in _CONFIG_KEYS},
+        "patterns": [
+            {module_id: [sp.model_dump() for sp in sps] for module_id, sps in patterns.items()}
+            for patterns in spatterns
+        ],
+    }
+    return hashlib.sha256(json.dumps(state, sort_keys=True, default=_default).encode()).hexdigest()
+
+
+def _stat(path: Path) -> Optional[FileStat]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class SearchCache:
+    """
+    Search results of the files found in previous runs. Call `lookup()` with the files to search,
+    `add()` with the result of each file that had to be searched, then `close()` to save them.
+    """
+
+    # Number of paths queried at once, below the SQLite limit of host parameters
+    _QUERY_CHUNK = 500
+
+    def __init__(self, db_path: Path, config_hash: str):
+        self.db_path = db_path
+        self.config_hash = config_hash
+        self._conn = sqlite3.connect(str(db_path), timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files "
+            "(path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, config_hash TEXT, result TEXT)"
+        )
+        self._file_stats: Dict[Path, FileStat] = {}
+        self._rows: List[Tuple[str, int, int, int, str, str]] = []
+
+    @staticmethod
+    def open(config_hash: str) -> Optional["SearchCache"]:
+        """
+        Open the cache database, creating it if needed. Returns None if it can't be opened,
+        in which case all files are searched.
+        """
+        db_path = cache_dir() / "filesearch.sqlite"
+        try:
+            os.makedirs(db_path.parent, exist_ok=True)
+            return SearchCache(db_path, config_hash)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not open the file search cache {db_path}, searching all files: {e}")
+            return None
+
+    def lookup(self, paths: List[Path], known_stats: Optional[Dict[str, FileStat]] = None) -> Dict[Path, CachedResult]:
+        """
+        Find the cached results of the files that didn't change since they were searched.
+        `known_stats`, keyed by path string, are used instead of querying the filesystem.
+        """
+        known_stats = known_stats or {}
+        for path in paths:
+            if (st := known_stats.get(str(path))) is not None or (st := _stat(path)) is not None:
+                self._file_stats[path] = st
+
+        by_abs_path = {os.path.abspath(path): path for path in self._file_stats}
+        abs_paths = list(by_abs_path)
+        found: Dict[Path, CachedResult] = {}
+        try:
+            for i in range(0, len(abs_paths), self._QUERY_CHUNK):
+                chunk = abs_paths[i : i + self._QUERY_CHUNK]
+                rows = self._conn.execute(
+                    "SELECT path, size, mtime_ns, inode, result FROM files "
+                    f"WHERE config_hash = ? AND path IN ({','.join('?' * len(chunk))})",
+                    [self.config_hash] + chunk,
+                )
+                for abs_path, size, mtime_ns, inode, result in rows:
+                    path = by_abs_path[abs_path]
+                    if self._file_stats[path] == (size, mtime_ns, inode):
+                        matched, modules, stats = json.loads(result)
+                        found[path] = CachedResult(matched, [ModuleId(m) for m in modules], stats)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read the file search cache {self.db_path}, searching all files: {e}")
+            return {}
+        return found
+
+    def add(self, path: Path, matched: bool, modules: Iterable[ModuleId], stats: Iterable[str]):
+        """
+        Remember the search result of a file. Uses the file stat taken by `lookup()` before
+        the file was searched, so a file modified during the search will be searched again next time.
+        """
+        stats = list(stats)
+        st = self._file_stats.get(path)
+        if st is None or _UNCACHED_STATS.intersection(stats):
+            return
+        result = json.dumps([matched, list(modules), stats])
+        self._rows.append((os.path.abspath(path), *st, self.config_hash, result))
+
+    def close(self):
+        """
+        Save the added results and close the database
+        """
+        try:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", self._rows)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write the file search cache {self.db_path}: {e}")
+        finally:
+            self._conn.close()
+            self._rows = []
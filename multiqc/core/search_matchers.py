@@ -0,0 +1,493 @@
+"""
+Precompiled matchers for the file search. Instead of testing each file against every
+search pattern one by one, all patterns are compiled once per run into dispatch structures
+that resolve a file to its candidate search patterns in a single lookup, and scan the
+file contents once for all patterns.
+"""
+
+import fnmatch
+import logging
+import os
+import re
+import sys
+from collections import defaultdict
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from multiqc.types import ModuleId
+
+if TYPE_CHECKING:
+    from multiqc.report import SearchFile, SearchPattern
+
+logger = logging.getLogger(__name__)
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+
+# Search pattern key and the index of the pattern in the list of patterns for that key
+PatternKey = Tuple[ModuleId, int]
+
+_GLOB_SPECIAL_CHARS = re.compile(r"[*?\[]")
+# Regexes that can't be combined into one alternation without changing their meaning
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+class RegexSet(Generic[KeyT]):
+    """
+    Ordered set of regexes that finds all of them matching a string with `re.match` semantics.
+
+    The regexes are also combined into a single alternation, with each regex wrapped in a named
+    group. Most strings don't match any regex and are rejected with one call. Otherwise, the name
+    of the matched group tells the first matching regex, so only the regexes after it need to be
+    tested individually.
+    """
+
+    _GROUP_PREFIX = "_mqc_re_"
+
+    def __init__(self):
+        self._items: List[Tuple[KeyT, re.Pattern]] = []
+        self._combined: Optional[re.Pattern] = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, key: KeyT, regex: re.Pattern):
+        self._items.append((key, regex))
+        self._combined = None
+
+    def compile(self):
+        """
+        Build the combined alternation. Falls back to testing each regex individually if the
+        regexes can't be combined, e.g. because of global inline flags or backreferences.
+        """
+        self._combined = None
+        if len(self._items) < 2:
+            return
+        if any(_BACKREFERENCE.search(rx.pattern) or rx.flags & ~re.UNICODE for _, rx in self._items):
+            return
+        try:
+            self._combined = re.compile(
+                "|".join(f"(?P<{self._GROUP_PREFIX}{i}>{rx.pattern})" for i, (_, rx) in enumerate(self._items))
+            )
+        except re.error as e:
+            logger.debug(f"Could not combine file search regexes, will match them one by one: {e}")
+
+    def match(self, s: str) -> List[KeyT]:
+        start = 0
+        matched: List[KeyT] = []
+        if self._combined is not None:
+            m = self._combined.match(s)
+            if m is None or m.lastgroup is None:
+                return matched
+            start = int(m.lastgroup[len(self._GROUP_PREFIX) :])
+            matched.append(self._items[start][0])
+            start += 1
+        for key, rx in self._items[start:]:
+            if rx.match(s):
+                matched.append(key)
+        return matched
+
+
+class GlobIndex(Generic[KeyT]):
+    """
+    Finds all glob patterns matching a file name, with `fnmatch.fnmatch` semantics.
+
+    Literal names, `*suffix` and `prefix*` globs, which is the vast majority of file search
+    patterns, are looked up in hash tables. The remaining globs are translated to regexes
+    and matched with a `RegexSet`.
+    """
+
+    def __init__(self, globs: Sequence[Tuple[str, KeyT]] = ()):
+        self._exact: Dict[str, List[KeyT]] = defaultdict(list)
+        self._suffixes: Dict[str, List[KeyT]] = defaultdict(list)
+        self._prefixes: Dict[str, List[KeyT]] = defaultdict(list)
+        self._suffix_lengths: List[int] = []
+        self._prefix_lengths: List[int] = []
+        self._regexes: RegexSet[KeyT] = RegexSet()
+        for glob, key in globs:
+            self.add(glob, key)
+        self.compile()
+
+    def add(self, glob: str, key: KeyT):
+        glob = os.path.normcase(glob)
+        if not _GLOB_SPECIAL_CHARS.search(glob):
+            self._exact[glob].append(key)
+        elif len(glob) > 1 and glob[0] == "*" and not _GLOB_SPECIAL_CHARS.search(glob[1:]):
+            self._suffixes[glob[1:]].append(key)
+        elif len(glob) > 1 and glob[-1] == "*" and not _GLOB_SPECIAL_CHARS.search(glob[:-1]):
+            self._prefixes[glob[:-1]].append(key)
+        else:
+            self._regexes.add(key, re.compile(fnmatch.translate(glob)))
+
+    def compile(self):
+        self._suffix_lengths = sorted({len(s) for s in self._suffixes})
+        self._prefix_lengths = sorted({len(p) for p in self._prefixes})
+        self._regexes.compile()
+
+    def match(self, name: str) -> List[KeyT]:
+        name = os.path.normcase(name)
+        matched: List[KeyT] = list(self._exact.get(name, ()))
+        for n in self._suffix_lengths:
+            if n > len(name):
+                break
+            if (keys := self._suffixes.get(name[-n:])) is not None:
+                matched.extend(keys)
+        for n in self._prefix_lengths:
+            if n > len(name):
+                break
+            if (keys := self._prefixes.get(name[:n])) is not None:
+                matched.extend(keys)
+        if len(self._regexes):
+            matched.extend(self._regexes.match(name))
+        return matched
+
+
+class FilenameMatcher:
+    """
+    Dispatch structure built once per run from all active search patterns, that resolves a file
+    name to the patterns with matching `fn` and `fn_re` keys in one lookup, instead of calling
+    `fnmatch` and `re.match` for each pattern of each module.
+
+    Patterns without `fn` and `fn_re` match by contents only, so they are candidates for every file.
+    """
+
+    def __init__(
+        self,
+        spatterns: List[Dict[ModuleId, List["SearchPattern"]]],
+        ignore_globs: Sequence[str] = (),
+    ):
+        fn_globs: List[Tuple[str, PatternKey]] = []
+        self._fn_re: RegexSet[PatternKey] = RegexSet()
+        # fn_re of patterns that also have fn, checked after the fn glob matched
+        self._fn_re_after_glob: Dict[PatternKey, re.Pattern] = {}
+        # Patterns that only search by contents
+        self._contents_only: Dict[ModuleId, AbstractSet[int]] = {}
+
+        for patterns in spatterns:
+            for module_id, sps in patterns.items():
+                for i, sp in enumerate(sps):
+                    key = (module_id, i)
+                    if sp.fn is not None:
+                        fn_globs.append((sp.fn, key))
+                        if sp.fn_re is not None:
+                            self._fn_re_after_glob[key] = sp.fn_re
+                    elif sp.fn_re is not None:
+                        self._fn_re.add(key, sp.fn_re)
+                    else:
+                        self._contents_only[module_id] = self._contents_only.get(module_id, frozenset()) | {i}
+
+        self._fn_index: GlobIndex[PatternKey] = GlobIndex(fn_globs)
+        self._fn_re.compile()
+        self._ignore_index: GlobIndex[int] = GlobIndex([(glob, i) for i, glob in enumerate(ignore_globs)])
+
+    def match(self, filename: str) -> Dict[ModuleId, AbstractSet[int]]:
+        """
+        Return the indices of the search patterns of each module that match the file name.
+        Modules that can't match the file are not in the result.
+        """
+        matched: Dict[ModuleId, AbstractSet[int]] = dict(self._contents_only)
+        for key in self._fn_index.match(filename):
+            fn_re = self._fn_re_after_glob.get(key)
+            if fn_re is not None and not fn_re.match(filename):
+                continue
+            matched[key[0]] = matched.get(key[0], frozenset()) | {key[1]}
+        for module_id, i in self._fn_re.match(filename):
+            matched[module_id] = matched.get(module_id, frozenset()) | {i}
+        return matched
+
+    def is_ignored(self, filename: str) -> bool:
+        """
+        Whether the file name matches any of `config.fn_ignore_files`
+        """
+        return bool(self._ignore_index.match(filename))
+
+
+def _required_literal(regex: re.Pattern) -> Optional[str]:
+    """
+    Longest literal string that any match of the regex must contain, if one can be found.
+    Used to skip line blocks that can't contain a matching line without running the regex.
+    """
+    if regex.flags & (re.IGNORECASE | re.VERBOSE):
+        return None
+    try:
+        if sys.version_info >= (3, 11):
+            from re import _parser as sre_parse  # type: ignore
+        else:
+            import sre_parse  # type: ignore
+
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return None
+
+    literals: List[str] = []
+
+    def collect(items):
+        run: List[str] = []
+        for op, arg in items:
+            if op == sre_parse.LITERAL:
+                run.append(chr(arg))
+                continue
+            literals.append("".join(run))
+            run = []
+            # Groups always match their contents, as do repeats with a non-zero minimum
+            if op == sre_parse.SUBPATTERN and not arg[1] & re.IGNORECASE:
+                collect(arg[-1])
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and arg[0] > 0:
+                collect(arg[-1])
+        literals.append("".join(run))
+
+    collect(parsed)
+    return max(literals, key=len) or None
+
+
+class _ContentQuery(NamedTuple):
+    # Indices into ContentMatcher strings and regexes
+    strings: Tuple[int, ...]
+    regexes: Tuple[int, ...]
+    num_lines: int
+
+
+class ContentMatcher:
+    """
+    Content search engine built once per run from all active search patterns.
+
+    The `contents` strings and `contents_re` regexes are deduplicated across modules, and each
+    line block of a file is scanned once for all of them, recording the first line where each
+    string or regex is found. A search pattern then matches if all its strings and regexes were
+    found within its `num_lines`, which gives the same result as searching the file separately
+    for each pattern, as `report.search_file` does without a content matcher.
+
+    Blocks are checked with cheap exact filters before the more expensive searches: a regex is
+    only run on the lines of blocks containing its required literal, and a string made of several
+    words is only searched for in blocks containing its inner words.
+
+    As every contents pattern needs at least one of its strings or regexes to be found, the scan
+    also rules out most patterns for a file at once, see `FileContentScan.prune`.
+    """
+
+    def __init__(self, spatterns: List[Dict[ModuleId, List["SearchPattern"]]], default_num_lines: int):
+        self.strings: List[str] = []
+        self.regexes: List[re.Pattern] = []
+        # Largest number of lines any pattern searches for each string and regex
+        self.string_num_lines: List[int] = []
+        self.regex_num_lines: List[int] = []
+        # Keyed by the id of the pattern objects the matcher was built from
+        self._queries: Dict[int, _ContentQuery] = {}
+
+        # Patterns that use each string and regex
+        self.string_patterns: List[List[PatternKey]] = []
+        self.regex_patterns: List[List[PatternKey]] = []
+        # Number of lines scanned before pruning, enough for all patterns that only search by contents
+        self.prune_num_lines: int = max(
+            (
+                sp.num_lines or default_num_lines
+                for patterns in spatterns
+                for sps in patterns.values()
+                for sp in sps
+                if sp.fn is None and sp.fn_re is None and (sp.contents or sp.contents_re)
+            ),
+            default=0,
+        )
+        # Patterns that can be ruled out after scanning `prune_num_lines` lines. Patterns with a
+        # `max_filesize` are kept, so the skipped file is still recorded by `report.search_file`.
+        self.prunable: Dict[ModuleId, AbstractSet[int]] = {}
+
+        string_ids: Dict[str, int] = {}
+        regex_ids: Dict[re.Pattern, int] = {}
+        for patterns in spatterns:
+            for module_id, sps in patterns.items():
+                for idx, sp in enumerate(sps):
+                    if not sp.contents and not sp.contents_re:
+                        continue
+                    num_lines = sp.num_lines or default_num_lines
+                    if num_lines <= self.prune_num_lines and sp.max_filesize is None:
+                        self.prunable[module_id] = self.prunable.get(module_id, frozenset()) | {idx}
+                    query = self._queries[id(sp)] = _ContentQuery(
+                        strings=tuple(
+                            self._add(
+                                string_ids, self.strings, self.string_num_lines, self.string_patterns, s, num_lines
+                            )
+                            for s in sp.contents
+                        ),
+                        regexes=tuple(
+                            self._add(regex_ids, self.regexes, self.regex_num_lines, self.regex_patterns, r, num_lines)
+                            for r in sp.contents_re
+                        ),
+                        num_lines=num_lines,
+                    )
+                    for i in query.strings:
+                        self.string_patterns[i].append((module_id, idx))
+                    for i in query.regexes:
+                        self.regex_patterns[i].append((module_id, idx))
+
+        # Tuples of (string index, string, inner word, num_lines) to scan each block with. Strings
+        # searched deeper into the file go first, so a block only checks the strings that some pattern
+        # still needs at that line. The inner word is the longest word surrounded by whitespace in the
+        # string, that must appear as a whole word in a block containing the string.
+        self.string_scan_order: List[Tuple[int, str, Optional[str], int]] = sorted(
+            (
+                (i, s, max(s.split()[1:-1], key=len, default=None), self.string_num_lines[i])
+                for i, s in enumerate(self.strings)
+            ),
+            key=lambda t: t[3],
+            reverse=True,
+        )
+        self.regex_literals: List[Optional[str]] = [_required_literal(rx) for rx in self.regexes]
+        self.max_regex_num_lines: int = max(self.regex_num_lines, default=0)
+
+    @staticmethod
+    def _add(ids: Dict, items: List, num_lines_list: List[int], patterns_list: List, item, num_lines: int) -> int:
+        i = ids.get(item)
+        if i is None:
+            i = ids[item] = len(items)
+            items.append(item)
+            num_lines_list.append(num_lines)
+            patterns_list.append([])
+        else:
+            num_lines_list[i] = max(num_lines_list[i], num_lines)
+        return i
+
+    def __contains__(self, pattern: "SearchPattern") -> bool:
+        return id(pattern) in self._queries
+
+    def scan(self, f: "SearchFile") -> "FileContentScan":
+        """
+        Start a lazy contents scan of one file. Blocks are only read when a pattern needs them.
+        """
+        return FileContentScan(self, f)
+
+
+class FileContentScan:
+    """
+    Contents scan of a single file for all patterns of a `ContentMatcher`. The file is read
+    block by block, only as deep as the patterns tested so far need, and each block is
+    scanned once.
+    """
+
+    def __init__(self, matcher: ContentMatcher, f: "SearchFile"):
+        self._matcher = matcher
+        self._f = f
+        self._n_blocks = 0
+        self._n_lines = 0
+        self._eof = False
+        self._error: Optional[Exception] = None
+        # 1-based line number of the first occurrence of each string
+        self._string_lines: Dict[int, int] = {}
+        # 0-based index of the first line matching each regex, counting the lines
+        # of each block as split by `str.splitlines`
+        self._regex_lines: Dict[int, int] = {}
+
+    def matches(self, pattern: "SearchPattern") -> bool:
+        """
+        Whether all `contents` and `contents_re` of the pattern are found within its `num_lines`.
+        Raises if the file can't be read.
+        """
+        query = self._matcher._queries[id(pattern)]
+        self._scan_until(query.num_lines)
+        for i in query.strings:
+            line = self._string_lines.get(i)
+            if line is None or line > query.num_lines:
+                return False
+        for i in query.regexes:
+            line = self._regex_lines.get(i)
+            if line is None or line >= query.num_lines:
+                return False
+        return True
+
+    def prune(self, fn_matches: Dict[ModuleId, AbstractSet[int]]) -> Dict[ModuleId, AbstractSet[int]]:
+        """
+        Remove the candidate patterns that can't match because none of their strings or regexes
+        were found in the file. Reads the file up to `ContentMatcher.prune_num_lines` lines.
+        Candidates are returned unchanged if the file can't be read, so the error is recorded
+        when the patterns are tested.
+        """
+        m = self._matcher
+        try:
+            self._scan_until(m.prune_num_lines)
+        except Exception:
+            return fn_matches
+
+        hits: Dict[ModuleId, Set[int]] = defaultdict(set)
+        for i in self._string_lines:
+            for module_id, idx in m.string_patterns[i]:
+                hits[module_id].add(idx)
+        for i in self._regex_lines:
+            for module_id, idx in m.regex_patterns[i]:
+                hits[module_id].add(idx)
+
+        pruned: Dict[ModuleId, AbstractSet[int]] = {}
+        for module_id, idxs in fn_matches.items():
+            prunable = m.prunable.get(module_id)
+            if prunable:
+                module_hits = hits.get(module_id)
+                idxs = idxs - prunable if module_hits is None else idxs - (prunable - module_hits)
+                if not idxs:
+                    continue
+            pruned[module_id] = idxs
+        return pruned
+
+    def _scan_until(self, num_lines: int):
+        if self._error is not None:
+            raise self._error
+        if self._eof or self._n_lines >= num_lines:
+            return
+        try:
+            # Cached blocks are replayed by the iterator first, skip those that were already scanned
+            for i, (line_count, block) in enumerate(self._f.line_block_iterator()):
+                if i < self._n_blocks:
+                    continue
+                self._scan_block(block)
+                self._n_blocks += 1
+                self._n_lines += line_count
+                if self._n_lines >= num_lines:
+                    return
+        except Exception as e:
+            self._error = e
+            raise
+        self._eof = True
+
+    def _scan_block(self, block: str):
+        m = self._matcher
+        lines_before = self._n_lines
+
+        string_lines = self._string_lines
+        words: Optional[Set[str]] = None
+        for i, string, word, num_lines in m.string_scan_order:
+            if num_lines <= lines_before:
+                break
+            if i in string_lines:
+                continue
+            if word is not None:
+                if words is None:
+                    words = set(block.split())
+                if word not in words:
+                    continue
+            idx = block.find(string)
+            if idx != -1:
+                string_lines[i] = lines_before + block.count("\n", 0, idx) + 1
+
+        if lines_before >= m.max_regex_num_lines:
+            return
+        regex_lines = self._regex_lines
+        candidates = [
+            (i, rx)
+            for i, (rx, literal) in enumerate(zip(m.regexes, m.regex_literals))
+            if i not in regex_lines and m.regex_num_lines[i] > lines_before and (literal is None or literal in block)
+        ]
+        if not candidates:
+            return
+        for j, line in enumerate(block.splitlines(keepends=True)):
+            for i, rx in candidates:
+                if i not in regex_lines and rx.match(line):
+                    regex_lines[i] = lines_before + j
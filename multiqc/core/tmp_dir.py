@@ -1,11 +1,16 @@
 import logging
 import os
+import shutil
+import uuid
 from pathlib import Path
 from typing import Optional
 
+from multiqc import config
+
 logger = logging.getLogger(__name__)
 
 _tmp_dir: Optional[Path] = None
+_data_tmp_dir: Optional[Path] = None
 
 
 def get_tmp_dir() -> Path:
@@ -26,12 +31,27 @@ def get_tmp_dir() -> Path:
 
 def data_tmp_dir() -> Path:
     """
-    Temporary directory to collect data files from running modules before copying to the final
-    destination in multiqc.core.write_results
+    Temporary directory to collect data files from running modules before moving them to the final
+    destination in multiqc.core.write_results. With `config.data_tmp_dir_in_output`, it's created in
+    the output directory, so that it's renamed to the final directory instead of copied.
     """
-    path = get_tmp_dir() / "multiqc_data"
-    os.makedirs(path, exist_ok=True)
-    return path
+    global _data_tmp_dir
+    if _data_tmp_dir is None:
+        if config.data_tmp_dir_in_output:
+            _data_tmp_dir = Path(config.output_dir) / f".{config.data_dir_name}_{uuid.uuid4().hex[:8]}.tmp"
+            logger.debug(f"Writing data files to temporary directory in the output directory: {_data_tmp_dir}")
+        else:
+            _data_tmp_dir = get_tmp_dir() / "multiqc_data"
+    os.makedirs(_data_tmp_dir, exist_ok=True)
+    return _data_tmp_dir
+
+
+def remove_data_tmp_dir() -> None:
+    """
+    Remove the data tmp dir if it's outside of the tmp dir, i.e. in the output directory
+    """
+    if _data_tmp_dir is not None and (_tmp_dir is None or _tmp_dir not in _data_tmp_dir.parents):
+        shutil.rmtree(_data_tmp_dir, ignore_errors=True)
 
 
 def plots_tmp_dir(create=True) -> Path:
@@ -53,5 +73,15 @@ def parquet_file() -> Path:
 
 
 def new_tmp_dir():
-    global _tmp_dir
+    global _tmp_dir, _data_tmp_dir
     _tmp_dir = None
+    _data_tmp_dir = None
+
+
+def set_tmp_dir(path: Path):
+    """
+    Use an existing directory as the temporary directory, e.g. a separate one for each module run in a worker process
+    """
+    global _tmp_dir, _data_tmp_dir
+    _tmp_dir = path
+    _data_tmp_dir = path / "multiqc_data"
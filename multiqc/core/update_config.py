@@ -6,7 +6,7 @@ from typing import Dict, List, Literal, Optional, Union, cast
 
 from pydantic import BaseModel
 
-from multiqc import config, report
+from multiqc import config
 from multiqc.core import log_and_rich, plugin_hooks
 from multiqc.core.exceptions import RunError
 from multiqc.utils.config_schema import AiProviderLiteral
@@ -52,6 +52,9 @@ class ClConfig(BaseModel):
     profile_runtime: Optional[bool] = None
     profile_memory: Optional[bool] = None
     no_version_check: Optional[bool] = None
+    filesearch_workers: Optional[int] = None
+    filesearch_cache: Optional[bool] = None
+    module_workers: Optional[int] = None
     ignore: List[str] = []
     ignore_samples: List[str] = []
     only_samples: List[str] = []
@@ -201,6 +204,12 @@ def update_config(*analysis_dir, cfg: Optional[ClConfig] = None, log_to_file=Fal
         config.profile_runtime = config.profile_memory = cfg.profile_memory
     if cfg.no_version_check is not None:
         config.no_version_check = cfg.no_version_check
+    if cfg.filesearch_workers is not None:
+        config.filesearch_workers = cfg.filesearch_workers
+    if cfg.filesearch_cache is not None:
+        config.filesearch_cache = cfg.filesearch_cache
+    if cfg.module_workers is not None:
+        config.module_workers = cfg.module_workers
     if cfg.custom_css_files:
         config.custom_css_files.extend(cfg.custom_css_files)
     if cfg.module_order:
@@ -256,6 +265,8 @@ def update_config(*analysis_dir, cfg: Optional[ClConfig] = None, log_to_file=Fal
         logger.debug(f"Only including sample names that match: {', '.join(cfg.only_samples)}")
         config.sample_names_only_include.extend(cfg.only_samples)
     # Prep module configs
+    from multiqc import report  # imported here so that ClConfig can be used without loading the report
+
     report.top_modules = [m if isinstance(m, dict) else {m: {}} for m in config.top_modules]
     report.module_order = [m if isinstance(m, dict) else {m: {}} for m in config.module_order]
 
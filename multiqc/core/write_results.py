@@ -11,14 +11,15 @@ import sys
 import time
 import traceback
 import uuid
+import zipfile
 from pathlib import Path
-from typing import Optional, cast
+from typing import List, Optional, TextIO, cast
 
 import jinja2
 
 from multiqc import config, report
 from multiqc.base_module import Section
-from multiqc.core import log_and_rich, plot_data_store, plugin_hooks, tmp_dir
+from multiqc.core import data_file_writer, log_and_rich, plot_data_store, plugin_hooks, tmp_dir
 from multiqc.core.exceptions import NoAnalysisFound
 from multiqc.core.log_and_rich import iterate_using_progress_bar
 from multiqc.plots import table
@@ -68,6 +69,9 @@ def write_results() -> None:
 
     output_file_names: OutputNames = _set_output_names()
 
+    # Plot export processes are forked, so stop the data file writer threads first
+    data_file_writer.shutdown()
+
     render_and_export_plots(plots_dir_name=output_file_names.plots_dir_name)
 
     if not config.skip_generalstats:
@@ -84,7 +88,7 @@ def write_results() -> None:
         _write_data_files(paths.data_dir)
         logger.info(
             "Data        : {}{}".format(
-                _maybe_relative_path(paths.data_dir),
+                _maybe_relative_path(_data_zip_path(paths.data_dir) if config.zip_data_dir else paths.data_dir),
                 "   (overwritten)" if paths.data_dir_overwritten else "",
             )
         )
@@ -118,20 +122,16 @@ def write_results() -> None:
             )
         )
 
-    # Zip the data directory if requested
-    if config.zip_data_dir and paths.data_dir is not None:
-        shutil.make_archive(str(paths.data_dir), format="zip", root_dir=str(paths.data_dir))
-        try:
-            util_functions.rmtree_with_retries(paths.data_dir)
-        except Exception as e:
-            logger.warning(f"Couldn't remove data dir: {e}")
-
     if paths.report_path:
         logger.debug(f"Report HTML written to {paths.report_path}")
 
     # Copy log to the multiqc_data dir. Keeping it in the tmp dir in case if it's an interactive session
     # that goes beyond this write_results run.
-    if log_and_rich.log_tmp_fn and paths.data_dir:
+    if config.zip_data_dir and paths.data_dir is not None:
+        # The data files are still in the data tmp dir, and go straight into the archive
+        log_files = [Path(log_and_rich.log_tmp_fn)] if log_and_rich.log_tmp_fn else []
+        _zip_data_files(tmp_dir.data_tmp_dir(), _data_zip_path(paths.data_dir), log_files)
+    elif log_and_rich.log_tmp_fn and paths.data_dir:
         shutil.copy2(log_and_rich.log_tmp_fn, str(paths.data_dir))
 
 
@@ -397,7 +397,9 @@ def _render_general_stats_table(plots_dir_name: str) -> Optional[Plot]:
 
 def _write_data_files(data_dir: Path) -> None:
     """
-    Write auxiliary data files: module data exports, JSON dump, sources, dev plots data, upload MegaQC
+    Write auxiliary data files: module data exports, JSON dump, sources, dev plots data, upload MegaQC.
+    All files are written to the data tmp dir, which is then moved to `data_dir`, or left to be zipped
+    at the end of the run if `config.zip_data_dir` is set.
     """
 
     # Exporting plots to files if requested
@@ -406,52 +408,50 @@ def _write_data_files(data_dir: Path) -> None:
         if s.plot_anchor and isinstance(plot := report.plot_by_id.get(s.plot_anchor), Plot):
             plot.save_data_files()
 
-    # Modules have run, so data directory should be complete by now. Move its contents.
-    logger.debug(f"Moving data file from '{report.data_tmp_dir()}' to '{data_dir}'")
-
-    # Save metadata to parquet file
+    # Save metadata and write all buffered plot data to the parquet file
     plot_data_store.save_report_metadata()
+    plot_data_store.write_parquet()
 
-    shutil.copytree(
-        report.data_tmp_dir(),
-        data_dir,
-        # Override default shutil.copy2 function to copy files. The default
-        # function copies times and mode, which we want to avoid on purpose
-        # to get around the problem with mounted CIFS shares (see #625).
-        # shutil.copyfile only copies the file without any metadata.
-        copy_function=shutil.copyfile,
-    )
-    try:
-        rmtree_with_retries(report.data_tmp_dir())
-    except Exception as e:
-        logger.warning(f"Couldn't remove data tmp dir: {e}")
+    data_tmp_dir = report.data_tmp_dir()
 
     # Write the report sources to disk
-    report.data_sources_tofile(data_dir)
+    report.data_sources_tofile(data_tmp_dir)
 
     # Create a file with the module DOIs
-    report.dois_tofile(data_dir, report.modules)
+    report.dois_tofile(data_tmp_dir, report.modules)
+
+    # All data files are saved by now, wait for them to be written before reading or moving them
+    data_file_writer.wait()
 
     # Data Export / MegaQC integration - save report data to file or send report data to an API endpoint
     if config.data_dump_file or (config.megaqc_url and config.megaqc_upload):
-        report.multiqc_dump_json(data_dir)
+        report.multiqc_dump_json(data_tmp_dir)
 
     if config.development:
-        with (data_dir / "multiqc_plots.js").open("w") as f:
+        with (data_tmp_dir / "multiqc_plots.js").open("w", encoding="utf-8") as f:
             util_functions.dump_json(report.plot_data, f)
 
+    if not config.zip_data_dir:
+        # Modules have run, so data directory should be complete by now. Move it.
+        logger.debug(f"Moving data files from '{data_tmp_dir}' to '{data_dir}'")
+        _move_tmp_dir(data_tmp_dir, data_dir)
 
-def _move_exported_plots(plots_dir: Path):
+
+def _move_tmp_dir(src: Path, dest: Path) -> None:
     """
-    Assuming plots already exported to config.plots_tmp_dir(), move them to config.plots_dir
+    Move a tmp dir to its final destination. When both are on the same filesystem, the directory
+    is renamed in one step. Otherwise, the files are copied and the tmp dir is removed.
     """
-
-    # Modules have run, so plots directory should be complete by now. Move its contents.
-    logger.debug(f"Moving plots directory from '{tmp_dir.plots_tmp_dir()}' to '{plots_dir}'")
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.rename(src, dest)
+        return
+    except OSError as e:
+        logger.debug(f"Couldn't rename '{src}' to '{dest}', copying instead: {e}")
 
     shutil.copytree(
-        tmp_dir.plots_tmp_dir(),
-        plots_dir,
+        src,
+        dest,
         # Override default shutil.copy2 function to copy files. The default
         # function copies times and mode, which we want to avoid on purpose
         # to get around the problem with mounted CIFS shares (see #625).
@@ -459,9 +459,51 @@ def _move_exported_plots(plots_dir: Path):
         copy_function=shutil.copyfile,
     )
     try:
-        rmtree_with_retries(tmp_dir.plots_tmp_dir())
+        rmtree_with_retries(src)
     except Exception as e:
-        logger.warning(f"Couldn't remove plots tmp dir: {e}")
+        logger.warning(f"Couldn't remove tmp dir '{src}': {e}")
+
+
+def _data_zip_path(data_dir: Path) -> Path:
+    return data_dir.with_name(f"{data_dir.name}.zip")
+
+
+def _zip_data_files(src: Path, zip_path: Path, extra_files: List[Path]) -> None:
+    """
+    Compress the data files to a zip archive with the same layout as `shutil.make_archive()`, without
+    copying them to the data directory first. Each file is removed once it's added, and the archive is
+    written under a temporary name and renamed once complete.
+    """
+    logger.debug(f"Compressing data files from '{src}' to '{zip_path}'")
+    zip_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = zip_path.with_name(f".{zip_path.name}.tmp")
+    with zipfile.ZipFile(partial_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for dirpath, dirnames, filenames in os.walk(src):
+            arcdirpath = os.path.relpath(dirpath, src)
+            for name in sorted(dirnames):
+                zf.write(os.path.join(dirpath, name), os.path.join(arcdirpath, name))
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if os.path.isfile(path):
+                    zf.write(path, os.path.join(arcdirpath, name))
+                    os.remove(path)
+        for extra_path in extra_files:
+            zf.write(extra_path, extra_path.name)
+    os.replace(partial_path, zip_path)
+    try:
+        rmtree_with_retries(src)
+    except Exception as e:
+        logger.warning(f"Couldn't remove data tmp dir: {e}")
+
+
+def _move_exported_plots(plots_dir: Path):
+    """
+    Assuming plots already exported to config.plots_tmp_dir(), move them to config.plots_dir
+    """
+
+    # Modules have run, so plots directory should be complete by now. Move it.
+    logger.debug(f"Moving plots directory from '{tmp_dir.plots_tmp_dir()}' to '{plots_dir}'")
+    _move_tmp_dir(tmp_dir.plots_tmp_dir(), plots_dir)
 
 
 def _write_html_report(to_stdout: bool, report_path: Optional[Path]):
@@ -556,23 +598,20 @@ def _write_html_report(to_stdout: bool, report_path: Optional[Path]):
     except:  # noqa: E722
         raise IOError(f"Could not load {config.template} template file '{template_mod.base_fn}'")
 
-    # Compress the report plot JSON data
-    runtime_compression_start = time.time()
-    logger.debug("Compressing plot data")
-    report.plot_compressed_json = report.compress_json(report.plot_data)
-    report.runtimes.total_compression = time.time() - runtime_compression_start
+    # The plot data is compressed while the report is written, in place of the placeholder
+    report.plot_compressed_json = _PLOT_DATA_PLACEHOLDER
+    report.runtimes.total_compression = 0.0
 
     # Use jinja2 to render the template and overwrite
     report.analysis_files = [os.path.realpath(d) for d in report.analysis_files]
     report.report_uuid = str(uuid.uuid4())
-    report_output = j_template.render(report=report, config=config)
     if to_stdout:
-        print(report_output, file=sys.stdout)
+        _stream_html_report(j_template, sys.stdout)
     else:
         assert report_path is not None
         try:
             with io.open(report_path, "w", encoding="utf-8") as f:
-                print(report_output, file=f)
+                _stream_html_report(j_template, f)
         except IOError as e:
             raise IOError(f"Could not print report to '{config.output_fn}' - {IOError(e)}")
 
@@ -586,6 +625,27 @@ def _write_html_report(to_stdout: bool, report_path: Optional[Path]):
             pass  # No files to copy
 
 
+_PLOT_DATA_PLACEHOLDER = "%%MULTIQC_COMPRESSED_PLOT_DATA%%"
+
+
+def _stream_html_report(j_template: jinja2.Template, f: TextIO):
+    """
+    Write the rendered template chunk by chunk, streaming the compressed plot data in place of the
+    placeholder, so that the whole report is never held in memory
+    """
+    for chunk in j_template.generate(report=report, config=config):
+        before, *afters = chunk.split(_PLOT_DATA_PLACEHOLDER)
+        f.write(before)
+        for after in afters:
+            runtime_compression_start = time.time()
+            logger.debug("Compressing plot data")
+            for data_chunk in report.iter_compressed_plot_data(report.plot_data):
+                f.write(data_chunk)
+            report.runtimes.total_compression += time.time() - runtime_compression_start
+            f.write(after)
+    f.write("\n")
+
+
 def _write_pdf(report_path: Path) -> Optional[Path]:
     pdf_path = report_path.with_suffix(".pdf")
     pandoc_call = [
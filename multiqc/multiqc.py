@@ -14,17 +14,14 @@ from typing import Optional, Tuple
 
 import rich_click as click
 
-from multiqc import config, report, validation
+from multiqc import config
 from multiqc.core import log_and_rich, plugin_hooks
 from multiqc.core.exceptions import NoAnalysisFound, RunError
-from multiqc.core.exec_modules import exec_modules
-from multiqc.core.file_search import file_search
-from multiqc.core.order_modules_and_sections import order_modules_and_sections
 from multiqc.core.update_config import ClConfig, update_config
-from multiqc.core.version_check import check_version
-from multiqc.core.write_results import write_results
 from multiqc.utils import config_schema, util_functions
-from multiqc.validation import ModuleConfigValidationError
+
+# The report, the modules and the plotting libraries are imported in run(), so that `--help`
+# and `--version` don't have to load them
 
 logger = logging.getLogger(__name__)
 
@@ -120,6 +117,9 @@ click.rich_click.OPTION_GROUPS = {
                 "--development",
                 "--profile-runtime",
                 "--profile-memory",
+                "--search-workers",
+                "--search-cache",
+                "--module-workers",
                 "--no-megaqc-upload",
                 "--no-ansi",
                 "--version",
@@ -459,6 +459,25 @@ click.rich_click.OPTION_GROUPS = {
     default=None,
     help="Disable checking the latest MultiQC version on the server",
 )
+@click.option(
+    "--search-workers",
+    "filesearch_workers",
+    type=int,
+    help="Number of parallel workers to use when searching for log files",
+)
+@click.option(
+    "--search-cache",
+    "filesearch_cache",
+    is_flag=True,
+    default=None,
+    help="Reuse the search results of files unchanged since previous runs",
+)
+@click.option(
+    "--module-workers",
+    "module_workers",
+    type=int,
+    help="Number of parallel processes to use when running the modules",
+)
 @click.option(
     "--ai",
     "--ai-summary",
@@ -539,6 +558,8 @@ def run_cli(analysis_dir: Tuple[str], clean_up: bool, check_config: bool, **kwar
     other_fields = {k: v for k, v in kwargs.items() if k not in ClConfig.model_fields}
     cfg = ClConfig(**cl_config_kwargs, unknown_options=other_fields)
 
+    from multiqc import validation
+
     validation.collapse_repeated_messages = True  # to avoid cluttering output
 
     # Pass on to a regular function that can be used easily without click
@@ -580,6 +601,14 @@ def run(
     See http://multiqc.info for more details.
     """
 
+    from multiqc import report
+    from multiqc.core.exec_modules import exec_modules
+    from multiqc.core.file_search import file_search
+    from multiqc.core.order_modules_and_sections import order_modules_and_sections
+    from multiqc.core.version_check import check_version
+    from multiqc.core.write_results import write_results
+    from multiqc.validation import ModuleConfigValidationError
+
     # In case if run() is called multiple times in the same session:
     report.reset()
     config.reset()
@@ -644,6 +673,10 @@ def run(
         report.runtimes.total = time.time() - start_execution_time
         if config.profile_runtime:
             logger.warning(f"Run took {report.runtimes.total:.2f} seconds")
+            logger.warning(
+                f" - {report.runtimes.total_walk:.2f}s: Listing directories "
+                f"({report.runtimes.walk['list_dirs']:.2f}s listing, {report.runtimes.walk['stat_files']:.2f}s file stats)"
+            )
             logger.warning(f" - {report.runtimes.total_sp:.2f}s: Searching files")
             logger.warning(f" - {report.runtimes.total_mods:.2f}s: Running modules")
             if config.make_report:
@@ -8,6 +8,7 @@ import os
 import random
 from typing import Any, Dict, Generic, List, Literal, Mapping, Optional, Sequence, Tuple, Type, TypeVar, Union, cast
 
+import numpy as np
 import plotly.graph_objects as go  # type: ignore
 import polars as pl
 from natsort import natsorted
@@ -101,6 +102,7 @@ class LinePlotConfig(PConfig):
     ylab: Optional[str] = None
     categories: bool = False
     smooth_points: Optional[int] = 500
+    smooth_method: Optional[Literal["first", "minmax", "lttb"]] = None  # default from config.lineplot_smooth_method
     smooth_points_sumcounts: Union[bool, List[bool], None] = None
     extra_series: Optional[Union[Series, List[Series], List[List[Series]]]] = None
     style: Optional[Literal["lines", "lines+markers"]] = None
@@ -190,11 +192,13 @@ class Dataset(BaseDataset, Generic[KeyT, ValT]):
         layout: go.Layout,
         is_log: bool = False,
         is_pct: bool = False,
+        webgl: bool = False,
         **kwargs,
     ) -> go.Figure:
         """
         Create a Plotly figure for a dataset
         """
+        trace_cls = go.Scattergl if webgl else go.Scatter
         if layout.showlegend is True:
             # Extra space for legend
             if hasattr(layout, "height") and isinstance(layout.height, int):
@@ -227,7 +231,7 @@ class Dataset(BaseDataset, Generic[KeyT, ValT]):
                 params["mode"] = "lines+markers"  # otherwise it's invisible
 
             fig.add_trace(
-                go.Scatter(
+                trace_cls(
                     x=xs,
                     y=ys,
                     name=series.name,
@@ -579,6 +583,7 @@ class LinePlot(Plot[Dataset[KeyT, ValT], LinePlotConfig], Generic[KeyT, ValT]):
             pconfig=pconfig,
             anchor=anchor,
             n_series_per_dataset=n_samples_per_dataset,
+            n_points_per_dataset=[sum(len(line.pairs) for line in lines) for lines in lists_of_lines],
             axis_controlled_by_switches=["yaxis"],
             default_tt_label="<br>%{x}: %{y}",
         )
@@ -685,8 +690,6 @@ def _make_series_dict(
     s: str,
     y_by_x: XToYDictT[KeyT, ValT],
 ) -> Series[KeyT, ValT]:
-    pairs: List[Tuple[KeyT, ValT]] = []
-
     x_are_categories = pconfig.categories
     ymax = pconfig.ymax
     ymin = pconfig.ymin
@@ -714,52 +717,50 @@ def _make_series_dict(
             if _colors and isinstance(_colors, dict):
                 colors = {**colors, **cast(Dict[str, str], _colors)}
 
-    xs = [x for x in y_by_x.keys()]
+    xs = list(y_by_x.keys())
+    ys = list(y_by_x.values())
     if not x_are_categories:
-        xs = sorted(xs)
-
-    # Discard > ymax or just hide?
-    # If it never comes back into the plot, discard. If it goes above then comes back, just hide.
-    discard_ymax = None
-    discard_ymin = None
-    for x in xs:
-        if not x_are_categories:
-            if xmax is not None and float(x) > float(xmax):
-                continue
-            if xmin is not None and float(x) < float(xmin):
-                continue
-        y = y_by_x[x]
-        if y is not None:
-            if ymax is not None:
-                if float(y) > float(ymax):
-                    discard_ymax = True
-                elif discard_ymax is True:
-                    discard_ymax = False
-            if ymin is not None:
-                if float(y) > float(ymin):
-                    discard_ymin = True
-                elif discard_ymin is True:
-                    discard_ymin = False
-
-    # Build the plot data structure
-    for x in xs:
-        if not x_are_categories and x is not None:
-            if xmax is not None and float(x) > float(xmax):
-                continue
-            if xmin is not None and float(x) < float(xmin):
-                continue
-
-        y = y_by_x[x]
-        if y is not None:
-            if ymax is not None and float(y) > float(ymax) and discard_ymax is not False:
-                continue
-            if ymin is not None and float(y) < float(ymin) and discard_ymin is not False:
-                continue
-        pairs.append((x, y))
+        sorted_xs = sorted(xs)
+        if sorted_xs != xs:
+            xs = sorted_xs
+            ys = [y_by_x[x] for x in xs]
+
+    # Indexes of the points to keep
+    keep = np.ones(len(xs), dtype=bool)
+    if not x_are_categories and (xmax is not None or xmin is not None):
+        x_arr = np.array(xs, dtype=float)
+        if xmax is not None:
+            keep &= ~(x_arr > float(xmax))
+        if xmin is not None:
+            keep &= ~(x_arr < float(xmin))
+
+    y_arr: Optional[np.ndarray] = None
+    if ymax is not None or ymin is not None:
+        y_arr = np.array(ys, dtype=float)  # None values become NaN, and never compare as true
+        in_x_range = y_arr[keep]
+        in_x_range = in_x_range[~np.isnan(in_x_range)]
+        # Discard > ymax or just hide?
+        # If it never comes back into the plot, discard. If it goes above then comes back, just hide.
+        # That depends on whether the last point in the x range with a value is outside the y range.
+        if ymax is not None:
+            above = in_x_range > float(ymax)
+            discard_ymax = bool(above[-1]) if above.any() else None
+            if discard_ymax is not False:
+                keep &= ~(y_arr > float(ymax))
+        if ymin is not None:
+            above = in_x_range > float(ymin)
+            discard_ymin = bool(above[-1]) if above.any() else None
+            if discard_ymin is not False:
+                keep &= ~(y_arr < float(ymin))
+
+    idxs = np.flatnonzero(keep)
 
     # Smooth dataset if requested in config
-    if pconfig.smooth_points is not None:
-        pairs = smooth_array(pairs, pconfig.smooth_points)
+    if pconfig.smooth_points is not None and len(idxs) > pconfig.smooth_points:
+        method = pconfig.smooth_method or config.lineplot_smooth_method
+        idxs = _smooth_indexes(xs, ys, idxs, pconfig.smooth_points, method, x_are_categories, y_arr)
+
+    pairs: List[Tuple[KeyT, ValT]] = [(xs[i], ys[i]) for i in idxs.tolist()]
 
     return Series(name=s, pairs=pairs, color=colors.get(s), path_in_cfg=("lineplot", "pconfig", "pairs"))
 
@@ -814,3 +815,93 @@ def smooth_array(items: List[T], numpoints: int) -> List[T]:
         if i in first_element_indices:
             result.append(y)
     return result
+
+
+def _smooth_indexes(
+    xs: Sequence[Any],
+    ys: Sequence[Any],
+    idxs: np.ndarray,
+    numpoints: int,
+    method: str,
+    x_are_categories: bool,
+    y_arr: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Pick at most `numpoints` of the points `idxs` of a series, keeping the first and the last ones.
+    With "minmax" and "lttb", the points are chosen to keep the shape of the line, e.g. its peaks.
+    Falls back to "first" if the values are not numeric.
+    """
+    if method != "first" and numpoints >= 3:
+        try:
+            if y_arr is None:
+                y_arr = np.array(ys, dtype=float)
+            x_arr = np.arange(len(xs), dtype=float) if x_are_categories else np.array(xs, dtype=float)
+        except (TypeError, ValueError):
+            pass
+        else:
+            if method == "lttb":
+                picked = lttb_indexes(x_arr[idxs], y_arr[idxs], numpoints)
+            else:
+                picked = minmax_indexes(y_arr[idxs], numpoints)
+            return idxs[picked]
+    return np.array(smooth_array(idxs.tolist(), numpoints), dtype=int)
+
+
+def minmax_indexes(ys: np.ndarray, numpoints: int) -> np.ndarray:
+    """
+    Downsample a line to at most `numpoints` points, by splitting it into buckets of consecutive
+    points and keeping the lowest and the highest point of each bucket, plus the first and the
+    last points of the line. Peaks and dips are kept at any zoom level. NaN values are kept only
+    in buckets where all values are NaN.
+    """
+    n = len(ys)
+    if n <= numpoints:
+        return np.arange(n)
+    n_buckets = (numpoints - 2) // 2
+    if n_buckets < 1:
+        return np.array([0, n - 1])
+
+    # Buckets over the points between the first and the last
+    starts = np.linspace(1, n - 1, n_buckets + 1).astype(int)[:-1]
+    bucket_ids = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n - 1)))
+    inner = ys[1 : n - 1]
+    nan = np.isnan(inner)
+
+    def _first_extreme_in_bucket(values: np.ndarray, ufunc: np.ufunc) -> np.ndarray:
+        is_extreme = np.flatnonzero(values == ufunc.reduceat(values, starts - 1)[bucket_ids])
+        extreme_bucket_ids = bucket_ids[is_extreme]
+        return is_extreme[np.flatnonzero(np.diff(extreme_bucket_ids, prepend=-1))] + 1
+
+    mins = _first_extreme_in_bucket(np.where(nan, np.inf, inner), np.minimum)
+    maxs = _first_extreme_in_bucket(np.where(nan, -np.inf, inner), np.maximum)
+    return np.unique(np.concatenate([[0], mins, maxs, [n - 1]]))
+
+
+def lttb_indexes(xs: np.ndarray, ys: np.ndarray, numpoints: int) -> np.ndarray:
+    """
+    Downsample a line to `numpoints` points with the Largest-Triangle-Three-Buckets algorithm
+    (Steinarsson, 2013): keep the first and the last points, and from each bucket of consecutive
+    points in between, the one forming the largest triangle with the point kept in the previous
+    bucket and the average of the next bucket. NaN values are counted as 0.
+    """
+    n = len(ys)
+    if n <= numpoints:
+        return np.arange(n)
+    if numpoints < 3:
+        return np.array([0, n - 1])
+
+    ys = np.nan_to_num(ys)
+    edges = np.linspace(1, n - 1, numpoints - 1).astype(int)
+    picked = np.empty(numpoints, dtype=int)
+    picked[0] = 0
+    picked[-1] = n - 1
+    a = 0
+    for i in range(numpoints - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        cx = xs[end:next_end].mean()
+        cy = ys[end:next_end].mean()
+        areas = np.abs((xs[a] - cx) * (ys[start:end] - ys[a]) - (xs[a] - xs[start:end]) * (cy - ys[a]))
+        a = start + int(np.argmax(areas))
+        picked[i + 1] = a
+    return picked
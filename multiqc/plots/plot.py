@@ -1,3 +1,4 @@
+import atexit
 import base64
 import io
 import json
@@ -7,16 +8,22 @@ import multiprocessing
 import platform
 import random
 import re
+import shutil
 import subprocess
+import time
+from collections import deque
 from datetime import datetime
 from functools import lru_cache
+from multiprocessing.connection import Connection, wait
 from pathlib import Path
 from typing import (
     Any,
     Dict,
     Generic,
+    Iterator,
     List,
     Mapping,
+    NamedTuple,
     Optional,
     Set,
     Tuple,
@@ -32,6 +39,7 @@ from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_valid
 
 from multiqc import config, report
 from multiqc.core import plot_data_store, tmp_dir
+from multiqc.core.image_cache import ImageCache, figure_hash
 from multiqc.core.log_and_rich import init_log, iterate_using_progress_bar
 from multiqc.core.strict_helpers import lint_error
 from multiqc.plots.utils import check_plotly_version
@@ -522,6 +530,7 @@ class Plot(BaseModel, Generic[DatasetT, PConfigT]):
     axis_controlled_by_switches: List[str] = []
     square: bool = False
     flat: bool = False
+    webgl: bool = False
     defer_render: bool = False
 
     section_anchor: Optional[Anchor] = None
@@ -562,6 +571,7 @@ class Plot(BaseModel, Generic[DatasetT, PConfigT]):
         flat_if_very_large: bool = True,
         series_label: Optional[str] = None,
         n_samples_per_dataset: Optional[List[int]] = None,
+        n_points_per_dataset: Optional[List[int]] = None,
     ) -> "Plot[DatasetT, PConfigT]":
         """
         Initialize a plot model with the given configuration, but without data.
@@ -576,6 +586,8 @@ class Plot(BaseModel, Generic[DatasetT, PConfigT]):
         :param flat_if_very_large: whether to render flat if the number of data points is very large
         :param series_label: label for the series, e.g. "samples" or "statuses"
         :param n_samples_per_dataset: number of actual samples for each dataset (assumes series_label are samples)
+        :param n_points_per_dataset: number of data points for each dataset, for the plot types that can be drawn
+            with WebGL
         """
         if len(n_series_per_dataset) == 0:
             raise ValueError("No datasets to plot")
@@ -596,17 +608,27 @@ class Plot(BaseModel, Generic[DatasetT, PConfigT]):
 
         id = id or pconfig.id
 
+        # Draw with WebGL if the number of points is above the threshold. WebGL plots stay responsive
+        # with many more series than SVG plots, so they are rendered flat only above a higher threshold
+        webgl = bool(
+            n_points_per_dataset
+            and config.plots_webgl_numpoints > 0
+            and max(n_points_per_dataset) > config.plots_webgl_numpoints
+        )
+        if webgl:
+            logger.debug(
+                f"Plot {id} has {max(n_points_per_dataset or [0])} points > config.plots_webgl_numpoints={config.plots_webgl_numpoints}, drawing with WebGL"
+            )
+        flat_numseries_option = "plots_webgl_flat_numseries" if webgl else "plots_flat_numseries"
+        flat_numseries = getattr(config, flat_numseries_option)
+
         # Render static image if the number of samples is above the threshold
         flat = False
         if config.plots_force_flat:
             flat = True
-        if (
-            flat_if_very_large
-            and not config.plots_force_interactive
-            and n_series_per_dataset[0] > config.plots_flat_numseries
-        ):
+        if flat_if_very_large and not config.plots_force_interactive and n_series_per_dataset[0] > flat_numseries:
             logger.debug(
-                f"Plot {id} has {n_series_per_dataset[0]} series > config.plots_flat_numseries={config.plots_flat_numseries}, rendering flat"
+                f"Plot {id} has {n_series_per_dataset[0]} series > config.{flat_numseries_option}={flat_numseries}, rendering flat"
             )
             flat = True
 
@@ -752,6 +774,7 @@ class Plot(BaseModel, Generic[DatasetT, PConfigT]):
             axis_controlled_by_switches=axis_controlled_by_switches,
             square=pconfig.square,
             flat=flat,
+            webgl=webgl,
             defer_render=defer_render,
         )
 
@@ -1015,6 +1038,8 @@ class Plot(BaseModel, Generic[DatasetT, PConfigT]):
                 maxval = math.log10(maxval) if maxval is not None and maxval > 0 else None
             layout[axis].autorangeoptions["minallowed"] = minval
             layout[axis].autorangeoptions["maxallowed"] = maxval
+        if self.webgl and not flat:  # static images are exported from SVG traces
+            kwargs["webgl"] = True
         return dataset.create_figure(layout, is_log, is_pct, **kwargs)
 
     def __repr__(self):
@@ -1188,8 +1213,12 @@ class Plot(BaseModel, Generic[DatasetT, PConfigT]):
                     )
                 )
 
+        img_srcs: List[Optional[str]] = [None] * len(figures_to_export)
+        if embed_in_html:
+            img_srcs = list(embedded_images_html_srcs([fig for fig, *_ in figures_to_export]))
+
         # Add all figures to HTML
-        for fig, active, file_name, embed_in_html, plots_dir_name in figures_to_export:
+        for (fig, active, file_name, embed_in_html, plots_dir_name), img_src in zip(figures_to_export, img_srcs):
             html += fig_to_static_html(
                 fig,
                 active=active,
@@ -1197,6 +1226,7 @@ class Plot(BaseModel, Generic[DatasetT, PConfigT]):
                 plots_dir_name=plots_dir_name,
                 embed_in_html=embed_in_html,
                 batch_processing=True,
+                img_src=img_src,
             )
 
         html += "</div>"
@@ -1341,96 +1371,314 @@ class Plot(BaseModel, Generic[DatasetT, PConfigT]):
         return html
 
 
-class ExportProcess(multiprocessing.Process):
-    def __init__(self, fig, plot_path, write_kwargs):
-        super().__init__()
-        self.fig = fig
-        self.plot_path = plot_path
-        self.write_kwargs = write_kwargs
-        self.exception = None
+# A figure to export, the file to write it to (None to get back the PNG with the logo added, to embed
+# in HTML), and the keyword arguments for `fig.write_image()`
+ExportTask = Tuple[go.Figure, Optional[Path], Dict]
+
+# Logo added to the embedded PNGs
+_LOGO_KWARGS: Dict[str, Any] = dict(text="Created with MultiQC", font_size=16)
+
+
+class ExportResult(NamedTuple):
+    ok: bool
+    png: Optional[bytes] = None  # for the tasks without a file path
+    error: Optional[str] = None
+    timed_out: bool = False
 
-    def run(self):
+
+def _fig_to_png_with_logo(fig: go.Figure, write_kwargs: Dict) -> bytes:
+    img_buffer = io.BytesIO()
+    fig.write_image(img_buffer, **write_kwargs)
+    img_buffer = add_logo(img_buffer, format="PNG", **_LOGO_KWARGS)
+    png = img_buffer.getvalue()
+    img_buffer.close()
+    return png
+
+
+def _export_worker_main(conn: Connection) -> None:
+    """
+    Main loop of an export worker process: receive figures, export them, and send back the results.
+    The process is reused for many figures, so Kaleido is only started once per worker.
+    """
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        fig, plot_path, write_kwargs = task
         try:
-            self.fig.write_image(self.plot_path, **self.write_kwargs)
+            if plot_path is not None:
+                fig.write_image(plot_path, **write_kwargs)
+                result = ExportResult(ok=True)
+            else:
+                result = ExportResult(ok=True, png=_fig_to_png_with_logo(fig, write_kwargs))
         except Exception as e:
-            self.exception = e
+            result = ExportResult(ok=False, error=str(e))
+        conn.send(result)
 
 
-class BatchExportProcess(multiprocessing.Process):
-    def __init__(self, export_tasks):
-        """
-        Initialize a batch export process with multiple tasks
+class _ExportWorker:
+    def __init__(self):
+        ctx = multiprocessing.get_context()
+        self.conn, worker_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_export_worker_main, args=(worker_conn,), daemon=True)
+        self.process.start()
+        worker_conn.close()
+
+    def stop(self, terminate: bool = False):
+        if terminate:
+            self.process.terminate()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                self.process.terminate()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ExportWorkerPool:
+    """
+    Long-lived worker processes exporting figures to images. Each worker keeps its Kaleido instance
+    running between figures. A figure that takes longer than the timeout to export is skipped, and its
+    worker is replaced with a new one, so that a Kaleido freeze only costs that one figure.
+    """
 
-        Args:
-            export_tasks: List of tuples (fig, plot_path, write_kwargs)
+    def __init__(self, n_workers: int):
+        self.n_workers = max(1, n_workers)
+        self.workers: List[Optional[_ExportWorker]] = []
+
+    def imap_unordered(self, tasks: List[ExportTask], timeout: float) -> Iterator[Tuple[int, ExportResult]]:
+        """
+        Distribute the tasks across the workers, and yield the task indexes and results as they finish
         """
-        super().__init__()
-        self.export_tasks = export_tasks
+        while len(self.workers) < min(self.n_workers, len(tasks)):
+            self.workers.append(None)
+
+        pending = deque(range(len(tasks)))
+        running: Dict[int, Tuple[int, float]] = {}  # worker index -> (task index, deadline)
+        try:
+            while pending or running:
+                for w_idx in range(len(self.workers)):
+                    if not pending:
+                        break
+                    if w_idx in running:
+                        continue
+                    worker = self.workers[w_idx]
+                    if worker is None:
+                        worker = self.workers[w_idx] = _ExportWorker()
+                    task_idx = pending.popleft()
+                    try:
+                        worker.conn.send(tasks[task_idx])
+                    except Exception as e:  # the figure can't be pickled, or the worker has exited
+                        if not worker.process.is_alive():
+                            self._discard_worker(w_idx)
+                        yield task_idx, ExportResult(ok=False, error=str(e))
+                        continue
+                    running[w_idx] = (task_idx, time.monotonic() + timeout)
+
+                if not running:
+                    continue
+                conn_to_w_idx = {self.workers[w_idx].conn: w_idx for w_idx in running}  # type: ignore
+                next_deadline = min(deadline for _, deadline in running.values())
+                ready = wait(list(conn_to_w_idx), timeout=max(0.0, next_deadline - time.monotonic()))
+                for conn in ready:
+                    w_idx = conn_to_w_idx[conn]  # type: ignore
+                    task_idx, _ = running.pop(w_idx)
+                    try:
+                        result: ExportResult = conn.recv()  # type: ignore
+                    except (EOFError, OSError):
+                        self._discard_worker(w_idx)
+                        result = ExportResult(ok=False, error="the export process exited unexpectedly")
+                    yield task_idx, result
+
+                now = time.monotonic()
+                for w_idx, (task_idx, deadline) in list(running.items()):
+                    if deadline <= now:
+                        del running[w_idx]
+                        self._discard_worker(w_idx)
+                        yield task_idx, ExportResult(ok=False, error=f"timed out after {timeout}s", timed_out=True)
+        finally:
+            # Stopped before all tasks finished, so the busy workers are not waited for
+            for w_idx in running:
+                self._discard_worker(w_idx)
+
+    def map(self, tasks: List[ExportTask], timeout: float) -> List[ExportResult]:
+        results: List[ExportResult] = [ExportResult(ok=False)] * len(tasks)
+        for task_idx, result in self.imap_unordered(tasks, timeout):
+            results[task_idx] = result
+        return results
+
+    def _discard_worker(self, w_idx: int):
+        worker = self.workers[w_idx]
+        if worker is not None:
+            worker.stop(terminate=True)
+            self.workers[w_idx] = None
+
+    def shutdown(self):
+        for w_idx, worker in enumerate(self.workers):
+            if worker is not None:
+                worker.stop()
+                self.workers[w_idx] = None
+
+
+_export_pool: Optional[ExportWorkerPool] = None
+
+
+def get_export_pool() -> ExportWorkerPool:
+    """
+    Pool of `config.export_plots_workers` processes used for all static plot exports. The workers
+    are started when they are first needed, and kept running until `shutdown_export_pool()`.
+    """
+    global _export_pool
+    if _export_pool is None or _export_pool.n_workers != max(1, config.export_plots_workers):
+        shutdown_export_pool()
+        _export_pool = ExportWorkerPool(config.export_plots_workers)
+    return _export_pool
+
 
-    def run(self):
-        def update_fn(_, item):
-            fig, plot_path, write_kwargs = item
+def shutdown_export_pool():
+    global _export_pool
+    if _export_pool is not None:
+        _export_pool.shutdown()
+        _export_pool = None
+
+
+atexit.register(shutdown_export_pool)
+
+
+_image_cache: Optional[ImageCache] = None
+
+
+def get_image_cache() -> Optional[ImageCache]:
+    """
+    Cache of the exported images from previous runs, if `config.export_plots_cache` is set
+    """
+    global _image_cache
+    if _image_cache is None and config.export_plots_cache:
+        _image_cache = ImageCache.open()
+    return _image_cache
+
+
+def close_image_cache():
+    global _image_cache
+    if _image_cache is not None:
+        _image_cache.close()
+        _image_cache = None
+
+
+atexit.register(close_image_cache)
+
+
+def _image_cache_key(cache: ImageCache, task: ExportTask, fig_hashes: Dict[int, str]) -> str:
+    fig, plot_path, write_kwargs = task
+    if id(fig) not in fig_hashes:  # the same figure is often exported to several formats
+        fig_hashes[id(fig)] = figure_hash(fig)
+    if plot_path is None:
+        return cache.key(fig_hashes[id(fig)], write_kwargs, "png", logo=_LOGO_KWARGS)
+    return cache.key(fig_hashes[id(fig)], write_kwargs, plot_path.suffix.lstrip(".").lower())
+
+
+def _export_with_cache(tasks: List[ExportTask], timeout: float) -> Iterator[Tuple[int, ExportResult]]:
+    """
+    Same as `ExportWorkerPool.imap_unordered()`, but the images found in the image cache are taken
+    from there instead of being exported, and the newly exported images are added to the cache
+    """
+    cache = get_image_cache()
+    if cache is None:
+        yield from get_export_pool().imap_unordered(tasks, timeout)
+        return
+
+    fig_hashes: Dict[int, str] = {}
+    keys = [_image_cache_key(cache, task, fig_hashes) for task in tasks]
+    to_export: List[int] = []
+    for task_idx, ((_, plot_path, _), key) in enumerate(zip(tasks, keys)):
+        if plot_path is None:
+            png = cache.get_bytes(key)
+            if png is not None:
+                yield task_idx, ExportResult(ok=True, png=png)
+                continue
+        elif (cached_path := cache.get(key)) is not None:
             try:
-                fig.write_image(plot_path, **write_kwargs)
-            except Exception as e:
-                logger.error(f"Error exporting plot to {plot_path}: {e}")
+                shutil.copyfile(cached_path, plot_path)
+            except OSError as e:
+                logger.debug(f"Could not copy the cached image {cached_path} to {plot_path}: {e}")
+            else:
+                yield task_idx, ExportResult(ok=True)
+                continue
+        to_export.append(task_idx)
+
+    for idx, result in get_export_pool().imap_unordered([tasks[task_idx] for task_idx in to_export], timeout):
+        task_idx = to_export[idx]
+        _, plot_path, _ = tasks[task_idx]
+        if result.ok:
+            if plot_path is None:
+                if result.png is not None:
+                    cache.put_bytes(keys[task_idx], result.png)
+            elif plot_path.exists() and plot_path.stat().st_size > 0:
+                cache.put_file(keys[task_idx], plot_path)
+        yield task_idx, result
 
-        def item_to_str_fn(item) -> str:
-            _, plot_path, _ = item
-            return str(plot_path)
 
-        init_log()
+def _export_map(tasks: List[ExportTask], timeout: float) -> List[ExportResult]:
+    results: List[ExportResult] = [ExportResult(ok=False)] * len(tasks)
+    for task_idx, result in _export_with_cache(tasks, timeout):
+        results[task_idx] = result
+    return results
 
-        iterate_using_progress_bar(
-            items=self.export_tasks,
-            update_fn=update_fn,
-            item_to_str_fn=item_to_str_fn,
-            desc="Exporting plots",
+
+def _log_export_failure(plot_path: Path, result: ExportResult):
+    if result.timed_out:
+        logger.warning(
+            f"Plot export timed out after {config.export_plots_timeout}s: {plot_path}. "
+            "This is likely due to a known issue in Kaleido. "
+            "The plot will be skipped but the report will continue to generate."
         )
+    else:
+        logger.error(f"Error exporting plot to {plot_path}: {result.error}")
 
 
-def _batch_export_plots(export_tasks, timeout=None):
-    """Export multiple plotly figures to files in a single process.
+def _batch_export_plots(export_tasks: List[ExportTask], timeout: Optional[float] = None) -> Set[int]:
+    """Export multiple plotly figures to files, distributing them across the export workers.
 
     Args:
         export_tasks: List of tuples (fig, plot_path, write_kwargs)
-        timeout: Timeout in seconds, default from config
+        timeout: Timeout in seconds for each plot, default from config
 
     Returns:
         Set of indexes for successfully exported plots
     """
-    # Default timeout from config
     if timeout is None:
-        timeout = config.export_plots_timeout if hasattr(config, "export_plots_timeout") else 30
-
-    # Start the export in a separate process
-    export_process = BatchExportProcess(export_tasks)
-    export_process.start()
-    export_process.join(timeout)
+        timeout = config.export_plots_timeout
 
+    results = _export_with_cache(export_tasks, timeout)
     completed_tasks = set()
 
-    if export_process.is_alive():
-        # Check which files were actually written
-        for idx, (_, plot_path, _) in enumerate(export_tasks):
-            if plot_path.exists() and plot_path.stat().st_size > 0:
-                completed_tasks.add(idx)
+    def update_fn(_, __):
+        task_idx, result = next(results)
+        _, plot_path, _ = export_tasks[task_idx]
+        assert plot_path is not None
+        if not result.ok:
+            _log_export_failure(plot_path, result)
+        elif plot_path.exists() and plot_path.stat().st_size > 0:
+            completed_tasks.add(task_idx)
+
+    def item_to_str_fn(item) -> str:
+        _, plot_path, _ = item
+        return str(plot_path)
+
+    iterate_using_progress_bar(
+        items=export_tasks,
+        update_fn=update_fn,
+        item_to_str_fn=item_to_str_fn,
+        desc="Exporting plots",
+    )
 
-        # If process is still running after timeout, log warning and continue
-        logger.warning(
-            f"Batch plot export timed out after {timeout}s. "
-            f"Only {len(completed_tasks)} of {len(export_tasks)} plots were exported. "
-            "This is likely due to a known issue in Kaleido. "
-            "The remaining plots will be skipped but the report will continue to generate."
-        )
-        # Kill the process
-        export_process.terminate()
-        return completed_tasks
-
-    # Verify which files were actually written
-    for idx, (_, plot_path, _) in enumerate(export_tasks):
-        if plot_path.exists() and plot_path.stat().st_size > 0:
-            completed_tasks.add(idx)
     if len(completed_tasks) < len(export_tasks):
         logger.warning(
             f"Some plot exports failed or produced empty files: {len(completed_tasks)}/{len(export_tasks)} completed"
@@ -1439,56 +1687,75 @@ def _batch_export_plots(export_tasks, timeout=None):
     return completed_tasks
 
 
-def _export_plot(fig, plot_path, write_kwargs):
+def _export_plot(fig, plot_path, write_kwargs) -> bool:
     """Export a plotly figure to a file."""
+    result = _export_map([(fig, plot_path, write_kwargs)], config.export_plots_timeout)[0]
+    if not result.ok:
+        _log_export_failure(plot_path, result)
+    return result.ok
 
-    # Default timeout of 30 seconds for image export
-    timeout = config.export_plots_timeout if hasattr(config, "export_plots_timeout") else 30
 
-    # Start the export in a separate process
-    export_process = ExportProcess(fig, plot_path, write_kwargs)
-    export_process.start()
-    export_process.join(timeout)
+def _export_plots_to_buffers(figs_and_write_kwargs: List[Tuple[go.Figure, Dict]]) -> List[Optional[str]]:
+    """
+    Export figures to PNGs with the logo added, as base64 data URIs to embed in HTML. Figures are
+    exported in parallel across the export workers. None for the figures that failed to export.
+    """
+    tasks: List[ExportTask] = [(fig, None, write_kwargs) for fig, write_kwargs in figs_and_write_kwargs]
+    img_srcs: List[Optional[str]] = []
+    for result in _export_map(tasks, config.export_plots_timeout):
+        if result.ok and result.png is not None:
+            b64_img = base64.b64encode(result.png).decode("utf8")
+            img_srcs.append(f"data:image/png;base64,{b64_img}")
+        else:
+            logger.error(f"Unable to export PNG figure to static image: {result.error}")
+            img_srcs.append(None)
+    return img_srcs
 
-    if export_process.is_alive():
-        # If process is still running after timeout, log warning and continue
-        logger.warning(
-            f"Plot export timed out after {timeout}s: {plot_path}. "
-            "This is likely due to a known issue in Kaleido. "
-            "The plot will be skipped but the report will continue to generate."
+
+def _export_plot_to_buffer(fig, write_kwargs) -> Optional[str]:
+    return _export_plots_to_buffers([(fig, write_kwargs)])[0]
+
+
+plot_export_has_failed: bool = False
+
+
+def _check_static_export_possible():
+    if is_running_under_rosetta():
+        raise ValueError(
+            "Detected Rosetta process, meaning running in an x86_64 container hosted by Apple Silicon. "
+            "Plot export is unstable and will be skipped"
         )
-        # Kill the process
-        export_process.terminate()
-        return False
-    if export_process.exception:
-        # If there was an exception in the process, log it
-        logger.error(f"Error exporting plot to {plot_path}: {export_process.exception}")
-        return False
 
-    return True
+    if plot_export_has_failed:
+        raise ValueError("Could not previously export a plots, so won't try again")
 
 
-def _export_plot_to_buffer(fig, write_kwargs) -> Optional[str]:
-    try:
-        img_buffer = io.BytesIO()
-        fig.write_image(img_buffer, **write_kwargs)
-        img_buffer = add_logo(img_buffer, format="PNG")
-        # Convert to a base64 encoded string
-        b64_img = base64.b64encode(img_buffer.getvalue()).decode("utf8")
-        img_src = f"data:image/png;base64,{b64_img}"
-        img_buffer.close()
-    except Exception as e:
-        logger.error(f"Unable to export PNG figure to static image: {e}")
-        return None
-    else:
-        return img_src
+def _static_write_kwargs(fig: go.Figure) -> Dict:
+    assert fig.layout.width
+    scale = 2.0  # higher detail (to look sharp on the retina display)
+    scale *= config.plots_export_font_scale  # bigger font if configured in the settings
+    return dict(
+        width=fig.layout.width / config.plots_export_font_scale,  # While interactive plots take full width of screen,
+        # for the flat plots we explicitly set width
+        height=fig.layout.height / config.plots_export_font_scale,
+        scale=scale,  # higher detail (retina display)
+    )
 
 
-plot_export_has_failed: bool = False
+def embedded_images_html_srcs(figs: List[go.Figure]) -> List[str]:
+    """
+    Export figures to PNG images to embed in HTML, all at once so that they are spread across the
+    export workers. Raises ValueError if any of them couldn't be exported.
+    """
+    _check_static_export_possible()
+    img_srcs = _export_plots_to_buffers([(fig, _static_write_kwargs(fig)) for fig in figs])
+    if any(img_src is None for img_src in img_srcs):
+        raise ValueError("Unable to export PNG figure to static image")
+    return cast(List[str], img_srcs)
 
 
 # Collect plot exports for batch processing
-_plot_export_batch: List[Tuple[go.Figure, Path, Dict]] = []
+_plot_export_batch: List[ExportTask] = []
 _plot_export_batch_results: Dict[int, bool] = {}  # Mapping of plot_path to success status
 
 
@@ -1500,6 +1767,7 @@ def fig_to_static_html(
     plots_dir_name: Optional[str] = None,
     file_name: Optional[str] = None,
     batch_processing: bool = True,
+    img_src: Optional[str] = None,
 ) -> str:
     """
     Build one static image, return an HTML wrapper.
@@ -1512,30 +1780,16 @@ def fig_to_static_html(
         plots_dir_name: Directory for exported plots
         file_name: File name for the plot
         batch_processing: Whether to use batch processing for exports
+        img_src: Embedded image already exported with `embedded_images_html_srcs()`
     """
     global _plot_export_batch, _plot_export_batch_results, plot_export_has_failed
 
-    if is_running_under_rosetta():
-        raise ValueError(
-            "Detected Rosetta process, meaning running in an x86_64 container hosted by Apple Silicon. "
-            "Plot export is unstable and will be skipped"
-        )
-
-    if plot_export_has_failed:
-        raise ValueError("Could not previously export a plots, so won't try again")
+    _check_static_export_possible()
 
     embed_in_html = embed_in_html if embed_in_html is not None else not config.development
     export_plots = export_plots if export_plots is not None else config.export_plots
 
-    assert fig.layout.width
-    scale = 2.0  # higher detail (to look sharp on the retina display)
-    scale *= config.plots_export_font_scale  # bigger font if configured in the settings
-    write_kwargs = dict(
-        width=fig.layout.width / config.plots_export_font_scale,  # While interactive plots take full width of screen,
-        # for the flat plots we explicitly set width
-        height=fig.layout.height / config.plots_export_font_scale,
-        scale=scale,  # higher detail (retina display)
-    )
+    write_kwargs = _static_write_kwargs(fig)
 
     formats = set(config.export_plot_formats) if export_plots else set()
     if not embed_in_html and "png" not in formats:
@@ -1594,7 +1848,7 @@ def fig_to_static_html(
         if not png_is_written:  # Could not write in the block above
             raise ValueError(f"Unable to export plot to PNG image {file_name}")
         img_src = str(img_path)
-    else:
+    elif img_src is None:
         _img_src = _export_plot_to_buffer(fig, write_kwargs)
         if _img_src is None:
             raise ValueError("Unable to export PNG figure to static image")
@@ -1612,14 +1866,15 @@ def fig_to_static_html(
 
 
 def process_batch_exports():
-    """Process all batched exports in a single process"""
+    """Process all batched exports in the pool of export workers, and stop the workers"""
     global _plot_export_batch, _plot_export_batch_results, plot_export_has_failed
 
     if not _plot_export_batch:
+        shutdown_export_pool()
+        close_image_cache()
         return
 
     try:
-        # Process all exports in a single process
         completed_indexes = _batch_export_plots(_plot_export_batch)
 
         # Record results
@@ -1635,7 +1890,7 @@ def process_batch_exports():
             for idx in range(len(_plot_export_batch)):
                 if idx not in completed_indexes:
                     _, plot_path, _ = _plot_export_batch[idx]
-                    if plot_path.suffix.lower() == ".png":
+                    if plot_path is not None and plot_path.suffix.lower() == ".png":
                         png_failures.append(str(plot_path))
 
             if png_failures:
@@ -1648,6 +1903,9 @@ def process_batch_exports():
     _plot_export_batch = []
     _plot_export_batch_results = {}
 
+    shutdown_export_pool()
+    close_image_cache()
+
 
 def add_logo(
     img_buffer: io.BytesIO,
@@ -271,11 +271,13 @@ class Dataset(BaseDataset):
         layout: go.Layout,
         is_log: bool = False,
         is_pct: bool = False,
+        webgl: bool = False,
         **kwargs,
     ) -> go.Figure:
         """
         Create a Plotly figure for a dataset
         """
+        trace_cls = go.Scattergl if webgl else go.Scatter
         fig = go.Figure(layout=layout)
         MAX_ANNOTATIONS = 10  # Maximum number of dots to be annotated directly on the plot
         n_annotated = len([el for el in self.points if "annotation" in el])
@@ -371,7 +373,7 @@ class Dataset(BaseDataset):
                 marker["line"]["color"] = "rgba(0, 0, 0, .2)"
 
             fig.add_trace(
-                go.Scatter(
+                trace_cls(
                     x=[x],
                     y=[el["y"]],
                     name=name,
@@ -456,6 +458,7 @@ class ScatterPlot(Plot[Dataset, ScatterConfig]):
             pconfig=pconfig,
             anchor=anchor,
             n_series_per_dataset=[len(x) for x in points_lists],
+            n_points_per_dataset=[len(x) for x in points_lists],
             default_tt_label="<br><b>X</b>: %{x}<br><b>Y</b>: %{y}",
         )
 
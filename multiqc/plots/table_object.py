@@ -3,14 +3,29 @@ MultiQC datatable class, used by tables and violin plots
 """
 
 import logging
-import math
 import re
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Mapping, NewType, Optional, Sequence, Set, Tuple, TypedDict, Union, cast
-
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    NewType,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypedDict,
+    Union,
+    cast,
+)
+
+import numpy as np
 from natsort import natsorted
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from multiqc import config, report
 from multiqc.plots.plot import PConfig
@@ -320,13 +335,152 @@ class Row(BaseModel):
     data: Dict[ColumnKey, Cell] = dict()
 
 
+class SectionRow(NamedTuple):
+    """
+    Row of a table section: the sample group it belongs to, and the sample name
+    """
+
+    group: SampleGroup
+    sample: SampleName
+
+
+@dataclass
+class ColumnValues:
+    """
+    Processed values of a single column in a table section, one item per row of the section.
+    Rows that don't have a value in this column hold None in all three lists.
+    """
+
+    raw: List[Optional[ValueT]]
+    mod: List[Optional[ValueT]]
+    fmt: List[Optional[str]]
+
+    @staticmethod
+    def empty(n_rows: int) -> "ColumnValues":
+        return ColumnValues(raw=[None] * n_rows, mod=[None] * n_rows, fmt=[None] * n_rows)
+
+    def extend(self, n_rows: int) -> None:
+        """
+        Add empty values for new rows
+        """
+        self.raw.extend([None] * n_rows)
+        self.mod.extend([None] * n_rows)
+        self.fmt.extend([None] * n_rows)
+
+    def has_value(self, row_idx: int) -> bool:
+        return self.fmt[row_idx] is not None
+
+    def cell(self, row_idx: int) -> Optional[Cell]:
+        fmt = self.fmt[row_idx]
+        if fmt is None:
+            return None
+        return Cell(raw=self.raw[row_idx], mod=self.mod[row_idx], fmt=fmt)  # type: ignore
+
+    def set_cell(self, row_idx: int, cell: Cell) -> None:
+        self.raw[row_idx] = cell.raw
+        self.mod[row_idx] = cell.mod
+        self.fmt[row_idx] = cell.fmt
+
+    def floats(self, numeric_only: bool = False) -> np.ndarray:
+        """
+        Values as a float array, NaN for missing values and values that can't be converted.
+        The modified value is used, or the raw value if modifying returned None. With `numeric_only`,
+        only int, float and bool values are kept, otherwise strings are parsed as well.
+        """
+        res = np.full(len(self.fmt), np.nan)
+        for row_idx, fmt in enumerate(self.fmt):
+            if fmt is None:
+                continue
+            val = self.mod[row_idx]
+            if val is None:
+                val = self.raw[row_idx]
+            if isinstance(val, (int, float)):
+                res[row_idx] = val
+            elif not numeric_only:
+                try:
+                    res[row_idx] = float(val)  # type: ignore
+                except (TypeError, ValueError):
+                    pass
+        return res
+
+
 class TableSection(BaseModel):
     """
-    Table section class. Holds configuration for a single section in a table.
+    Table section class. Holds configuration for a single section in a table. Values are stored
+    column by column: `values_by_key` holds a list of values for each column, aligned with `rows`.
     """
 
     column_by_key: Dict[ColumnKey, ColumnMeta]
-    rows_by_sgroup: Dict[SampleGroup, List[Row]] = defaultdict(list)
+    rows: List[SectionRow] = []
+    values_by_key: Dict[ColumnKey, ColumnValues] = {}
+
+    @model_validator(mode="before")
+    @classmethod
+    def _convert_rows_by_sgroup(cls, data: Any) -> Any:
+        """
+        Sections dumped by older versions hold a list of row objects for each sample group
+        """
+        if isinstance(data, dict) and "rows_by_sgroup" in data:
+            data = dict(data)
+            rows: List[SectionRow] = []
+            cell_by_row_by_key: Dict[ColumnKey, Dict[int, Dict[str, Any]]] = defaultdict(dict)
+            for g_name, group_rows in data.pop("rows_by_sgroup").items():
+                for row in group_rows:
+                    row = row.model_dump() if isinstance(row, Row) else row
+                    for col_key, cell in row["data"].items():
+                        cell = cell.__dict__ if isinstance(cell, Cell) else cell
+                        cell_by_row_by_key[ColumnKey(col_key)][len(rows)] = cell
+                    rows.append(SectionRow(SampleGroup(g_name), SampleName(row["sample"])))
+            values_by_key: Dict[ColumnKey, ColumnValues] = {}
+            for col_key, cell_by_row in cell_by_row_by_key.items():
+                values = ColumnValues.empty(len(rows))
+                for row_idx, cell in cell_by_row.items():
+                    values.set_cell(row_idx, Cell(raw=cell["raw"], mod=cell["mod"], fmt=cell["fmt"]))
+                values_by_key[col_key] = values
+            data["rows"] = rows
+            data["values_by_key"] = values_by_key
+        return data
+
+    @property
+    def rows_by_sgroup(self) -> Dict[SampleGroup, List[Row]]:
+        """
+        Row objects grouped by sample group. Built from the columns on every call,
+        so prefer `rows` and `values_by_key` when processing the whole section.
+        """
+        rows_by_sgroup: Dict[SampleGroup, List[Row]] = defaultdict(list)
+        for row_idx, (g_name, s_name) in enumerate(self.rows):
+            row = Row(sample=s_name)
+            for col_key, values in self.values_by_key.items():
+                cell = values.cell(row_idx)
+                if cell is not None:
+                    row.data[col_key] = cell
+            rows_by_sgroup[g_name].append(row)
+        return dict(rows_by_sgroup)
+
+    def group_rows(self) -> None:
+        """
+        Reorder rows so that the rows of each sample group are next to each other, keeping
+        groups in the order of their first row. New rows of existing groups are appended
+        at the end when merging sections.
+        """
+        first_row_idx_by_sgroup = self.first_row_idx_by_sgroup()
+        order = sorted(range(len(self.rows)), key=lambda row_idx: first_row_idx_by_sgroup[self.rows[row_idx].group])
+        if order == list(range(len(self.rows))):
+            return
+        self.rows = [self.rows[row_idx] for row_idx in order]
+        for values in self.values_by_key.values():
+            values.raw = [values.raw[row_idx] for row_idx in order]
+            values.mod = [values.mod[row_idx] for row_idx in order]
+            values.fmt = [values.fmt[row_idx] for row_idx in order]
+
+    def first_row_idx_by_sgroup(self) -> Dict[SampleGroup, int]:
+        """
+        Index of the first row of each sample group
+        """
+        res: Dict[SampleGroup, int] = {}
+        for row_idx, (g_name, _) in enumerate(self.rows):
+            res.setdefault(g_name, row_idx)
+        return res
 
 
 SECTION_COLORS = [
@@ -361,9 +515,7 @@ class DataTable(BaseModel):
         """
         Check if the table is empty.
         """
-        return not self.section_by_id or not any(
-            section.rows_by_sgroup.values() for section in self.section_by_id.values()
-        )
+        return not self.section_by_id or not any(section.rows for section in self.section_by_id.values())
 
     @staticmethod
     def create(
@@ -419,30 +571,36 @@ class DataTable(BaseModel):
                     col_dict=col_dict, col_key=col_key, sec_idx=sec_idx, pconfig=pconfig, table_anchor=table_anchor
                 )
 
-            # Filter out null values and columns that are not present in column_by_key,
-            # and apply "modify" and "format" to values. Will generate non-null data and str data.
-            section = TableSection(column_by_key=column_by_key)
+            # Filter out null values and columns that are not present in column_by_key, and split
+            # the rows into columns. Rows without any values are skipped.
+            rows: List[SectionRow] = []
+            input_by_row_by_key: Dict[ColumnKey, Dict[int, ExtValueT]] = {col_key: {} for col_key in column_by_key}
             for g_name, group_rows__with_nulls in rows_by_sname__with_nulls.items():
                 for input_row in group_rows__with_nulls:
-                    row = Row(sample=input_row.sample)
+                    row_idx = len(rows)
+                    has_values = False
                     for col_key, optional_val in input_row.data.items():
-                        if col_key not in column_by_key:  # missing in provided headers
+                        input_by_row = input_by_row_by_key.get(col_key)
+                        if input_by_row is None:  # missing in provided headers
                             continue
-                        if optional_val is None or str(optional_val).strip() == "":  # empty
+                        if optional_val is None or isinstance(optional_val, str) and optional_val.strip() == "":
                             continue
-                        val_obj = _process_and_format_value(
-                            optional_val, column_by_key[col_key], parse_numeric=pconfig.parse_numeric
-                        )
-                        row.data[col_key] = val_obj
-                    if row.data:
-                        section.rows_by_sgroup[g_name].append(row)
-
-            # Remove empty groups:
-            section.rows_by_sgroup = {sname: rows for sname, rows in section.rows_by_sgroup.items() if rows}
-
-            # Work out max and min value if not given:
+                        input_by_row[row_idx] = optional_val
+                        has_values = True
+                    if has_values:
+                        rows.append(SectionRow(g_name, input_row.sample))
+
+            # Apply "modify" and "format" to values column by column. Will generate non-null data and str data.
+            section = TableSection(column_by_key=column_by_key, rows=rows)
+            first_row_idxs = list(section.first_row_idx_by_sgroup().values())
             for col_key, column in column_by_key.items():
-                _determine_dmin_and_dmax(column, col_key, section.rows_by_sgroup)
+                values = _process_and_format_column(
+                    input_by_row_by_key[col_key], len(rows), column, parse_numeric=pconfig.parse_numeric
+                )
+                section.values_by_key[col_key] = values
+
+                # Work out max and min value if not given:
+                _determine_dmin_and_dmax(column, values, first_row_idxs)
 
             sections[section_key] = section
 
@@ -531,27 +689,38 @@ class DataTable(BaseModel):
                         section.column_by_key[col_key] = new_col_meta
 
                 # Update row data
-                for group_name, new_rows in new_section.rows_by_sgroup.items():
-                    existing_rows = section.rows_by_sgroup.get(group_name, [])
-                    existing_samples = {row.sample for row in existing_rows}
-
-                    for new_row in new_rows:
-                        if new_row.sample in existing_samples:
-                            # Update existing sample data
-                            for i, row in enumerate(existing_rows):
-                                if row.sample == new_row.sample:
-                                    row.data.update(new_row.data)
-                                    existing_rows[i] = row
-                                    break
-                        else:
-                            # Add new sample
-                            existing_rows.append(new_row)
-
-                    section.rows_by_sgroup[group_name] = existing_rows
+                n_rows = len(section.rows)
+                row_idx_by_sample: Dict[SectionRow, int] = {}
+                for row_idx, row in enumerate(section.rows):
+                    row_idx_by_sample.setdefault(row, row_idx)
+                new_row_idxs: List[int] = []
+                for row in new_section.rows:
+                    if row in row_idx_by_sample:
+                        # Update existing sample data
+                        new_row_idxs.append(row_idx_by_sample[row])
+                    else:
+                        # Add new sample
+                        new_row_idxs.append(len(section.rows))
+                        section.rows.append(row)
+                for values in section.values_by_key.values():
+                    values.extend(len(section.rows) - n_rows)
+                for col_key, new_values in new_section.values_by_key.items():
+                    col_values = section.values_by_key.get(col_key)
+                    if col_values is None:
+                        col_values = section.values_by_key[col_key] = ColumnValues.empty(len(section.rows))
+                    for new_row_idx, row_idx in enumerate(new_row_idxs):
+                        cell = new_values.cell(new_row_idx)
+                        if cell is not None:
+                            col_values.set_cell(row_idx, cell)
+                for col_key in section.column_by_key:
+                    if col_key not in section.values_by_key:
+                        section.values_by_key[col_key] = ColumnValues.empty(len(section.rows))
+                section.group_rows()
 
                 # Work out max and min value if not given:
+                first_row_idxs = list(section.first_row_idx_by_sgroup().values())
                 for col_key, column in section.column_by_key.items():
-                    _determine_dmin_and_dmax(column, col_key, section.rows_by_sgroup)
+                    _determine_dmin_and_dmax(column, section.values_by_key[col_key], first_row_idxs)
 
             else:
                 # Add new section if no match found
@@ -687,52 +856,77 @@ def _process_and_format_value(val: ExtValueT, column: ColumnMeta, parse_numeric:
     return Cell(raw=val_unmodified, mod=val, fmt=valstr)
 
 
+def _process_and_format_column(
+    input_by_row: Mapping[int, ExtValueT],
+    n_rows: int,
+    column: ColumnMeta,
+    parse_numeric: bool = True,
+) -> ColumnValues:
+    """
+    Process and format the values of a column, given as a mapping from row index to value
+    """
+    values = ColumnValues.empty(n_rows)
+    for row_idx, val in input_by_row.items():
+        values.set_cell(row_idx, _process_and_format_value(val, column, parse_numeric=parse_numeric))
+    return values
+
+
 def _determine_dmin_and_dmax(
     column: ColumnMeta,
-    col_key: ColumnKey,
-    rows_by_sample: Dict[SampleGroup, List[Row]],
+    values: ColumnValues,
+    row_idxs: List[int],
 ) -> None:
     """
     Work out max and min value in a column if not given, to support color scale.
+    Only takes the rows with `row_idxs` into account, i.e. the first row of each sample group.
     """
 
     set_dmax = False
     if column.max is not None:
-        column.dmax = float(column.max)
+        dmax = float(column.max)
     else:
-        column.dmax = 0
+        dmax = 0
         set_dmax = True
 
     set_dmin = False
     if column.min is not None:
-        column.dmin = float(column.min)
+        dmin = float(column.min)
     else:
-        column.dmin = 0
+        dmin = 0
         set_dmin = True
 
     # Figure out the min / max if not supplied
     if set_dmax or set_dmin:
-        for _, rows in rows_by_sample.items():
-            v_by_col = rows[0].data
-            try:
-                val = v_by_col[col_key].mod if v_by_col[col_key].mod is not None else v_by_col[col_key].raw
-                if isinstance(val, float) or isinstance(val, int) and math.isfinite(val) and not math.isnan(val):
-                    if set_dmax:
-                        column.dmax = max(column.dmax, val)
-                    if set_dmin:
-                        column.dmin = min(column.dmin, val)
-            except KeyError:
-                pass  # missing data - skip
+        floats = values.floats(numeric_only=True)[row_idxs]
+        finite_idxs = np.flatnonzero(~np.isnan(floats))
+        if len(finite_idxs) > 0:
+            # Take the original value to keep its type, as Python's min() and max() would
+            if set_dmax:
+                val = _effective_value(values, row_idxs[finite_idxs[np.argmax(floats[finite_idxs])]])
+                if val > dmax:
+                    dmax = val
+            if set_dmin:
+                val = _effective_value(values, row_idxs[finite_idxs[np.argmin(floats[finite_idxs])]])
+                if val < dmin:
+                    dmin = val
 
         # Limit auto-generated scales with floor, ceiling and minrange.
         if column.ceiling is not None and column.max is None:
-            column.dmax = min(column.dmax, float(column.ceiling))
+            dmax = min(dmax, float(column.ceiling))
         if column.floor is not None and column.min is None:
-            column.dmin = max(column.dmin, float(column.floor))
+            dmin = max(dmin, float(column.floor))
         if column.minrange is not None:
-            ddiff = column.dmax - column.dmin
+            ddiff = dmax - dmin
             if ddiff < float(column.minrange):
-                column.dmax = column.dmin + float(column.minrange)
+                dmax = dmin + float(column.minrange)
+
+    column.dmax = dmax
+    column.dmin = dmin
+
+
+def _effective_value(values: ColumnValues, row_idx: int) -> Any:
+    val = values.mod[row_idx]
+    return val if val is not None else values.raw[row_idx]
 
 
 def _collect_shared_keys(sections: Dict[SectionKey, TableSection]) -> Dict[str, Dict[str, Union[int, float]]]:
@@ -761,6 +955,102 @@ def _collect_shared_keys(sections: Dict[SectionKey, TableSection]) -> Dict[str,
     return shared_keys
 
 
+class VirtualCell(NamedTuple):
+    """
+    Cell of a table with virtual scrolling, rendered in the browser. `colour` is the background
+    colour of the whole cell if there is no `bar`, or the colour of the bar. If the bar colour is None,
+    it's calculated in the browser from the column colour scale.
+    """
+
+    html: str
+    val: ValueT
+    bar: Optional[float]
+    colour: Optional[str]
+
+
+def _virtual_table_data(
+    table_anchor: Anchor,
+    group_names: List[SampleGroup],
+    cells_by_group: Mapping[SampleGroup, Mapping[SampleName, Mapping[ColumnAnchor, VirtualCell]]],
+    col_anchors: List[ColumnAnchor],
+    col_to_vscale: Dict[ColumnAnchor, Dict[str, Any]],
+) -> str:
+    """
+    Compressed JSON with the rows of a table with virtual scrolling, stored column by column
+    """
+    rows: List[Tuple[SampleGroup, SampleName]] = [
+        (g_name, s_name) for g_name in group_names for s_name in cells_by_group[g_name]
+    ]
+    columns: Dict[ColumnAnchor, Dict[str, Any]] = {}
+    for col_anchor in col_anchors:
+        cells = [cells_by_group[g_name][s_name].get(col_anchor) for g_name, s_name in rows]
+        column: Dict[str, Any] = {
+            "html": [c.html if c is not None else None for c in cells],
+            "val": [c.val if c is not None else None for c in cells],
+        }
+        if any(c is not None and c.bar is not None for c in cells):
+            column["bar"] = [c.bar if c is not None else None for c in cells]
+        if any(c is not None and c.colour is not None for c in cells):
+            column["colour"] = [c.colour if c is not None else None for c in cells]
+        if col_anchor in col_to_vscale:
+            column["scale"] = col_to_vscale[col_anchor]
+        columns[col_anchor] = column
+
+    data = {"rows": rows, "columns": columns}
+    return (
+        f'<script type="text/plain" class="mqc_virtual_table_data" data-table-anchor="{table_anchor}">'
+        f"{report.compress_json(data)}</script>"
+    )
+
+
+def _bar_percentages(
+    header: ColumnMeta, values: ColumnValues, c_scale: Optional[mqc_colour.mqc_colour_scale]
+) -> List[float]:
+    """
+    Width of the background bar of each cell in a column, in percent of the column range
+    """
+    if not c_scale or c_scale.name in c_scale.qualitative_scales:
+        return [100.0] * len(values.fmt)
+    dmin = header.dmin
+    dmax = header.dmax
+    if dmin is None or dmax is None or dmax == dmin:
+        return [0.0] * len(values.fmt)
+
+    floats = values.floats()
+    # Treat 0 as 0-width and make bars width of absolute value
+    if header.bars_zero_centrepoint:
+        dmax = max(abs(dmin), abs(dmax))
+        dmin = 0
+        floats = np.abs(floats)
+    with np.errstate(invalid="ignore", over="ignore"):
+        percentages = ((floats - dmin) / (dmax - dmin)) * 100
+    # Values that can't be parsed as numbers get a 0-width bar
+    percentages[np.isnan(percentages)] = 0.0
+    return [100 if p > 100 else 0 if p < 0 else p for p in percentages.tolist()]
+
+
+def _cell_colours(
+    header: ColumnMeta, values: ColumnValues, c_scale: Optional[mqc_colour.mqc_colour_scale], source: str
+) -> List[str]:
+    """
+    Background colour of each cell in a column from the colour scale, computed for the whole column at once.
+    Cells that are empty, have a categorical background colour, or hold unhashable values get no colour.
+    """
+    if c_scale is None:
+        return [""] * len(values.fmt)
+    scaled: List[Optional[ValueT]] = []
+    for row_idx, val in enumerate(values.mod):
+        if not values.has_value(row_idx) or (isinstance(val, str) and val in header.bgcols):
+            val = None
+        else:
+            try:
+                hash(val)
+            except TypeError:
+                val = None
+        scaled.append(val)
+    return c_scale.get_colours_for_values(scaled, source=source)
+
+
 def render_html(
     dt: DataTable,
     violin_anchor: Anchor,
@@ -793,6 +1083,18 @@ def render_html(
     )
     # empty_cells: Dict[ColumnKeyT, str] = dict()
     hidden_cols = 1
+
+    # Tables with many rows are embedded as data, and the browser renders only the rows that are scrolled into view
+    n_rows = len({row for section in dt.section_by_id.values() for row in section.rows})
+    virtual = not config.simple_output and 0 < config.table_virtual_scroll_rows < n_rows
+    group_to_sample_to_anchor_to_vcell: Dict[SampleGroup, Dict[SampleName, Dict[ColumnAnchor, VirtualCell]]] = (
+        defaultdict(lambda: defaultdict(dict))
+    )
+    col_to_vscale: Dict[ColumnAnchor, Dict[str, Any]] = dict()
+    # Cells by sample group and sample, in the order the rows are added
+    cells_by_group: Mapping[SampleGroup, Mapping[SampleName, Mapping[ColumnAnchor, Any]]] = (
+        group_to_sample_to_anchor_to_vcell if virtual else group_to_sample_to_anchor_to_td
+    )
     table_title = dt.pconfig.title
 
     def escape(s: str) -> str:
@@ -855,6 +1157,17 @@ def render_html(
                 maxval=header.dmax,
                 id=dt.id,
             )
+            if (
+                virtual
+                and c_scale.name not in c_scale.qualitative_scales
+                and all(c.startswith("#") for c in c_scale.colours)
+            ):
+                # Sequential scales are applied in the browser
+                col_to_vscale[col_anchor] = {
+                    "colours": c_scale.colours,
+                    "min": c_scale.minval,
+                    "max": c_scale.maxval,
+                }
 
         # Collect conditional formatting config
         cond_formatting_rules: Dict[str, Dict[str, List[Dict[str, Union[str, int, float]]]]] = {}
@@ -867,155 +1180,148 @@ def render_html(
 
         # Add the data table cells
         section = list(dt.section_by_id.values())[idx]
-        for group_name, group_rows in section.rows_by_sgroup.items():
-            for row_idx, row in enumerate(group_rows):
-                if col_key not in row.data:
-                    continue
-
-                val: ValueT = row.data[col_key].mod
-                valstr: str = row.data[col_key].fmt
-
-                group_to_sample_to_anchor_to_val[group_name][row.sample][col_anchor] = val
-                group_to_sample_to_nice_name_to_val[group_name][row.sample][col_key] = val
-
-                if c_scale and c_scale.name not in c_scale.qualitative_scales:
-                    dmin = header.dmin
-                    dmax = header.dmax
-                    if dmin is not None and dmax is not None and dmax != dmin:
-                        try:
-                            val_float = float(val)
-                        except ValueError:
-                            percentage = 0.0
-                        else:
-                            percentage = ((val_float - dmin) / (dmax - dmin)) * 100
-                            # Treat 0 as 0-width and make bars width of absolute value
-                            if header.bars_zero_centrepoint:
-                                dmax = max(abs(dmin), abs(dmax))
-                                dmin = 0
-                                percentage = ((abs(val_float) - dmin) / (dmax - dmin)) * 100
-                            percentage = min(percentage, 100)
-                            percentage = max(percentage, 0)
-                    else:
-                        percentage = 0.0
-                else:
-                    percentage = 100.0
-
-                # This is horrible, but Python locale settings are worse
-                if config.thousandsSep_format is None:
-                    config.thousandsSep_format = '<span class="mqc_small_space"></span>'
-                if config.decimalPoint_format is None:
-                    config.decimalPoint_format = "."
-                valstr = valstr.replace(".", "DECIMAL").replace(",", "THOUSAND")
-                valstr = valstr.replace("DECIMAL", config.decimalPoint_format).replace(
-                    "THOUSAND", config.thousandsSep_format
-                )
+        values = section.values_by_key[col_key]
+        percentages = _bar_percentages(header, values, c_scale)
+        cell_colours: List[str] = []
+        if header.scale and col_anchor not in col_to_vscale:
+            cell_colours = _cell_colours(header, values, c_scale, source=f'Table "{dt.anchor}", column "{col_key}"')
+
+        # This is horrible, but Python locale settings are worse
+        if config.thousandsSep_format is None:
+            config.thousandsSep_format = '<span class="mqc_small_space"></span>'
+        if config.decimalPoint_format is None:
+            config.decimalPoint_format = "."
+
+        for row_idx, (group_name, s_name) in enumerate(section.rows):
+            if not values.has_value(row_idx):
+                continue
+
+            val: ValueT = values.mod[row_idx]  # type: ignore
+            valstr: str = values.fmt[row_idx]  # type: ignore
+            percentage = percentages[row_idx]
+
+            group_to_sample_to_anchor_to_val[group_name][s_name][col_anchor] = val
+            group_to_sample_to_nice_name_to_val[group_name][s_name][col_key] = val
+
+            valstr = valstr.replace(".", "DECIMAL").replace(",", "THOUSAND")
+            valstr = valstr.replace("DECIMAL", config.decimalPoint_format).replace(
+                "THOUSAND", config.thousandsSep_format
+            )
 
-                suffix = header.suffix
-                if suffix:
-                    # Add a space before the suffix, but not as an actual character, so ClipboardJS would copy
-                    # the whole value without the space. Also, remove &nbsp; that we don't want ClipboardJS to copy.
-                    suffix = suffix.replace("&nbsp;", " ").strip()
-                    valstr += "<span class='mqc_small_space'></span>" + suffix
-
-                # Conditional formatting
-                # Build empty dict for color formatting matches:
-                cmatches = {}
-                for cfc in cond_formatting_colours:
-                    for cfc_key in cfc:
-                        cmatches[cfc_key] = False
-                # Find general rules followed by column-specific rules
-                for cfk in ["all_columns", str(col_anchor), str(dt.id)]:
-                    if cfk in cond_formatting_rules:
-                        # Loop through match types
-                        for ftype in cmatches.keys():
-                            # Loop through array of comparison types
-                            for cmp in cond_formatting_rules[cfk].get(ftype, []):
-                                try:
-                                    # Each comparison should be a dict with single key: val
-                                    if "s_eq" in cmp and str(cmp["s_eq"]).lower() == str(val).lower():
-                                        cmatches[ftype] = True
-                                    if "s_contains" in cmp and str(cmp["s_contains"]).lower() in str(val).lower():
-                                        cmatches[ftype] = True
-                                    if "s_ne" in cmp and str(cmp["s_ne"]).lower() != str(val).lower():
-                                        cmatches[ftype] = True
-                                    if "eq" in cmp and float(val) == float(cmp["eq"]):
-                                        cmatches[ftype] = True
-                                    if "ne" in cmp and float(val) != float(cmp["ne"]):
-                                        cmatches[ftype] = True
-                                    if "gt" in cmp and float(val) > float(cmp["gt"]):
-                                        cmatches[ftype] = True
-                                    if "lt" in cmp and float(val) < float(cmp["lt"]):
-                                        cmatches[ftype] = True
-                                    if "ge" in cmp and float(val) >= float(cmp["ge"]):
-                                        cmatches[ftype] = True
-                                    if "le" in cmp and float(val) <= float(cmp["le"]):
-                                        cmatches[ftype] = True
-                                except Exception as e:
-                                    logger.warning(
-                                        f"Not able to apply table conditional formatting to '{val}' ({cmp}): {e}"
-                                    )
-                # Apply HTML in order of config keys
-                badge_col = None
-                for cfc in cond_formatting_colours:
-                    for cfc_key in cfc:  # should always be one, but you never know
-                        if cmatches[cfc_key]:
-                            badge_col = cfc[cfc_key]
-                if badge_col is not None:
-                    valstr = f'<span class="badge" style="background-color:{badge_col}">{valstr}</span>'
-
-                # Determine background color based on scale. Only relevant for hashable values. If value is for some
-                # reason a dict or a list, it's not hashable and the logic determining the color will not work.
-                hashable = True
-                try:
-                    hash(val)
-                except TypeError:
-                    hashable = False
-                    logger.warning(
-                        f"Value {val} is not hashable for table {dt.anchor}, column {col_key}, sample {row.sample}"
-                    )
+            suffix = header.suffix
+            if suffix:
+                # Add a space before the suffix, but not as an actual character, so ClipboardJS would copy
+                # the whole value without the space. Also, remove &nbsp; that we don't want ClipboardJS to copy.
+                suffix = suffix.replace("&nbsp;", " ").strip()
+                valstr += "<span class='mqc_small_space'></span>" + suffix
+
+            # Conditional formatting
+            # Build empty dict for color formatting matches:
+            cmatches = {}
+            for cfc in cond_formatting_colours:
+                for cfc_key in cfc:
+                    cmatches[cfc_key] = False
+            # Find general rules followed by column-specific rules
+            for cfk in ["all_columns", str(col_anchor), str(dt.id)]:
+                if cfk in cond_formatting_rules:
+                    # Loop through match types
+                    for ftype in cmatches.keys():
+                        # Loop through array of comparison types
+                        for cmp in cond_formatting_rules[cfk].get(ftype, []):
+                            try:
+                                # Each comparison should be a dict with single key: val
+                                if "s_eq" in cmp and str(cmp["s_eq"]).lower() == str(val).lower():
+                                    cmatches[ftype] = True
+                                if "s_contains" in cmp and str(cmp["s_contains"]).lower() in str(val).lower():
+                                    cmatches[ftype] = True
+                                if "s_ne" in cmp and str(cmp["s_ne"]).lower() != str(val).lower():
+                                    cmatches[ftype] = True
+                                if "eq" in cmp and float(val) == float(cmp["eq"]):
+                                    cmatches[ftype] = True
+                                if "ne" in cmp and float(val) != float(cmp["ne"]):
+                                    cmatches[ftype] = True
+                                if "gt" in cmp and float(val) > float(cmp["gt"]):
+                                    cmatches[ftype] = True
+                                if "lt" in cmp and float(val) < float(cmp["lt"]):
+                                    cmatches[ftype] = True
+                                if "ge" in cmp and float(val) >= float(cmp["ge"]):
+                                    cmatches[ftype] = True
+                                if "le" in cmp and float(val) <= float(cmp["le"]):
+                                    cmatches[ftype] = True
+                            except Exception as e:
+                                logger.warning(
+                                    f"Not able to apply table conditional formatting to '{val}' ({cmp}): {e}"
+                                )
+            # Apply HTML in order of config keys
+            badge_col = None
+            for cfc in cond_formatting_colours:
+                for cfc_key in cfc:  # should always be one, but you never know
+                    if cmatches[cfc_key]:
+                        badge_col = cfc[cfc_key]
+            if badge_col is not None:
+                valstr = f'<span class="badge" style="background-color:{badge_col}">{valstr}</span>'
+
+            # Determine background color based on scale. Only relevant for hashable values. If value is for some
+            # reason a dict or a list, it's not hashable and the logic determining the color will not work.
+            hashable = True
+            try:
+                hash(val)
+            except TypeError:
+                hashable = False
+                logger.warning(f"Value {val} is not hashable for table {dt.anchor}, column {col_key}, sample {s_name}")
 
-                sorting_val = group_to_sorting_to_anchor_to_val.get(group_name, {}).get(col_anchor)
-                if sorting_val is None:
-                    group_to_sorting_to_anchor_to_val[group_name][col_anchor] = val
-                    sorting_val = val
+            sorting_val = group_to_sorting_to_anchor_to_val.get(group_name, {}).get(col_anchor)
+            if sorting_val is None:
+                group_to_sorting_to_anchor_to_val[group_name][col_anchor] = val
+                sorting_val = val
 
-                # Categorical background colours supplied
+            if virtual:
                 if isinstance(val, str) and val in header.bgcols.keys():
-                    col = f'style="background-color:{header.bgcols[val]} !important;"'
-                    group_to_sample_to_anchor_to_td[group_name][row.sample][col_anchor] = (
-                        f'<td data-sorting-val="{escape(str(sorting_val))}" class="{col_anchor} {td_hide_cls}" {col}>{valstr}</td>'
-                    )
-
-                # Build table cell background colour bar
+                    vcell = VirtualCell(valstr, val, None, header.bgcols[val])
                 elif hashable and header.scale:
-                    if c_scale is not None:
-                        col = " background-color:{} !important;".format(
-                            c_scale.get_colour(val, source=f'Table "{dt.anchor}", column "{col_key}"')
-                        )
-                    else:
-                        col = ""
-                    bar_html = f'<span class="bar" style="width:{percentage}%;{col}"></span>'
-                    val_html = f'<span class="val">{valstr}</span>'
-                    wrapper_html = f'<div class="wrapper">{bar_html}{val_html}</div>'
-
-                    group_to_sample_to_anchor_to_td[group_name][row.sample][col_anchor] = (
-                        f'<td data-sorting-val="{escape(str(sorting_val))}" class="data-coloured {col_anchor} {td_hide_cls}">{wrapper_html}</td>'
-                    )
+                    colour: Optional[str] = ""
+                    if col_anchor in col_to_vscale:
+                        colour = None
+                    elif c_scale is not None:
+                        colour = cell_colours[row_idx]
+                    vcell = VirtualCell(valstr, val, round(percentage, 2), colour)
+                else:
+                    vcell = VirtualCell(valstr, val, None, None)
+                group_to_sample_to_anchor_to_vcell[group_name][s_name][col_anchor] = vcell
+
+            # Categorical background colours supplied
+            elif isinstance(val, str) and val in header.bgcols.keys():
+                col = f'style="background-color:{header.bgcols[val]} !important;"'
+                group_to_sample_to_anchor_to_td[group_name][s_name][col_anchor] = (
+                    f'<td data-sorting-val="{escape(str(sorting_val))}" class="{col_anchor} {td_hide_cls}" {col}>{valstr}</td>'
+                )
 
-                # Scale / background colours are disabled
+            # Build table cell background colour bar
+            elif hashable and header.scale:
+                if c_scale is not None:
+                    col = f" background-color:{cell_colours[row_idx]} !important;"
                 else:
-                    group_to_sample_to_anchor_to_td[group_name][row.sample][col_anchor] = (
-                        f'<td data-sorting-val="{escape(str(sorting_val))}" class="{col_anchor} {td_hide_cls}">{valstr}</td>'
-                    )
+                    col = ""
+                bar_html = f'<span class="bar" style="width:{percentage}%;{col}"></span>'
+                val_html = f'<span class="val">{valstr}</span>'
+                wrapper_html = f'<div class="wrapper">{bar_html}{val_html}</div>'
+
+                group_to_sample_to_anchor_to_td[group_name][s_name][col_anchor] = (
+                    f'<td data-sorting-val="{escape(str(sorting_val))}" class="data-coloured {col_anchor} {td_hide_cls}">{wrapper_html}</td>'
+                )
 
-                # Is this cell hidden or empty?
-                group_to_sample_to_anchor_to_empty[group_name][row.sample][col_anchor] = (
-                    header.hidden or str(val).strip() == ""
+            # Scale / background colours are disabled
+            else:
+                group_to_sample_to_anchor_to_td[group_name][s_name][col_anchor] = (
+                    f'<td data-sorting-val="{escape(str(sorting_val))}" class="{col_anchor} {td_hide_cls}">{valstr}</td>'
                 )
 
+            # Is this cell hidden or empty?
+            group_to_sample_to_anchor_to_empty[group_name][s_name][col_anchor] = header.hidden or str(val).strip() == ""
+
         # Remove header if we don't have any filled cells for it
         sum_vals = 0
-        for g, rows_by_sample in group_to_sample_to_anchor_to_td.items():
+        for g, rows_by_sample in cells_by_group.items():
             sum_vals += sum([len(rows) for rows in rows_by_sample.values()])
         if sum_vals == 0:
             if header.hidden:
@@ -1105,7 +1411,7 @@ data-table-anchor="{dt.anchor}" data-violin-anchor="{violin_anchor}" data-toggle
         n_visible_rows = len([x for x in not_empty_rows_bool_vector if x is True])
 
         # Visible rows
-        t_showing_rows_txt = f'Showing <sup id="{dt.anchor}_numrows" class="mqc_table_numrows">{n_visible_rows}</sup>/<sub>{len(group_to_sample_to_anchor_to_td)}</sub> rows'
+        t_showing_rows_txt = f'Showing <sup id="{dt.anchor}_numrows" class="mqc_table_numrows">{n_visible_rows}</sup>/<sub>{len(cells_by_group)}</sub> rows'
 
         # How many columns are visible?
         ncols_vis = (len(col_to_th) + 1) - hidden_cols
@@ -1179,13 +1485,11 @@ data-table-anchor="{dt.anchor}" data-violin-anchor="{violin_anchor}" data-toggle
         """
 
     # Build the table itself
-    collapse_class = (
-        "mqc-table-collapse" if len(group_to_sample_to_anchor_to_td) > 10 and config.collapse_tables else ""
-    )
+    collapse_class = "mqc-table-collapse" if len(cells_by_group) > 10 and config.collapse_tables else ""
     html += f"""
         <div id="{dt.anchor}_container" class="mqc_table_container">
             <div class="table-responsive mqc-table-responsive {collapse_class}">
-                <table id="{dt.anchor}" class="table table-condensed mqc_table mqc_per_sample_table" data-title="{table_title}" data-sortlist="{_get_sortlist_js(dt)}">
+                <table id="{dt.anchor}" class="table table-condensed mqc_table mqc_per_sample_table{" mqc_virtual_table" if virtual else ""}" data-title="{table_title}" data-sortlist="{_get_sortlist_js(dt)}">
         """
 
     # Build the header row
@@ -1194,10 +1498,18 @@ data-table-anchor="{dt.anchor}" data-violin-anchor="{violin_anchor}" data-toggle
 
     # Build the table body
     html += "<tbody>"
-    t_row_group_names = list(group_to_sample_to_anchor_to_td.keys())
+    t_row_group_names = list(cells_by_group.keys())
     if dt.pconfig.sort_rows:
         t_row_group_names = natsorted(t_row_group_names)
 
+    virtual_data_html = ""
+    if virtual:
+        # Rows are rendered by the browser
+        virtual_data_html = _virtual_table_data(
+            dt.anchor, t_row_group_names, group_to_sample_to_anchor_to_vcell, list(col_to_th.keys()), col_to_vscale
+        )
+        t_row_group_names = []
+
     non_trivial_groups_present = any(len(group_to_sample_to_anchor_to_td[g_name]) > 1 for g_name in t_row_group_names)
 
     for g_name in t_row_group_names:
@@ -1237,7 +1549,8 @@ data-table-anchor="{dt.anchor}" data-violin-anchor="{violin_anchor}" data-toggle
                 html += cell_html
             html += "</tr>"
     html += "</tbody></table></div>"
-    if len(group_to_sample_to_anchor_to_td) > 10 and config.collapse_tables:
+    html += virtual_data_html
+    if len(cells_by_group) > 10 and config.collapse_tables:
         html += '<div class="mqc-table-expand"><span class="glyphicon glyphicon-chevron-down" aria-hidden="true"></span></div>'
     html += "</div>"
 
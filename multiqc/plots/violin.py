@@ -27,6 +27,7 @@ from multiqc.plots.table_object import (
     ExtValueT,
     SectionT,
     TableConfig,
+    TableSection,
     ValueT,
     render_html,
 )
@@ -60,37 +61,34 @@ class ViolinPlotInputData(NormalizedPlotInputData[TableConfig]):
             section_key = list(self.dt.section_by_id.keys())[section_idx]
 
             # Process each sample in this section
-            for sample_name, group_rows in section.rows_by_sgroup.items():
-                for row in group_rows:
-                    # Process each metric/column in the order from get_headers_in_order()
-                    for section_order, metric_name, dt_column in ordered_headers:
-                        if metric_name not in row.data:
-                            continue
-
-                        cell = row.data[metric_name]
-                        # Skip empty values
-                        if cell is None or cell.raw is None or cell.fmt == "":
-                            continue
-
-                        # Create record with all necessary metadata
-                        record = {
-                            "dt_anchor": self.dt.anchor,
-                            "section_key": str(section_key),
-                            "section_order": section_order,  # Store original index for ordering
-                            "sample": str(sample_name),
-                            "metric": str(metric_name),
-                            "val_raw": float(cell.raw) if isinstance(cell.raw, (int, float)) else float("nan"),
-                            "val_raw_type": type(cell.raw).__name__,  # Store type name
-                            "val_mod": float(cell.mod) if isinstance(cell.mod, (int, float)) else float("nan"),
-                            "val_mod_type": type(cell.mod).__name__,  # Store type name
-                            "val_fmt": str(cell.fmt),
-                            # Store column metadata as JSON. Note that "format" and "modify" lambda won't be stored,
-                            # that's why we are saving val_mod and val_fmt separately.
-                            "column_meta": dt_column.model_dump_json(),
-                            "show_table_by_default": self.show_table_by_default,
-                        }
-
-                        records.append(record)
+            for row_idx, (sample_name, _) in enumerate(section.rows):
+                # Process each metric/column in the order from get_headers_in_order()
+                for section_order, metric_name, dt_column in ordered_headers:
+                    values = section.values_by_key.get(metric_name)
+                    cell = values.cell(row_idx) if values is not None else None
+                    # Skip empty values
+                    if cell is None or cell.raw is None or cell.fmt == "":
+                        continue
+
+                    # Create record with all necessary metadata
+                    record = {
+                        "dt_anchor": self.dt.anchor,
+                        "section_key": str(section_key),
+                        "section_order": section_order,  # Store original index for ordering
+                        "sample": str(sample_name),
+                        "metric": str(metric_name),
+                        "val_raw": float(cell.raw) if isinstance(cell.raw, (int, float)) else float("nan"),
+                        "val_raw_type": type(cell.raw).__name__,  # Store type name
+                        "val_mod": float(cell.mod) if isinstance(cell.mod, (int, float)) else float("nan"),
+                        "val_mod_type": type(cell.mod).__name__,  # Store type name
+                        "val_fmt": str(cell.fmt),
+                        # Store column metadata as JSON. Note that "format" and "modify" lambda won't be stored,
+                        # that's why we are saving val_mod and val_fmt separately.
+                        "column_meta": dt_column.model_dump_json(),
+                        "show_table_by_default": self.show_table_by_default,
+                    }
+
+                    records.append(record)
 
         # Create DataFrame
         df = pl.DataFrame(records)
@@ -114,47 +112,44 @@ class ViolinPlotInputData(NormalizedPlotInputData[TableConfig]):
         # Process each section and its rows to collect all metrics for each sample
         for section_key, section in self.dt.section_by_id.items():
             # Process each sample in this section
-            for sample_name, group_rows in section.rows_by_sgroup.items():
-                for row in group_rows:
-                    # Initialize sample record if not seen before
-                    if str(sample_name) not in samples_data:
-                        samples_data[str(sample_name)] = {
-                            "anchor": "",  # column is prefixed with table anchor instead
-                            "type": "table_row",
-                            "creation_date": self.creation_date,
-                            "plot_type": None,
-                            "plot_input_data": None,
-                            "sample": str(sample_name),
-                        }
-
-                    # Process each metric/column in the order from get_headers_in_order()
-                    for _, metric_name, dt_column in ordered_headers:
-                        if metric_name not in row.data:
-                            continue
-
-                        cell = row.data[metric_name]
-                        # Skip empty values
-                        if cell is None or cell.raw is None or cell.fmt == "":
-                            continue
-
-                        # Store both the value and its type for proper reconstruction
-                        try:
-                            float_val = float(cell.mod)
-                        except ValueError:
-                            float_val = float("nan")
-
-                        # Column names now include both the metric name and any namespace
-                        # to ensure uniqueness across different tables
-                        metric_col_name = ColumnKey(metric_name)
-                        if dt_column.namespace:
-                            metric_col_name = ColumnKey(f"{dt_column.namespace} / {metric_name}")
-                        elif len(self.dt.section_by_id) > 1:
-                            metric_col_name = ColumnKey(f"{section_key} / {metric_name}")
-                        metric_col_name = ColumnKey(f"{self.dt.id} / {metric_col_name}".lower())
-
-                        # Add metric to the sample's data
-                        samples_data[str(sample_name)][metric_col_name] = float_val
-                        metric_col_names.add(metric_col_name)
+            for row_idx, (sample_name, _) in enumerate(section.rows):
+                # Initialize sample record if not seen before
+                if str(sample_name) not in samples_data:
+                    samples_data[str(sample_name)] = {
+                        "anchor": "",  # column is prefixed with table anchor instead
+                        "type": "table_row",
+                        "creation_date": self.creation_date,
+                        "plot_type": None,
+                        "plot_input_data": None,
+                        "sample": str(sample_name),
+                    }
+
+                # Process each metric/column in the order from get_headers_in_order()
+                for _, metric_name, dt_column in ordered_headers:
+                    values = section.values_by_key.get(metric_name)
+                    cell = values.cell(row_idx) if values is not None else None
+                    # Skip empty values
+                    if cell is None or cell.raw is None or cell.fmt == "":
+                        continue
+
+                    # Store both the value and its type for proper reconstruction
+                    try:
+                        float_val = float(cell.mod)
+                    except ValueError:
+                        float_val = float("nan")
+
+                    # Column names now include both the metric name and any namespace
+                    # to ensure uniqueness across different tables
+                    metric_col_name = ColumnKey(metric_name)
+                    if dt_column.namespace:
+                        metric_col_name = ColumnKey(f"{dt_column.namespace} / {metric_name}")
+                    elif len(self.dt.section_by_id) > 1:
+                        metric_col_name = ColumnKey(f"{section_key} / {metric_name}")
+                    metric_col_name = ColumnKey(f"{self.dt.id} / {metric_col_name}".lower())
+
+                    # Add metric to the sample's data
+                    samples_data[str(sample_name)][metric_col_name] = float_val
+                    metric_col_names.add(metric_col_name)
 
         # Convert dictionary to DataFrame - one row per sample
         wide_records = list(samples_data.values())
@@ -486,6 +481,64 @@ class ViolinColumn:
         return d
 
 
+@dataclass
+class MetricMatrix:
+    """
+    Values of the metrics of a table section as a samples × metrics matrix, so that statistics
+    are computed for all metrics of the section at once
+    """
+
+    samples: List[SampleName]  # unique samples of the section, in the order of the rows
+    metrics: List[ColumnAnchor]
+    values: List[Dict[int, Optional[ValueT]]]  # values of each metric by sample index, in the order of the samples
+    floats: np.ndarray  # values as floats, NaN if missing or not finite, or if the metric is not numeric
+    valid: np.ndarray  # whether the sample has a value for the metric, that is finite if the metric is numeric
+    numeric: np.ndarray  # whether all values of the metric are numbers
+    integer: np.ndarray  # whether all values of the metric are integers
+
+    @staticmethod
+    def create(section: TableSection, columns: List[Tuple[ColumnKey, ColumnMeta]]) -> "MetricMatrix":
+        sample_idx_by_name: Dict[SampleName, int] = {}
+        sample_idx_by_row = [
+            sample_idx_by_name.setdefault(s_name, len(sample_idx_by_name)) for _, s_name in section.rows
+        ]
+        shape = (len(sample_idx_by_name), len(columns))
+
+        values: List[Dict[int, Optional[ValueT]]] = []
+        floats = np.full(shape, np.nan)
+        present = np.zeros(shape, dtype=bool)
+        numeric = np.zeros(shape[1], dtype=bool)
+        integer = np.zeros(shape[1], dtype=bool)
+        for col_idx, (metric_name, _) in enumerate(columns):
+            column_values = section.values_by_key[metric_name]
+            # Later rows of the same sample override earlier ones
+            value_by_sample_idx = {
+                sample_idx_by_row[row_idx]: column_values.mod[row_idx]
+                for row_idx, fmt in enumerate(column_values.fmt)
+                if fmt is not None
+            }
+            values.append(value_by_sample_idx)
+            sample_idxs = list(value_by_sample_idx.keys())
+            present[sample_idxs, col_idx] = True
+            types = set(map(type, value_by_sample_idx.values()))
+            if types and all(issubclass(t, (int, float)) for t in types):
+                numeric[col_idx] = True
+                integer[col_idx] = all(issubclass(t, int) for t in types)
+                floats[sample_idxs, col_idx] = list(value_by_sample_idx.values())
+
+        finite = np.isfinite(floats)
+        floats[~finite] = np.nan
+        return MetricMatrix(
+            samples=list(sample_idx_by_name.keys()),
+            metrics=[dt_column.clean_rid for _, dt_column in columns],
+            values=values,
+            floats=floats,
+            valid=np.where(numeric, finite, present),
+            numeric=numeric,
+            integer=integer,
+        )
+
+
 VIOLIN_HEIGHT = 70  # single violin height
 EXTRA_HEIGHT = 63  # extra space for the title and footer
 
@@ -508,35 +561,25 @@ class Dataset(BaseDataset):
     def values_and_headers_from_dt(
         dt: DataTable,
     ) -> Tuple[
-        Dict[ColumnAnchor, Dict[SampleName, ValueT]],
+        List["MetricMatrix"],
         Dict[ColumnAnchor, ColumnMeta],
     ]:
-        value_by_sample_by_metric: Dict[ColumnAnchor, Dict[SampleName, ValueT]] = {}
+        columns_by_section_idx: Dict[int, List[Tuple[ColumnKey, ColumnMeta]]] = {}
         dt_column_by_metric: Dict[ColumnAnchor, ColumnMeta] = {}
 
         for idx, metric_name, dt_column in dt.get_headers_in_order():
-            value_by_sample: Dict[SampleName, ValueT] = {}
-            for _, group_rows in list(dt.section_by_id.values())[idx].rows_by_sgroup.items():
-                for row in group_rows:
-                    try:
-                        v = row.data[metric_name]
-                    except KeyError:
-                        pass
-                    else:
-                        assert v is not None and str(v).strip != "", v
-                        value_by_sample[row.sample] = v.mod
-
-            value_by_sample_by_metric[dt_column.clean_rid] = value_by_sample
-
-        for idx, metric_name, dt_column in dt.get_headers_in_order():
+            columns_by_section_idx.setdefault(idx, []).append((metric_name, dt_column))
             dt_column_by_metric[dt_column.clean_rid] = dt_column
 
+        sections = list(dt.section_by_id.values())
+        matrices = [MetricMatrix.create(sections[idx], columns) for idx, columns in columns_by_section_idx.items()]
+
         # If all colors are the same, remove them
         if len(set([t_col.color for t_col in dt_column_by_metric.values()])) == 1:
             for t_col in dt_column_by_metric.values():
                 t_col.color = None
 
-        return value_by_sample_by_metric, dt_column_by_metric
+        return matrices, dt_column_by_metric
 
     @staticmethod
     def create(
@@ -544,7 +587,32 @@ class Dataset(BaseDataset):
         dt: DataTable,
         show_table_by_default: bool,
     ) -> "Dataset":
-        value_by_sample_by_metric, dt_column_by_metric = Dataset.values_and_headers_from_dt(dt)
+        matrices, dt_column_by_metric = Dataset.values_and_headers_from_dt(dt)
+
+        # Find outliers of all metrics of a section at once. Only needed for numeric metrics with too many
+        # values to show all of them as interactive points
+        location_by_metric: Dict[ColumnAnchor, Tuple[MetricMatrix, int]] = {}
+        outliers_by_metric: Dict[ColumnAnchor, np.ndarray] = {}
+        for matrix in matrices:
+            for col_idx, metric in enumerate(matrix.metrics):
+                location_by_metric[metric] = (matrix, col_idx)
+            n_values = matrix.valid.sum(axis=0)
+            col_idxs: List[int] = np.flatnonzero(
+                matrix.numeric
+                & (n_values <= config.violin_min_threshold_no_points)
+                & (n_values > config.violin_min_threshold_outliers)
+            ).tolist()
+            if len(col_idxs) == 0:
+                continue
+            dt_columns = [dt_column_by_metric[matrix.metrics[col_idx]] for col_idx in col_idxs]
+            outliers = find_outliers_in_columns(
+                matrix.floats[:, col_idxs],
+                minvals=[dt_column.dmin for dt_column in dt_columns],
+                maxvals=[dt_column.dmax for dt_column in dt_columns],
+                metrics=[dt_column.title for dt_column in dt_columns],
+            )
+            for i, col_idx in enumerate(col_idxs):
+                outliers_by_metric[matrix.metrics[col_idx]] = outliers[:, i]
 
         all_samples: Set[SampleName] = set()
         scatter_value_by_sample_by_metric: Dict[ColumnAnchor, Dict[SampleName, Union[int, float, str, None]]] = {}
@@ -568,22 +636,22 @@ class Dataset(BaseDataset):
             )
             header_by_metric[col_anchor] = column
 
-            value_by_sample = value_by_sample_by_metric[col_anchor]
-            if not value_by_sample:
+            matrix, col_idx = location_by_metric[col_anchor]
+            value_by_sample_idx = matrix.values[col_idx]
+            if not value_by_sample_idx:
                 logger.debug(f"No non-empty values found for metric: {column.title}")
                 continue
 
-            values_are_numeric = all(isinstance(v, (int, float)) for v in value_by_sample.values())
-            values_are_integer = all(isinstance(v, int) for v in value_by_sample.values())
-            if values_are_numeric:
-                # Remove NaN and Inf values
-                value_by_sample = {s: v for s, v in value_by_sample.items() if np.isfinite(v)}
-                if not value_by_sample:
-                    logger.warning(f"All values are NaN or Inf for metric: {column.title}")
-                    continue
+            values_are_numeric = bool(matrix.numeric[col_idx])
+            values_are_integer = bool(matrix.integer[col_idx])
+            # Indices of the samples with values, excluding NaN and Inf values
+            sample_idxs = np.flatnonzero(matrix.valid[:, col_idx])
+            if len(sample_idxs) == 0:
+                logger.warning(f"All values are NaN or Inf for metric: {column.title}")
+                continue
 
-            column.show_points = len(value_by_sample) <= config.violin_min_threshold_no_points
-            column.show_only_outliers = len(value_by_sample) > config.violin_min_threshold_outliers
+            column.show_points = len(sample_idxs) <= config.violin_min_threshold_no_points
+            column.show_only_outliers = len(sample_idxs) > config.violin_min_threshold_outliers
 
             if values_are_numeric:
                 # Calculate range
@@ -611,37 +679,28 @@ class Dataset(BaseDataset):
                     # As values are not numeric, will not add any interactive points
                     scatter_value_by_sample = {}
                 else:
-                    # For numbers, finding outliers and adding only them as interactive points
-                    samples = list(value_by_sample.keys())
-                    numeric_values: List[Union[int, float]] = []
-                    for v in value_by_sample.values():
-                        assert isinstance(v, (int, float))  # values_are_numeric assures that all values are numeric
-                        numeric_values.append(v)
-                    outlier_statuses = find_outliers(
-                        numeric_values,
-                        minval=column.dmin,
-                        maxval=column.dmax,
-                        metric=column.title,
-                    )
+                    # For numbers, adding only the outliers as interactive points
                     scatter_value_by_sample = {
-                        samples[idx]: numeric_values[idx] for idx in range(len(samples)) if outlier_statuses[idx]
+                        matrix.samples[idx]: value_by_sample_idx[idx]
+                        for idx in np.flatnonzero(outliers_by_metric[col_anchor]).tolist()
                     }
 
             scatter_value_by_sample_by_metric[col_anchor] = scatter_value_by_sample
 
             # Now sort and downsample values to keep max 2000 points for each metric
-            violin_value_by_sample = value_by_sample
             max_violin_points = config.violin_downsample_after
-            if max_violin_points is not None and len(violin_value_by_sample) > max_violin_points:
+            if max_violin_points is not None and len(sample_idxs) > max_violin_points:
                 logger.debug(
-                    f"Violin for '{column.title}': sample number is {len(violin_value_by_sample)}. "
+                    f"Violin for '{column.title}': sample number is {len(sample_idxs)}. "
                     f"Will downsample to max {max_violin_points} points."
                 )
-                samples = list(violin_value_by_sample.keys())
-                values = list(violin_value_by_sample.values())
-                indices = np.argsort(values)
-                indices = indices[:: int(math.ceil(len(indices) / max_violin_points))]
-                violin_value_by_sample = {samples[idx]: values[idx] for idx in indices}
+                if values_are_numeric and not values_are_integer:
+                    sort_values = matrix.floats[sample_idxs, col_idx]
+                else:  # sort integers and strings as they are
+                    sort_values = np.array([value_by_sample_idx[idx] for idx in sample_idxs.tolist()])
+                indices = np.argsort(sort_values)
+                sample_idxs = sample_idxs[indices[:: int(math.ceil(len(indices) / max_violin_points))]]
+            violin_value_by_sample = {matrix.samples[idx]: value_by_sample_idx[idx] for idx in sample_idxs.tolist()}
 
             violin_value_by_sample_by_metric[col_anchor] = violin_value_by_sample
 
@@ -650,8 +709,8 @@ class Dataset(BaseDataset):
                 tt_decimals = dt_column.tt_decimals if dt_column.tt_decimals is not None else 2
                 column.hoverformat = f".{tt_decimals}f"
 
-            all_samples.update(set(list(scatter_value_by_sample.keys())))
-            all_samples.update(set(list(violin_value_by_sample.keys())))
+            all_samples.update(scatter_value_by_sample.keys())
+            all_samples.update(violin_value_by_sample.keys())
             metrics.append(col_anchor)
 
         is_downsampled = (
@@ -899,7 +958,7 @@ class ViolinPlot(Plot[Dataset, TableConfig]):
     ) -> "ViolinPlot":
         ds_samples: Set[str] = set()
         for section in dt.section_by_id.values():
-            ds_samples.update(section.rows_by_sgroup.keys())
+            ds_samples.update(row.group for row in section.rows)
 
         model: Plot[Dataset, TableConfig] = Plot.initialize(
             plot_type=PlotType.VIOLIN,
@@ -1000,11 +1059,11 @@ class ViolinPlot(Plot[Dataset, TableConfig]):
             data: Dict[str, Dict[str, Union[int, float, str, None]]] = {}
             for idx, col_key, header in self.datasets[0].dt.get_headers_in_order():
                 rid = header.clean_rid
-                for _, group_rows in list(self.datasets[0].dt.section_by_id.values())[idx].rows_by_sgroup.items():
-                    for row in group_rows:
-                        if col_key in row.data:
-                            val = row.data[col_key]
-                            data.setdefault(row.sample, {})[rid] = val.raw
+                section = list(self.datasets[0].dt.section_by_id.values())[idx]
+                values = section.values_by_key[col_key]
+                for row_idx, (_, s_name) in enumerate(section.rows):
+                    if values.has_value(row_idx):
+                        data.setdefault(s_name, {})[rid] = values.raw[row_idx]
 
             # Use polars to create a DataFrame
             records = []
@@ -1046,16 +1105,16 @@ class ViolinPlot(Plot[Dataset, TableConfig]):
             data: Dict[str, Dict[str, Union[int, float, str, None]]] = {}
             for idx, metric, header in self.datasets[0].dt.get_headers_in_order():
                 rid = header.clean_rid
-                for _, group_rows in list(self.datasets[0].dt.section_by_id.values())[idx].rows_by_sgroup.items():
-                    for row in group_rows:
-                        if metric in row.data:
-                            val = row.data[metric]
-                            data.setdefault(row.sample, {})[rid] = val.raw
+                section = list(self.datasets[0].dt.section_by_id.values())[idx]
+                values = section.values_by_key[metric]
+                for row_idx, (_, s_name) in enumerate(section.rows):
+                    if values.has_value(row_idx):
+                        data.setdefault(s_name, {})[rid] = values.raw[row_idx]
 
-            values: List[List[Any]] = [list(data.keys())]
+            cell_values: List[List[Any]] = [list(data.keys())]
             for idx, metric, header in self.datasets[0].dt.get_headers_in_order():
                 rid = header.clean_rid
-                values.append([data[s].get(rid, "") for s in data.keys()])
+                cell_values.append([data[s].get(rid, "") for s in data.keys()])
 
             keys = list(data.keys())
             if not keys:
@@ -1066,7 +1125,7 @@ class ViolinPlot(Plot[Dataset, TableConfig]):
                 data=[
                     go.Table(
                         header=dict(values=["Sample"] + list(data[list(data.keys())[0]].keys())),
-                        cells=dict(values=values),
+                        cells=dict(values=cell_values),
                     )
                 ],
                 layout=self.layout,
@@ -1175,39 +1234,75 @@ def find_outliers(
     will be nearly no different from the other values. If we add "100%" as an artificial
     additional value, none of those near-zero clustered values won't be called outliers.
     """
-    if len(values) == 0 or (top_n is not None and top_n <= 0):
-        return np.zeros(len(values), dtype=bool)
-
-    added_values: List[Union[int, float]] = []
-    if minval is not None:
-        added_values.append(minval)
-    if maxval is not None:
-        added_values.append(maxval)
-    np_values = np.array(values + added_values)
-    del values
-
-    # Calculate the mean and standard deviation
-    mean = np.mean(np_values)
-    std_dev = np.std(np_values)
-    if std_dev == 0:
-        logger.debug(f"All {len(np_values)} points have the same values" + (f", metric: '{metric}'" if metric else ""))
-        return np.zeros(len(np_values), dtype=bool)
-
-    # Calculate Z-scores (measures of "outlyingness")
-    z_scores = np.abs((np_values - mean) / std_dev)
-
-    # Get indices of the top N outliers
-    outlier_status = np.zeros(len(np_values), dtype=bool)
+    matrix = np.array(values, dtype=float).reshape(-1, 1)
+    return find_outliers_in_columns(
+        matrix, top_n=top_n, z_cutoff=z_cutoff, minvals=[minval], maxvals=[maxval], metrics=[metric]
+    )[:, 0]
+
+
+def find_outliers_in_columns(
+    matrix: np.ndarray,
+    top_n: Optional[int] = None,
+    z_cutoff: float = 2.0,
+    minvals: Optional[List[Optional[Union[float, int]]]] = None,
+    maxvals: Optional[List[Optional[Union[float, int]]]] = None,
+    metrics: Optional[List[Optional[str]]] = None,
+) -> np.ndarray:
+    """
+    Same as `find_outliers()` for each column of a samples × metrics matrix, with NaN for missing
+    values, which are never outliers. `minvals` and `maxvals` have one value for each column.
+
+    Return a boolean matrix of the same shape, indicating if the value is an outlier.
+    """
+    n_rows, n_cols = matrix.shape
+    outlier_status = np.zeros(matrix.shape, dtype=bool)
+    if n_rows == 0 or n_cols == 0 or (top_n is not None and top_n <= 0):
+        return outlier_status
+
+    # Add the min and max values as two extra rows, NaN for the columns that don't have them
+    added_values = np.array(
+        [
+            [np.nan if v is None else v for v in (minvals or [None] * n_cols)],
+            [np.nan if v is None else v for v in (maxvals or [None] * n_cols)],
+        ],
+        dtype=float,
+    )
+    n_added = np.count_nonzero(~np.isnan(added_values), axis=0)
+    np_values = np.vstack([matrix, added_values])
+    has_values = ~np.isnan(np_values)
+    n_values = np.count_nonzero(has_values, axis=0)
+
+    # Calculate the mean and standard deviation of each column
+    safe_n_values = np.maximum(n_values, 1)
+    mean = np.where(has_values, np_values, 0).sum(axis=0) / safe_n_values
+    std_dev = np.sqrt(np.where(has_values, (np_values - mean) ** 2, 0).sum(axis=0) / safe_n_values)
+    same_values = (n_values > 0) & (std_dev == 0)
+    for col_idx in np.flatnonzero(same_values):
+        metric = metrics[col_idx] if metrics else None
+        logger.debug(
+            f"All {n_values[col_idx]} points have the same values" + (f", metric: '{metric}'" if metric else "")
+        )
+
+    # Calculate Z-scores (measures of "outlyingness"), NaN for missing values and constant columns
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_scores = np.abs((np_values - mean) / np.where(std_dev == 0, np.nan, std_dev))
+
     if top_n:
-        outlier_status[np.argsort(z_scores)[-top_n:]] = True
+        # Get indices of the top N outliers
+        top_indices = np.argsort(np.where(np.isnan(z_scores), -np.inf, z_scores), axis=0, kind="stable")[-top_n:]
+        outlier_status_with_added = np.zeros(np_values.shape, dtype=bool)
+        np.put_along_axis(outlier_status_with_added, top_indices, True, axis=0)
+        outlier_status_with_added &= ~np.isnan(z_scores)
     else:
-        indices = np.where(z_scores > z_cutoff)[0]
-        while len(indices) <= len(added_values) and z_cutoff > 1.0:
-            # No outliers found with this Z-score cutoff, trying a lower cutoff
-            z_cutoff -= 0.2
-            indices = np.where(z_scores > z_cutoff)[0]
-        outlier_status[indices] = True
-
-    if added_values:
-        outlier_status = outlier_status[: -len(added_values)]  # type: ignore
+        # If no outliers are found with a Z-score cutoff, try lower cutoffs
+        cutoffs = [z_cutoff]
+        while cutoffs[-1] > 1.0:
+            cutoffs.append(cutoffs[-1] - 0.2)
+        column_cutoffs = np.full(n_cols, cutoffs[-1])
+        for cutoff in reversed(cutoffs[:-1]):
+            n_outliers = np.count_nonzero(z_scores > cutoff, axis=0)
+            column_cutoffs = np.where(n_outliers > n_added, cutoff, column_cutoffs)
+        outlier_status_with_added = z_scores > column_cutoffs
+
+    outlier_status[:] = outlier_status_with_added[:n_rows]
     return outlier_status
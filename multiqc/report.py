@@ -21,13 +21,16 @@ from collections import defaultdict, OrderedDict
 from datetime import datetime
 from pathlib import Path, PosixPath
 from typing import (
+    AbstractSet,
     Any,
+    Callable,
     Dict,
     Iterator,
     List,
     Mapping,
     Optional,
     Sequence,
+    TYPE_CHECKING,
     Set,
     TextIO,
     Tuple,
@@ -39,26 +42,32 @@ from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
 from multiqc import config
-
-# This does not cause circular imports because BaseMultiqcModule is used only in
-# quoted type hints, and quoted type hints are lazily evaluated:
-from multiqc.base_module import BaseMultiqcModule
-from multiqc.core import ai, log_and_rich, tmp_dir
+from multiqc.core import data_file_writer, log_and_rich, tmp_dir
 from multiqc.core.exceptions import NoAnalysisFound
 from multiqc.core.log_and_rich import iterate_using_progress_bar
+from multiqc.core.file_contents_cache import FileContentsCache
+from multiqc.core.search_cache import CachedResult, FileStat, SearchCache, search_config_hash
+from multiqc.core.search_matchers import ContentMatcher, FileContentScan, FilenameMatcher
 from multiqc.core.tmp_dir import data_tmp_dir
-from multiqc.core import plot_data_store
-from multiqc.plots.plot import NormalizedPlotInputData, Plot
-from multiqc.plots.table_object import Cell, ColumnDict, InputRow, SampleName, ValueT
-from multiqc.plots.violin import ViolinPlot
-from multiqc.types import Anchor, ColumnKey, FileDict, ModuleId, SampleGroup, Section, SectionKey
+from multiqc.types import Anchor, ColumnKey, FileDict, ModuleId, SampleGroup, SampleName, Section, SectionKey
 from multiqc.utils import megaqc
 from multiqc.utils.util_functions import (
+    JsonEncoder,
     dump_json,
     replace_defaultdicts,
     rmtree_with_retries,
 )
 
+# The module and plot classes import the report, so they are only imported for type hints here, and
+# the plot modules can be imported before the report without circular imports:
+if TYPE_CHECKING:
+    import polars as pl
+
+    from multiqc.base_module import BaseMultiqcModule
+    from multiqc.plots.plot import NormalizedPlotInputData, Plot
+    from multiqc.plots.table_object import ColumnDict, InputRow, ValueT
+    from multiqc.plots.violin import ViolinPlot
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -68,6 +77,9 @@ logger = logging.getLogger(__name__)
 class Runtimes:
     total: float = 0.0
     total_sp: float = 0.0
+    total_walk: float = 0.0
+    # Directory walk time by step: listing directories, and getting file sizes and times
+    walk: Dict[str, float] = dataclasses.field(default_factory=lambda: defaultdict(float))
     total_mods: float = 0.0
     total_compression: float = 0.0
     sp: Dict[str, float] = dataclasses.field(default_factory=lambda: defaultdict())
@@ -83,7 +95,7 @@ creation_date: datetime
 top_modules: List[Dict[str, Dict[str, str]]]
 module_order: List[Dict[str, Dict[str, Union[str, List[str]]]]]
 modules: List["BaseMultiqcModule"]  # list of BaseMultiqcModule objects
-general_stats_plot: Optional[ViolinPlot]
+general_stats_plot: Optional["ViolinPlot"]
 general_stats_html: str
 lint_errors: List[str]
 num_flat_plots: int
@@ -98,6 +110,8 @@ report_uuid: str
 analysis_files: List[str]  # input files to search
 files: Dict[ModuleId, List[FileDict]]  # files found by each module
 file_search_stats: Dict[str, Set[Path]]
+searchfile_stats: Dict[str, FileStat]  # size, mtime and inode of the files found by the directory walk
+file_contents_cache: FileContentsCache  # contents of matched files read during the search
 
 # AI stuff, set dynamically in ai.py to be used in content.html and ai.js
 ai_global_summary: str = ""
@@ -118,16 +132,16 @@ data_sources: Dict[str, Dict[str, Dict[str, Any]]]
 html_ids_by_scope: Dict[Optional[str], Set[Anchor]] = defaultdict(set)
 
 # relative paths to parquet files to combine data from previous runs
-plot_input_data: Dict[Anchor, NormalizedPlotInputData] = dict()
+plot_input_data: Dict[Anchor, "NormalizedPlotInputData"] = dict()
 # plot objects to retried when plots are rendered, for ai, and for interactive use
-plot_by_id: Dict[Anchor, Union[Plot[Any, Any], str]] = dict()
+plot_by_id: Dict[Anchor, Union["Plot[Any, Any]", str]] = dict()
 # plot dumps to embed in html and load with js
 plot_data: Dict[Anchor, Dict[str, Any]] = dict()
 
-general_stats_data: Dict[SectionKey, Dict[SampleGroup, List[InputRow]]]
-general_stats_headers: Dict[SectionKey, Dict[ColumnKey, ColumnDict]]
+general_stats_data: Dict[SectionKey, Dict[SampleGroup, List["InputRow"]]]
+general_stats_headers: Dict[SectionKey, Dict[ColumnKey, "ColumnDict"]]
 software_versions: Dict[str, Dict[str, List[str]]]  # map software tools to unique versions
-plot_compressed_json: str
+plot_compressed_json: str  # placeholder that the report writer replaces with the compressed plot data
 # to make sure write_data_file don't overwrite for repeated modules. OrderedDict for fast lookup and to preserve insertion order:
 saved_raw_data_keys: Dict[str, None]
 saved_raw_data: Dict[str, Any] = dict()  # only populated if preserve_module_raw_data is enabled
@@ -227,6 +241,9 @@ def reset():
     saved_raw_data_keys = OrderedDict()
     saved_raw_data = dict()
 
+    # Imported here as the plot data store imports the report
+    from multiqc.core import plot_data_store
+
     plot_data_store.reset()
 
     tmp_dir.new_tmp_dir()
@@ -240,7 +257,11 @@ def reset_file_search():
     global analysis_files
     global files
     global file_search_stats
+    global file_contents_cache
+    global searchfile_stats
     analysis_files = []
+    searchfile_stats = dict()
+    file_contents_cache = FileContentsCache()
     files = dict()  # Discovered files for each search key
     file_search_stats = {
         "skipped_symlinks": set(),
@@ -310,14 +331,15 @@ class SearchFile:
             # process block again
     """
 
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, filesize: Optional[int] = None):
         self.path: Path = path
         self.filename = path.name
         self.root = path.parent
         self._filehandle: Optional[TextIO] = None
         self._iterator: Optional[Iterator[Tuple[int, str]]] = None
         self._blocks: List[Tuple[int, str]] = []  # cache of read blocks with line count found in each block
-        self._filesize: Optional[int] = None
+        self._filesize: Optional[int] = filesize
+        self._fully_read = False  # whether all blocks were read without decoding errors
 
     @property
     def filesize(self) -> Optional[int]:
@@ -378,6 +400,7 @@ class SearchFile:
             # When no lines are parsed, self.content_lines should be empty
             if not self._blocks and config.report_readerrors:
                 logger.debug(f"No utf-8 lines were read from the file, skipping {self.path}")
+            self._fully_read = True
             return  # No errors
         self._filehandle.close()
         self._filehandle = io.open(self.path, "rt", encoding="utf-8", errors="ignore")
@@ -397,6 +420,15 @@ class SearchFile:
         if not self._blocks and config.report_readerrors:
             logger.debug(f"No utf-8 lines were read from the file, skipping {self.path}")
 
+    def contents(self) -> Optional[str]:
+        """
+        Whole file contents, if the file was already read to the end without decoding errors.
+        Same as reading the file with `open(path, "r", encoding="utf-8").read()`.
+        """
+        if not self._fully_read:
+            return None
+        return "".join(block for _, block in self._blocks)
+
     def line_iterator(self) -> Iterator[Tuple[int, str]]:
         total_line_count = 0
         for _line_count, line_block in self.line_block_iterator():
@@ -423,9 +455,10 @@ class SearchFile:
         return {"fn": self.filename, "root": str(self.root), "sp_key": sp_key}
 
 
-def is_searching_in_source_dir(path: Path) -> bool:
+def is_searching_in_source_dir(path: Path, filenames: Optional[List[str]] = None) -> bool:
     """
-    Checks whether MultiQC is searching for files in the source code folder
+    Checks whether MultiQC is searching for files in the source code folder.
+    Pass the names of the files in the directory if they are already known.
     """
     multiqc_installation_dir_files = [
         "LICENSE",
@@ -438,7 +471,8 @@ def is_searching_in_source_dir(path: Path) -> bool:
         ".gitignore",
     ]
 
-    filenames = [f.name for f in path.iterdir() if f.is_file()]
+    if filenames is None:
+        filenames = [f.name for f in path.iterdir() if f.is_file()]
 
     if len(filenames) > 0 and all([fn in filenames for fn in multiqc_installation_dir_files]):
         logger.error(f"Error: MultiQC is running in source code directory! {path}")
@@ -502,32 +536,6 @@ def prep_ordered_search_files_list(
     spatterns: List[Dict[ModuleId, List[SearchPattern]]] = [{}, {}, {}, {}, {}, {}, {}]
     searchfiles: List[Path] = []
 
-    def _maybe_add_path_to_searchfiles(item: Path):
-        """
-        Branching logic to handle analysis paths (directories and files)
-        Walks directory trees recursively calling pathlib's `path.iterdir()`.
-        Guaranteed to work correctly with symlinks even on non-POSIX compliant filesystems.
-        """
-        if item.is_symlink() and config.ignore_symlinks:
-            file_search_stats["skipped_symlinks"].add(item)
-            return
-        elif item.is_file():
-            searchfiles.append(item)
-        elif item.is_dir():
-            # Skip directory if it matches ignore patterns
-            d_matches = any(d for d in config.fn_ignore_dirs if item.match(d.rstrip(os.sep)))
-            p_matches = any(p for p in config.fn_ignore_paths if item.match(p.rstrip(os.sep)))
-            if d_matches or p_matches:
-                file_search_stats["skipped_directory_fn_ignore_dirs"].add(item)
-                return
-
-            # Check not running in install directory
-            if is_searching_in_source_dir(item):
-                return
-
-            for item in item.iterdir():
-                _maybe_add_path_to_searchfiles(item)
-
     ignored_patterns = []
     skipped_patterns = []
 
@@ -610,82 +618,392 @@ def prep_ordered_search_files_list(
         logger.debug(f"Skipping search patterns: {', '.join(skipped_patterns)}")
 
     # Go through the analysis directories and get file list in searchfiles
-    for path in analysis_files:
-        _maybe_add_path_to_searchfiles(Path(path))
+    searchfiles = walk_analysis_paths([Path(path) for path in analysis_files])
 
     return spatterns, searchfiles
 
 
-def run_search_files(spatterns: List[Dict[ModuleId, List[SearchPattern]]], searchfiles: List[Path]):
-    runtimes.sp = defaultdict()
-    total_sp_starttime = time.time()
+def _is_ignored_dir(path: Path) -> bool:
+    d_matches = any(d for d in config.fn_ignore_dirs if path.match(d.rstrip(os.sep)))
+    p_matches = any(p for p in config.fn_ignore_paths if path.match(p.rstrip(os.sep)))
+    return d_matches or p_matches
 
-    def add_file(path: Path):
-        """
-        Function applied to each file found when walking the analysis
-        directories. Runs through all search patterns and returns True
-        if a match is found.
-        """
-        search_f = SearchFile(path)
 
-        # Check that this is a file and not a pipe or anything weird
-        if not path.is_file():
-            file_search_stats["skipped_not_a_file"].add(path)
-            return False
+def _scandir(path: Path) -> List[os.DirEntry]:
+    with os.scandir(path) as it:
+        return list(it)
+
+
+def walk_analysis_paths(paths: List[Path]) -> List[Path]:
+    """
+    Walk the analysis paths depth-first and return the files to search, in the order in which
+    they are listed. Directories matching `fn_ignore_dirs` or `fn_ignore_paths` are skipped without
+    being listed. Sizes and modification times come from the directory listing and are saved in
+    `searchfile_stats`, so the search doesn't need to query the filesystem again.
+
+    With `config.filesearch_workers > 1`, subdirectories are listed by a pool of threads ahead of
+    the walk, which helps on network filesystems where each listing is a round-trip.
+    """
+    from concurrent.futures import Future, ThreadPoolExecutor
 
-        if search_f.filesize is not None and search_f.filesize > config.log_filesize_limit:
-            file_search_stats["skipped_filesize_limit"].add(path)
+    start = time.time()
+    searchfiles: List[Path] = []
+    executor: Optional[ThreadPoolExecutor] = None
+    if config.filesearch_workers > 1:
+        executor = ThreadPoolExecutor(max_workers=config.filesearch_workers, thread_name_prefix="multiqc_walk")
+    # Listings of the directories that are going to be walked, started in advance by the executor
+    listings: Dict[Path, "Future[List[os.DirEntry]]"] = {}
+
+    def _add_file(path: Path, stat_fn: Callable[[], os.stat_result]):
+        searchfiles.append(path)
+        stat_start = time.time()
+        try:
+            st = stat_fn()
+        except OSError:
+            pass  # the search will find that the file can't be read
+        else:
+            searchfile_stats[str(path)] = (st.st_size, st.st_mtime_ns, st.st_ino)
+        runtimes.walk["stat_files"] += time.time() - stat_start
+
+    def _should_descend(path: Path) -> bool:
+        # Skip directory if it matches ignore patterns
+        if _is_ignored_dir(path):
+            file_search_stats["skipped_directory_fn_ignore_dirs"].add(path)
             return False
+        return True
 
-        # Use mimetypes to exclude binary files where possible
-        if not re.match(r".+_mqc\.(png|jpg|jpeg|gif|webp|tiff)", search_f.filename) and config.ignore_images:
-            (ftype, encoding) = mimetypes.guess_type(str(path))
-            if encoding is not None and encoding != "gzip":
-                return False
-            if ftype is not None and ftype.startswith("image"):
-                return False
+    def _list_dir(path: Path) -> Optional[List[os.DirEntry]]:
+        list_start = time.time()
+        future = listings.pop(path, None)
+        entries = future.result() if future is not None else _scandir(path)
+        runtimes.walk["list_dirs"] += time.time() - list_start
 
-        # Check if file is in ignore files
-        is_ignore_file = False
+        # Check not running in install directory
+        if is_searching_in_source_dir(path, [e.name for e in entries if e.is_file()]):
+            return None
+        if executor is not None:
+            for e in entries:
+                if not (e.is_symlink() and config.ignore_symlinks) and e.is_dir():
+                    subdir = path.joinpath(e.name)
+                    if not _is_ignored_dir(subdir):
+                        listings[subdir] = executor.submit(_scandir, subdir)
+        return entries
+
+    try:
+        for root in paths:
+            # Top-level analysis paths
+            if root.is_symlink() and config.ignore_symlinks:
+                file_search_stats["skipped_symlinks"].add(root)
+                continue
+            elif root.is_file():
+                _add_file(root, lambda: os.stat(root))
+                continue
+            elif not root.is_dir() or not _should_descend(root):
+                continue
+            root_entries = _list_dir(root)
+            if root_entries is None:
+                continue
+
+            # Iterative depth-first walk, keeping the listing order of each directory
+            stack: List[Tuple[Path, Iterator[os.DirEntry]]] = [(root, iter(root_entries))]
+            while stack:
+                dir_path, dir_entries = stack[-1]
+                entry = next(dir_entries, None)
+                if entry is None:
+                    stack.pop()
+                    continue
+                path = dir_path.joinpath(entry.name)
+                if entry.is_symlink() and config.ignore_symlinks:
+                    file_search_stats["skipped_symlinks"].add(path)
+                elif entry.is_file():
+                    _add_file(path, entry.stat)
+                elif entry.is_dir() and _should_descend(path):
+                    entries = _list_dir(path)
+                    if entries is not None:
+                        stack.append((path, iter(entries)))
+    finally:
+        if executor is not None:
+            for future in listings.values():
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    runtimes.total_walk += time.time() - start
+    return searchfiles
+
+
+@dataclasses.dataclass
+class FileSearchResult:
+    """
+    Outcome of searching one file against all search patterns. Produced independently for
+    each file, so it can be computed by a worker and merged into `files`, `file_search_stats`
+    and `runtimes.sp` by the main process in the order of the searched files.
+    """
+
+    path: Path
+    matched: bool = False
+    matches: List[Tuple[ModuleId, FileDict]] = dataclasses.field(default_factory=list)
+    stats: Dict[str, Set[Path]] = dataclasses.field(default_factory=lambda: defaultdict(set))
+    runtimes: Dict[ModuleId, float] = dataclasses.field(default_factory=dict)
+    # Contents of a matched file that was read to the end during the search
+    contents: Optional[str] = None
+
+
+def search_file_against_patterns(
+    path: Path,
+    spatterns: List[Dict[ModuleId, List[SearchPattern]]],
+    fn_matcher: Optional[FilenameMatcher] = None,
+    content_matcher: Optional[ContentMatcher] = None,
+    keep_contents: bool = False,
+    filesize: Optional[int] = None,
+) -> FileSearchResult:
+    """
+    Function applied to each file found when walking the analysis
+    directories. Runs through all search patterns and records the matches.
+    Does not modify the global report state.
+
+    If `fn_matcher` is given, it is used to find the patterns matching the file name in one
+    lookup, so only those patterns are tested further. If `content_matcher` is given, the file
+    contents are scanned once for all patterns instead of once per pattern. With `keep_contents`,
+    the contents of a matched file are kept in the result if the search read the whole file.
+    `filesize` is the size of a regular file known from the directory walk.
+    """
+    result = FileSearchResult(path=path)
+    search_f = SearchFile(path, filesize=filesize)
+
+    # Check that this is a file and not a pipe or anything weird
+    if filesize is None and not path.is_file():
+        result.stats["skipped_not_a_file"].add(path)
+        return result
+
+    if search_f.filesize is not None and search_f.filesize > config.log_filesize_limit:
+        result.stats["skipped_filesize_limit"].add(path)
+        return result
+
+    # Use mimetypes to exclude binary files where possible
+    if not re.match(r".+_mqc\.(png|jpg|jpeg|gif|webp|tiff)", search_f.filename) and config.ignore_images:
+        (ftype, encoding) = mimetypes.guess_type(str(path))
+        if encoding is not None and encoding != "gzip":
+            return result
+        if ftype is not None and ftype.startswith("image"):
+            return result
+
+    # Check if file is in ignore files
+    is_ignore_file = False
+    fn_matches: Optional[Dict[ModuleId, AbstractSet[int]]] = None
+    if fn_matcher is not None:
+        is_ignore_file = fn_matcher.is_ignored(search_f.filename)
+        fn_matches = fn_matcher.match(search_f.filename)
+    else:
         for ignore_pat in config.fn_ignore_files:
             if fnmatch.fnmatch(search_f.filename, ignore_pat):
                 is_ignore_file = True
 
-        # Test file for each search pattern
-        file_matched = False
-        with search_f:  # Ensure any open filehandles are closed.
-            for patterns in spatterns:
-                for module_id, sps in patterns.items():
-                    start = time.time()
-                    for sp in sps:
-                        if search_file(sp, search_f, module_id, is_ignore_file):
-                            # Check that we shouldn't exclude this file
-                            if not exclude_file(sp, search_f):
-                                # Looks good! Remember this file
-                                if module_id not in files:
-                                    files[module_id] = []
-                                files[module_id].append(search_f.to_dict(sp_key=module_id))
-                                file_search_stats[module_id] = file_search_stats.get(module_id, set()) | {path}
-                                file_matched = True
-                                # logger.debug(f"File {f.path} matched {module_id}")
-                            # Don't keep searching this file for other modules
-                            if not sp.shared and module_id not in config.filesearch_file_shared:
-                                runtimes.sp[module_id] = runtimes.sp.get(module_id, 0) + (time.time() - start)
-                                return True
-                            # Don't look at other patterns for this module
-                            break
-                    runtimes.sp[module_id] = runtimes.sp.get(module_id, 0) + (time.time() - start)
-        return file_matched
+    # Test file for each search pattern
+    with search_f:  # Ensure any open filehandles are closed.
+        content_scan: Optional[FileContentScan] = None
+        if content_matcher is not None:
+            content_scan = content_matcher.scan(search_f)
+            # Rule out the patterns with none of their contents in the file in one go
+            if fn_matches is not None and not is_ignore_file:
+                fn_matches = content_scan.prune(fn_matches)
+
+        for patterns in spatterns:
+            for module_id, sps in patterns.items():
+                if fn_matches is not None and module_id not in fn_matches:
+                    continue
+                start = time.time()
+                for i, sp in enumerate(sps):
+                    if fn_matches is not None and i not in fn_matches[module_id]:
+                        continue
+                    if search_file(
+                        sp,
+                        search_f,
+                        module_id,
+                        is_ignore_file,
+                        stats=result.stats,
+                        fn_matched=fn_matches is not None,
+                        content_scan=content_scan,
+                    ):
+                        # Check that we shouldn't exclude this file
+                        if not exclude_file(sp, search_f):
+                            # Looks good! Remember this file
+                            result.matches.append((module_id, search_f.to_dict(sp_key=module_id)))
+                            result.matched = True
+                        # Don't keep searching this file for other modules
+                        if not sp.shared and module_id not in config.filesearch_file_shared:
+                            result.runtimes[module_id] = result.runtimes.get(module_id, 0) + (time.time() - start)
+                            result.matched = True
+                            if keep_contents and result.matches:
+                                result.contents = search_f.contents()
+                            return result
+                        # Don't look at other patterns for this module
+                        break
+                result.runtimes[module_id] = result.runtimes.get(module_id, 0) + (time.time() - start)
+        if keep_contents and result.matches:
+            result.contents = search_f.contents()
+    return result
+
+
+def _merge_file_search_result(result: FileSearchResult):
+    """
+    Add the outcome of searching a single file to the global file search state.
+    """
+    for module_id, f in result.matches:
+        files.setdefault(module_id, []).append(f)
+        file_search_stats.setdefault(module_id, set()).add(result.path)
+    for key, paths in result.stats.items():
+        file_search_stats.setdefault(key, set()).update(paths)
+    for module_id, runtime in result.runtimes.items():
+        runtimes.sp[module_id] = runtimes.sp.get(module_id, 0) + runtime
+    if not result.matched:
+        file_search_stats["skipped_no_match"].add(result.path)
+    if result.contents is not None:
+        file_contents_cache.put(os.path.join(result.path.parent, result.path.name), result.contents)
+
+
+def _cached_file_search_result(path: Path, cached: CachedResult) -> FileSearchResult:
+    """
+    Rebuild the search result of a file from the search cache
+    """
+    result = FileSearchResult(path=path, matched=cached.matched)
+    search_f = SearchFile(path)
+    for module_id in cached.modules:
+        result.matches.append((module_id, search_f.to_dict(sp_key=module_id)))
+    for key in cached.stats:
+        result.stats[key].add(path)
+    return result
+
+
+# Search patterns and config for the file search worker processes, set by _init_search_worker
+_worker_spatterns: List[Dict[ModuleId, List[SearchPattern]]] = []
+_worker_fn_matcher: Optional[FilenameMatcher] = None
+_worker_content_matcher: Optional[ContentMatcher] = None
+
+# Config fields that affect the file search, propagated to the worker processes
+_SEARCH_WORKER_CONFIG_KEYS = [
+    "log_filesize_limit",
+    "ignore_images",
+    "fn_ignore_files",
+    "filesearch_lines_limit",
+    "filesearch_file_shared",
+    "report_readerrors",
+]
+
+
+def _init_search_worker(spatterns: List[Dict[ModuleId, List[SearchPattern]]], config_values: Dict[str, Any]):
+    global _worker_spatterns, _worker_fn_matcher, _worker_content_matcher
+    _worker_spatterns = spatterns
+    for key, value in config_values.items():
+        setattr(config, key, value)
+    _worker_fn_matcher = FilenameMatcher(spatterns, config.fn_ignore_files)
+    _worker_content_matcher = ContentMatcher(spatterns, config.filesearch_lines_limit)
+
+
+def _search_file_in_worker(path: Path, filesize: Optional[int]) -> FileSearchResult:
+    return search_file_against_patterns(
+        path, _worker_spatterns, _worker_fn_matcher, _worker_content_matcher, filesize=filesize
+    )
+
+
+def _walked_filesize(path: Path) -> Optional[int]:
+    st = searchfile_stats.get(str(path))
+    return st[0] if st is not None else None
+
+
+def _search_files_in_parallel(
+    spatterns: List[Dict[ModuleId, List[SearchPattern]]],
+    searchfiles: List[Path],
+    fn_matcher: FilenameMatcher,
+    content_matcher: ContentMatcher,
+) -> Iterator[FileSearchResult]:
+    """
+    Search files using a pool of `config.filesearch_workers` threads or processes.
+    Yields the results in the order of `searchfiles`.
+    """
+    from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+    n_workers = config.filesearch_workers
+    executor: Executor
+    if config.filesearch_executor == "process":
+        config_values = {key: getattr(config, key) for key in _SEARCH_WORKER_CONFIG_KEYS}
+        executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_search_worker,
+            initargs=(spatterns, config_values),
+        )
+        # Send files in batches to amortise the inter-process communication overhead
+        chunksize = max(1, min(256, len(searchfiles) // (n_workers * 4)))
+        filesizes = [_walked_filesize(path) for path in searchfiles]
+        results = executor.map(_search_file_in_worker, searchfiles, filesizes, chunksize=chunksize)
+    else:
+        executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="multiqc_search")
+        # Threads share memory with the main process, so can hand over the contents of the files they read
+        keep_contents = file_contents_cache.max_size > 0
+        results = executor.map(
+            lambda path: search_file_against_patterns(
+                path, spatterns, fn_matcher, content_matcher, keep_contents, _walked_filesize(path)
+            ),
+            searchfiles,
+        )
+    with executor:
+        yield from results
+
+
+def run_search_files(spatterns: List[Dict[ModuleId, List[SearchPattern]]], searchfiles: List[Path]):
+    runtimes.sp = defaultdict()
+    total_sp_starttime = time.time()
+
+    # Compile all file name patterns into one dispatch structure, and all contents patterns into one scanner
+    fn_matcher = FilenameMatcher(spatterns, config.fn_ignore_files)
+    content_matcher = ContentMatcher(spatterns, config.filesearch_lines_limit)
+
+    # Reuse the results of the files that didn't change since the previous run
+    cache: Optional[SearchCache] = None
+    cached: Dict[Path, CachedResult] = {}
+    if config.filesearch_cache:
+        cache = SearchCache.open(search_config_hash(spatterns))
+        if cache is not None:
+            cached = cache.lookup(searchfiles, searchfile_stats)
+            logger.debug(f"Using cached search results for {len(cached)} of {len(searchfiles)} files")
+    to_search = [sf for sf in searchfiles if sf not in cached] if cached else searchfiles
+
+    # Keep the contents of small matched files read during the search, for the modules to reuse
+    file_contents_cache.max_size = config.filesearch_contents_cache_size
+    keep_contents = file_contents_cache.max_size > 0
+
+    if config.filesearch_workers > 1 and len(to_search) > 1:
+        logger.debug(f"Searching files using {config.filesearch_workers} {config.filesearch_executor} workers")
+        results = _search_files_in_parallel(spatterns, to_search, fn_matcher, content_matcher)
+
+        def search_fn(sf: Path) -> FileSearchResult:
+            result = next(results)
+            assert result.path == sf
+            return result
+
+    else:
+
+        def search_fn(sf: Path) -> FileSearchResult:
+            return search_file_against_patterns(
+                sf, spatterns, fn_matcher, content_matcher, keep_contents, _walked_filesize(sf)
+            )
 
     def update_fn(_, sf: Path):
-        if not add_file(sf):
-            file_search_stats["skipped_no_match"].add(sf)
+        cached_result = cached.get(sf)
+        if cached_result is not None:
+            _merge_file_search_result(_cached_file_search_result(sf, cached_result))
+            return
+        result = search_fn(sf)
+        if cache is not None:
+            cache.add(sf, result.matched, [m for m, _ in result.matches], [k for k, v in result.stats.items() if v])
+        _merge_file_search_result(result)
 
     iterate_using_progress_bar(
         items=searchfiles,
         update_fn=update_fn,
         desc="searching",
     )
+    if cache is not None:
+        cache.close()
 
     runtimes.total_sp = time.time() - total_sp_starttime
     if config.profile_runtime:
@@ -718,28 +1036,35 @@ def search_file(
     f: SearchFile,
     module_key: ModuleId,
     is_ignore_file: bool = False,
+    stats: Optional[Dict[str, Set[Path]]] = None,
+    fn_matched: bool = False,
+    content_scan: Optional[FileContentScan] = None,
 ):
     """
     Function to search a single file for a single search pattern.
+    Skipped files are recorded in `stats`, which defaults to the global `file_search_stats`.
+    Set `fn_matched` if the file name was already matched against `fn` and `fn_re`.
+    If `content_scan` is given, the file contents are looked up in the shared scan of the file.
     """
-
-    global file_search_stats
+    if stats is None:
+        stats = file_search_stats
 
     # Search pattern specific filesize limit
     if pattern.max_filesize is not None and f.filesize:
         if f.filesize > pattern.max_filesize:
-            file_search_stats["skipped_module_specific_max_filesize"].add(f.path)
+            stats["skipped_module_specific_max_filesize"].add(f.path)
             return False
 
-    # Search by file name (glob)
-    if pattern.fn is not None:
-        if not fnmatch.fnmatch(f.filename, pattern.fn):
-            return False
+    if not fn_matched:
+        # Search by file name (glob)
+        if pattern.fn is not None:
+            if not fnmatch.fnmatch(f.filename, pattern.fn):
+                return False
 
-    # Search by file name (regex)
-    if pattern.fn_re is not None:
-        if not re.match(pattern.fn_re, f.filename):
-            return False
+        # Search by file name (regex)
+        if pattern.fn_re is not None:
+            if not re.match(pattern.fn_re, f.filename):
+                return False
 
     # If we only had fn and fn_re, can assume matching is done:
     if not pattern.contents and not pattern.contents_re:
@@ -747,10 +1072,17 @@ def search_file(
 
     if is_ignore_file:
         # Ignore filenames are never searched for content.
-        file_search_stats["skipped_ignore_pattern"].add(f.path)
+        stats["skipped_ignore_pattern"].add(f.path)
         return False
 
     # Search by file contents
+    if content_scan is not None:
+        try:
+            return content_scan.matches(pattern)
+        except Exception:
+            stats["skipped_file_contents_search_errors"].add(f.path)
+            return False
+
     num_lines = pattern.num_lines or config.filesearch_lines_limit
 
     total_lines = 0
@@ -787,7 +1119,7 @@ def search_file(
             if total_lines >= num_lines:
                 break
     except Exception:
-        file_search_stats["skipped_file_contents_search_errors"].add(f.path)
+        stats["skipped_file_contents_search_errors"].add(f.path)
         return False
 
     strings_match = not query_strings or len(match_strings) == len(query_strings)
@@ -811,7 +1143,10 @@ def exclude_file(sp, f: SearchFile):
         if pat and re.match(pat, f.filename):
             return True
 
-    # Search the contents of the file
+    # Search the contents of the file. Only read it if there is something to look for,
+    # otherwise every matched file would be read to the end.
+    if not sp.exclude_contents and not sp.exclude_contents_re:
+        return False
     for num_lines, line_block in f.line_block_iterator():
         if sp.exclude_contents:
             for pat in sp.exclude_contents:
@@ -942,11 +1277,30 @@ def compress_json(data):
     buffer = io.BytesIO()
     with gzip.open(buffer, "wt", encoding="utf-8", compresslevel=6) as gzip_buffer:
         # The compression level 6 gives 10% speed gain vs. 2% extra size, in contrast to default compresslevel=9
-        dump_json(data, gzip_buffer)
+        dump_json(data, gzip_buffer, ensure_ascii=False)
     base64_bytes = base64.b64encode(buffer.getvalue())
     return base64_bytes.decode("ascii")
 
 
+def compress_plot_data(data: Mapping[Anchor, Dict[str, Any]]) -> str:
+    """
+    Compress the dump of each plot separately, so that the report can decompress only the plots
+    that are viewed. Returns a JSON object of the compressed dumps keyed by plot anchor.
+    """
+    return "".join(iter_compressed_plot_data(data))
+
+
+def iter_compressed_plot_data(data: Mapping[Anchor, Dict[str, Any]]) -> Iterator[str]:
+    """
+    Same as `compress_plot_data()`, but yields the JSON one plot at a time, so that the compressed
+    data of all plots doesn't have to be held in memory at once
+    """
+    yield "{"
+    for idx, (anchor, dump) in enumerate(data.items()):
+        yield ("" if idx == 0 else ", ") + json.dumps(anchor) + ": " + json.dumps(compress_json(dump))
+    yield "}"
+
+
 def write_data_file(
     data: Union[
         Mapping[str, Any],
@@ -1026,21 +1380,106 @@ def write_data_file(
             data_format = "yaml"
             logger.debug(f"{fn} could not be saved as tsv/csv, falling back to YAML. {e}")
 
+    df = None
+    if data_format in ["parquet", "arrow"]:
+        # noinspection PyBroadException
+        try:
+            df = _data_file_dataframe(data, sort_cols)
+        except Exception as e:
+            if config.development:
+                raise
+            logger.debug(f"{fn} could not be saved as {data_format}, falling back to YAML. {e}")
+            data_format = "yaml"
+
+    # Serialize now, as modules may keep changing the data after saving it. Only writing the
+    # file to disk is left to the background writer threads.
+    text = None
+    if data_format == "json":
+        f = io.StringIO()
+        dump_json(data, f, indent=4, ensure_ascii=False)
+        text = f.getvalue()
+    elif data_format == "yaml":
+        text = yaml.dump(replace_defaultdicts(data), default_flow_style=False)
+    elif body:
+        # Default - tab separated output
+        text = body.encode("utf-8", "ignore").decode("utf-8") + "\n"
+
+    def write(path: Path):
+        if df is not None:
+            if data_format == "parquet":
+                df.write_parquet(path)
+            else:
+                df.write_ipc(path)
+        else:
+            with open(path, "w", encoding="utf-8", errors="ignore") as fh:
+                if text:
+                    fh.write(text)
+
     # Add relevant file extension to filename, save file.
     fn = f"{fn}.{config.data_format_extensions[data_format]}"
-    fpath = data_tmp_dir() / fn
     assert data_tmp_dir() and data_tmp_dir().exists()
-    with open(fpath, "w", encoding="utf-8", errors="ignore") as f:
-        if data_format == "json":
-            dump_json(data, f, indent=4, ensure_ascii=False)
-        elif data_format == "yaml":
-            yaml.dump(replace_defaultdicts(data), f, default_flow_style=False)
-        elif body:
-            # Default - tab separated output
-            print(body.encode("utf-8", "ignore").decode("utf-8"), file=f)
+    data_file_writer.submit(write, data_tmp_dir() / fn)
     logger.debug(f"Wrote data file {fn}")
 
 
+def _data_file_dataframe(
+    data: Union[Mapping[str, Any], Sequence[Mapping[str, Any]], Sequence[Sequence[Any]]],
+    sort_cols: bool = False,
+) -> "pl.DataFrame":
+    """
+    Columnar data file for the parquet and arrow formats: a 2D dict is written with one row per sample,
+    in the same layout as the tsv/csv files, and a list of dicts with one row per dict. Raises ValueError
+    for other data, e.g. a list of lists, which is then saved as YAML.
+    """
+    import polars as pl
+
+    columns: Dict[str, List[Any]] = {}
+    rows: List[Dict[str, Any]] = []
+    if isinstance(data, Mapping):
+        items = sorted(data.items())
+        columns["Sample"] = [str(key) for key, _ in items]
+        for _, d in items:
+            if not isinstance(d, Mapping):
+                raise ValueError("values are not dicts")
+            rows.append({str(k): v for k, v in d.items()})
+    else:
+        for d in data:
+            if not isinstance(d, Mapping):
+                raise ValueError("rows are not dicts")
+            rows.append({str(k): v for k, v in d.items()})
+
+    headers = list(dict.fromkeys(h for row in rows for h in row))
+    if sort_cols:
+        headers = sorted(headers)
+    for h in headers:
+        columns[h] = [row.get(h) for row in rows]
+    return pl.DataFrame(columns, strict=False)
+
+
+def _dump_json_by_key(data: Dict[str, Any], f: TextIO):
+    """
+    Same as `dump_json(data, f, indent=4, ensure_ascii=False)`, but streams the data key by key, leaving out
+    the keys that can't be encoded. Each key is encoded only once, straight into the file.
+    """
+    encoder = JsonEncoder(indent=4, ensure_ascii=False)
+    f.write("{")
+    n_written = 0
+    for key, val in data.items():
+        pos = f.tell()
+        try:
+            f.write(("," if n_written else "") + "\n    " + encoder.encode(key) + ": ")
+            for chunk in encoder.iterencode(val):
+                # Newlines in the encoded JSON are never inside strings, so this indents the value by a level
+                f.write(chunk.replace("\n", "\n    "))
+        except (TypeError, ValueError) as e:
+            f.seek(pos)
+            f.truncate()
+            logger.warning(f"Couldn't export data key '{key.replace('_', '.', 1)}': {e}")
+            continue
+        n_written += 1
+    f.write("\n}" if n_written else "}")
+
+
 def multiqc_dump_json(data_dir: Path):
     """
     Export the parsed data in memory to a JSON file and parquet file.
@@ -1085,7 +1524,9 @@ def multiqc_dump_json(data_dir: Path):
                     val = getattr(sys.modules[__name__], name)
                     if name == "general_stats_data":
                         # Flattening sample groups for export
-                        flattened_sections: Dict[SectionKey, Dict[SampleName, Dict[ColumnKey, Optional[ValueT]]]] = {}
+                        from multiqc.plots.table_object import Cell
+
+                        flattened_sections: Dict[SectionKey, Dict[SampleName, Dict[ColumnKey, Optional["ValueT"]]]] = {}
                         for section_key, section in general_stats_data.items():
                             fl_sec = dict()
                             for _, rows in section.items():
@@ -1121,10 +1562,6 @@ def multiqc_dump_json(data_dir: Path):
                             val = creation_date.strftime("%Y-%m-%d, %H:%M")
                     d = {f"{pymod}_{name}": val}
                 if d:
-                    with open(os.devnull, "wt") as f:
-                        # Test that exporting to JSON works. Write to
-                        # /dev/null so no memory is required.
-                        dump_json(d, f, ensure_ascii=False)
                     exported_data.update(d)
             except (TypeError, KeyError, AttributeError) as e:
                 logger.warning(f"Couldn't export data key '{pymod}.{name}': {e}")
@@ -1141,8 +1578,8 @@ def multiqc_dump_json(data_dir: Path):
     # Write to file
     out_path = data_dir / "multiqc_data.json"
     if config.data_dump_file:
-        with out_path.open("w") as f:
-            dump_json(exported_data, f, indent=4, ensure_ascii=False)
+        with out_path.open("w", encoding="utf-8") as f:
+            _dump_json_by_key(exported_data, f)
 
     # Add raw data - but instead of all in one, write key by key to avoid loading all in memory
     if config.data_dump_file_write_raw or config.megaqc_url:
@@ -1204,7 +1641,9 @@ def remove_tmp_dir():
     """
     Completely remove tmp dir
     """
+    data_file_writer.shutdown()
     log_and_rich.remove_file_handler()
+    tmp_dir.remove_data_tmp_dir()
     try:
         rmtree_with_retries(tmp_dir.get_tmp_dir())
     except Exception as e:
@@ -1221,6 +1660,8 @@ def reset_tmp_dir():
 
 
 def add_ai_summary():
+    from multiqc.core import ai
+
     ai.add_ai_summary_to_report()
 
 
@@ -12,6 +12,13 @@ function decompressPlotData(base64Str, callback) {
   }
 }
 
+function decompressPlotDataSync(base64Str) {
+  // Blocking version for data that is needed right away, e.g. to export or re-render a plot
+  const binaryString = atob(base64Str);
+  const bytes = Uint8Array.from(binaryString, (m) => m.codePointAt(0));
+  return decodeDecompressedBytes(pako.inflate(bytes));
+}
+
 function decodeDecompressedBytes(decompressedBytes) {
   const decoder = new TextDecoder("utf-8");
   const jsonStr = decoder.decode(decompressedBytes);
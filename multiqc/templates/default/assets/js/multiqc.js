@@ -2,7 +2,7 @@
 // Base JS for MultiQC Reports
 ////////////////////////////////////////////////
 
-// Collect functions to be called after plot data is decompressed.
+// Collect functions to be called after page load, once the plot data is ready to be decompressed.
 // Includes functions in plotting.js, and any module-specific JS like multiqc_fastqc.js
 let callAfterDecompressed = [];
 
@@ -125,7 +125,7 @@ class LinePlot extends Plot {
       updateObject(params, dataset["trace_params"], true);
 
       return {
-        type: "scatter",
+        type: this.webgl ? "scattergl" : "scatter",
         x: line.pairs.map((x) => x[0]),
         y: line.pairs.map((x) => x[1]),
         name: line.name,
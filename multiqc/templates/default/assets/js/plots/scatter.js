@@ -62,7 +62,7 @@ class ScatterPlot extends Plot {
     let nonHighlighted = points.filter((p) => !p.highlight);
     points = nonHighlighted.concat(highlighted);
 
-    return points.map((point) => {
+    let traces = points.map((point) => {
       let params = JSON.parse(JSON.stringify(dataset["trace_params"])); // deep copy
       params.marker.size = point["marker_size"] ?? params.marker.size;
       params.marker.line = {
@@ -82,6 +82,31 @@ class ScatterPlot extends Plot {
         ...params,
       };
     });
+    if (this.webgl) return [this.mergeTraces(traces)];
+    return traces;
+  }
+
+  // WebGL draws a single trace with many points much faster than many single-point traces
+  mergeTraces(traces) {
+    let marker = traces[0].marker;
+    return {
+      ...traces[0],
+      type: "scattergl",
+      mode: "markers",
+      name: "",
+      showlegend: false,
+      x: traces.map((t) => t.x[0]),
+      y: traces.map((t) => t.y[0]),
+      text: traces.map((t) => t.text[0]),
+      marker: {
+        ...marker,
+        size: traces.map((t) => t.marker.size),
+        opacity: traces.map((t) => t.marker.opacity),
+        color: traces.map((t) => t.marker.color),
+        symbol: traces.map((t) => t.marker.symbol),
+        line: { ...marker.line, width: traces.map((t) => t.marker.line.width) },
+      },
+    };
   }
 
   exportData(format) {
@@ -2,8 +2,46 @@
 // Plotly Plotting Code
 ////////////////////////////////////////////////
 
-// Global plot data variable. Accessed in many other JavaScript files.
-let mqc_plots = {};
+// Plots decompressed so far, keyed by anchor
+const mqc_loaded_plots = {};
+
+// Global plot data variable. Accessed in many other JavaScript files. The data of each plot is
+// compressed separately in mqc_compressed_plotdata, and only decompressed when the plot is first
+// accessed, or when it's scrolled into view (see loadPlot)
+let mqc_plots = new Proxy(mqc_loaded_plots, {
+  get(plots, anchor) {
+    if (!(anchor in plots) && typeof anchor === "string" && anchor in mqc_compressed_plotdata) {
+      addLoadedPlot(anchor, decompressPlotDataSync(mqc_compressed_plotdata[anchor]));
+    }
+    return plots[anchor];
+  },
+  has(plots, anchor) {
+    return anchor in plots || anchor in mqc_compressed_plotdata;
+  },
+});
+
+function addLoadedPlot(anchor, dump) {
+  if (!(anchor in mqc_loaded_plots)) mqc_loaded_plots[anchor] = initPlot(dump);
+  // The compressed string is not needed anymore
+  delete mqc_compressed_plotdata[anchor];
+}
+
+// Decompress a plot without blocking the page, and pass it to the callback
+function loadPlot(anchor, callback) {
+  if (anchor in mqc_loaded_plots || !(anchor in mqc_compressed_plotdata)) {
+    callback(mqc_loaded_plots[anchor]);
+    return;
+  }
+  decompressPlotData(mqc_compressed_plotdata[anchor], (dump, err) => {
+    if (err) {
+      console.error(err);
+      callback(undefined);
+      return;
+    }
+    addLoadedPlot(anchor, dump);
+    callback(mqc_loaded_plots[anchor]);
+  });
+}
 
 // Initialise the toolbox filters
 window.mqc_highlight_f_texts = [];
@@ -30,6 +68,7 @@ class Plot {
     this.lActive = dump["l_active"];
     this.pActive = dump["p_active"];
     this.deferRender = dump["defer_render"];
+    this.webgl = dump["webgl"];
     this.plotType = dump["plot_type"];
     this.pconfig = dump["pconfig"];
   }
@@ -178,17 +217,13 @@ $(function () {
   loadingWarning = $(".mqc_loading_warning").show();
 });
 
-callAfterDecompressed.push(function (mqc_plotdata) {
-  mqc_plots = Object.fromEntries(Object.values(mqc_plotdata).map((data) => [data.anchor, initPlot(data)]));
-
-  let shouldLoad = $(".hc-plot.not_loaded:visible");
-
-  // Show plots on page load: either render, or show the "Show Plot" button
-  shouldLoad.each(function () {
-    let anchor = $(this).attr("id");
-    let plot = mqc_plots[anchor];
-    setTimeout(function () {
-      // Deferring each plot call prevents browser from locking up
+callAfterDecompressed.push(function () {
+  // Show plots when they are scrolled into view: either render, or show the "Show Plot" button.
+  // Plots are decompressed in the background, so that the page doesn't lock up.
+  function showPlot(anchor) {
+    loadPlot(anchor, (plot) => {
+      // Skip if failed, or if already rendered in the meantime, e.g. with "Render all plots"
+      if (!plot || !$("#" + anchor).hasClass("not_loaded")) return;
       if (plot.deferRender) {
         $("#" + anchor)
           .removeClass("not_loaded")
@@ -196,14 +231,25 @@ callAfterDecompressed.push(function (mqc_plotdata) {
       } else {
         renderPlot(anchor);
       }
-      if ($(".hc-plot.not_loaded:visible").length === 0)
-        // All plots loaded successfully (rendered or deferred with "Show Plot"), so hiding the warning
-        $(".mqc_loading_warning").hide();
-    }, 50);
+    });
+  }
+
+  const observer = new IntersectionObserver(
+    (entries) => {
+      entries.forEach((entry) => {
+        if (!entry.isIntersecting) return;
+        observer.unobserve(entry.target);
+        showPlot(entry.target.id);
+      });
+    },
+    { rootMargin: "500px 0px" }, // start loading plots a bit before they come into view
+  );
+  $(".hc-plot.not_loaded").each(function () {
+    observer.observe(this);
   });
 
-  // All plots loaded successfully, so hiding the warning
-  if (shouldLoad.length === 0) loadingWarning.hide();
+  // Plots show their own placeholder until they are loaded, so hiding the warning
+  loadingWarning.hide();
 
   // Render a plot when clicked (heavy plots are not automatically rendered by default)
   $("body").on("click", ".render_plot", function (e) {
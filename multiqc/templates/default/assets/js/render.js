@@ -3,13 +3,8 @@
 ////////////////////////////////////////////////
 
 $(function () {
-  decompressPlotData(mqc_compressed_plotdata, (mqc_plotdata, err) => {
-    if (err) {
-      console.error(err);
-      return;
-    }
-    callAfterDecompressed.forEach(function (fn) {
-      fn(mqc_plotdata);
-    });
+  // Plot data is decompressed lazily plot by plot, see mqc_plots in plotting.js
+  callAfterDecompressed.forEach(function (fn) {
+    fn(mqc_plots);
   });
 });
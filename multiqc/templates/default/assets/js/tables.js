@@ -30,7 +30,8 @@ $(function () {
 
       return text;
     };
-    $(".mqc_per_sample_table").tablesorter({
+    // Tables with virtual scrolling are sorted by VirtualTable
+    $(".mqc_per_sample_table:not(.mqc_virtual_table)").tablesorter({
       sortInitialOrder: "desc",
       textExtraction: getSortVal,
       cancelSelection: false,
@@ -57,12 +58,33 @@ $(function () {
       let violinAnchor = $(this).data("violin-anchor");
       $("#mqc_violintable_wrapper_" + tableAnchor).show();
       $("#mqc_violintable_wrapper_" + violinAnchor).hide();
+      if (mqc_virtual_tables[tableAnchor] !== undefined) {
+        mqc_virtual_tables[tableAnchor].render();
+      }
     });
 
     $(".mqc_table_copy_btn").click(function () {
       let btn = $(this);
       let table = $(btn.data("clipboard-target"))[0];
 
+      let virtualTable = mqc_virtual_tables[$(table).attr("id")];
+      if (virtualTable !== undefined) {
+        // Only the rows in view are rendered, so copy the text of all rows instead of the selection
+        let textarea = $("<textarea>").val(virtualTable.toTsv()).appendTo("body");
+        textarea[0].select();
+        try {
+          document.execCommand("copy");
+          btn.addClass("active").html('<span class="glyphicon glyphicon-copy"></span> Copied!');
+          setTimeout(() => {
+            btn.removeClass("active").html('<span class="glyphicon glyphicon-copy"></span> Copy table');
+          }, 2000);
+        } catch (err) {
+          console.error("Failed to copy table: ", err);
+        }
+        textarea.remove();
+        return;
+      }
+
       const range = document.createRange();
       range.selectNode(table);
       window.getSelection().removeAllRanges();
@@ -101,6 +123,8 @@ $(function () {
         $(this).parent().find(".mqc-table-responsive").css("max-height", "400px");
         $(this).find("span").removeClass("glyphicon-chevron-down").addClass("glyphicon-chevron-down");
       }
+      let virtualTable = mqc_virtual_tables[$(this).parent().find(".mqc_table").attr("id")];
+      if (virtualTable !== undefined) virtualTable.render();
     });
 
     // TOOLBOX LISTENERS
@@ -108,8 +132,8 @@ $(function () {
     // highlight samples
     $(document).on("mqc_highlights", function (e, f_texts, f_cols, regex_mode) {
       $(".mqc_table_sortHighlight").hide();
-      $(".mqc_per_sample_table tbody th").removeClass("highlighted").removeData("highlight");
-      $(".mqc_per_sample_table tbody th").each(function (i) {
+      $(".mqc_per_sample_table:not(.mqc_virtual_table) tbody th").removeClass("highlighted").removeData("highlight");
+      $(".mqc_per_sample_table:not(.mqc_virtual_table) tbody th").each(function (i) {
         let th = $(this);
         let thtext = $(this).text();
         let thiscol = "#333";
@@ -122,12 +146,22 @@ $(function () {
         });
         $(this).css("color", thiscol);
       });
+      $.each(mqc_virtual_tables, function (tableAnchor, virtualTable) {
+        if (virtualTable.applyHighlights(f_texts, f_cols, regex_mode)) {
+          $(".mqc_table_sortHighlight[data-table-anchor='" + tableAnchor + "']").show();
+        }
+      });
     });
 
     // Sort MultiQC tables by highlight
     $(".mqc_table_sortHighlight").click(function (e) {
       e.preventDefault();
       let tableAnchor = $(this).data("table-anchor");
+      if (mqc_virtual_tables[tableAnchor] !== undefined) {
+        mqc_virtual_tables[tableAnchor].sortByHighlight($(this).data("direction"));
+        $(this).data("direction", $(this).data("direction") === "desc" ? "asc" : "desc");
+        return;
+      }
       // collect highlighted rows
       let hrows = $("#" + tableAnchor + " tbody th.highlighted")
         .parent()
@@ -147,7 +181,7 @@ $(function () {
 
     // Rename samples
     $(document).on("mqc_renamesamples", function (e, f_texts, t_texts, regex_mode) {
-      $(".mqc_per_sample_table tbody th span.th-sample-name").each(function () {
+      $(".mqc_per_sample_table:not(.mqc_virtual_table) tbody th span.th-sample-name").each(function () {
         let s_name = String($(this).data("original-sn"));
         $.each(f_texts, function (idx, f_text) {
           if (regex_mode) {
@@ -159,12 +193,15 @@ $(function () {
         });
         $(this).text(s_name);
       });
+      $.each(mqc_virtual_tables, function (tableAnchor, virtualTable) {
+        virtualTable.applyRenames(f_texts, t_texts, regex_mode);
+      });
     });
 
     // Hide samples
     $(document).on("mqc_hidesamples", function (e, f_texts, regex_mode) {
       // Hide rows in MultiQC tables
-      $(".mqc_per_sample_table tbody tr").each(function () {
+      $(".mqc_per_sample_table:not(.mqc_virtual_table) tbody tr").each(function () {
         let tr = $(this);
         let th = tr.find("th");
         let match = false;
@@ -196,7 +233,7 @@ $(function () {
       });
 
       // Hide empty columns
-      $(".mqc_per_sample_table").each(function () {
+      $(".mqc_per_sample_table:not(.mqc_virtual_table)").each(function () {
         let table = $(this);
         let gsthidx = 0;
         table.find("thead th").each(function () {
@@ -228,6 +265,9 @@ $(function () {
         let tid = $(this).attr("id").replace("_numcols", "");
         $(this).text($("#" + tid + " thead th:visible").length - 1);
       });
+      $.each(mqc_virtual_tables, function (tableAnchor, virtualTable) {
+        virtualTable.applyHides(f_texts, regex_mode);
+      });
     });
 
     // Support expanding grouped samples in table
@@ -331,32 +371,41 @@ $(function () {
       }
       let plotDataset = [];
 
-      // Get all sample names first
-      let samples = $("#" + tableAnchor + " tbody tr")
-        .map(function () {
-          return $(this).children("th.rowheader").find(".th-sample-name").text();
-        })
-        .get();
+      // Get sample names and values of the two columns
+      let pairs;
+      if (mqc_virtual_tables[tableAnchor] !== undefined) {
+        pairs = mqc_virtual_tables[tableAnchor].columnPairs(col1, col2);
+      } else {
+        pairs = $("#" + tableAnchor + " tbody tr")
+          .map(function () {
+            return {
+              name: $(this).children("th.rowheader").find(".th-sample-name").text(),
+              val1: $(this)
+                .children("td." + col1)
+                .data("sorting-val"),
+              val2: $(this)
+                .children("td." + col2)
+                .data("sorting-val"),
+            };
+          })
+          .get();
+      }
+      let samples = pairs.map((pair) => pair.name);
 
       // Apply toolbox settings to get highlighting info
       let sampleSettings = applyToolboxSettings(samples);
 
-      $("#" + tableAnchor + " tbody tr").each(function (e) {
-        let tr = $(this);
-        let sName = $(this).children("th.rowheader").find(".th-sample-name").text();
-        let val_1 = $(this)
-          .children("td." + col1)
-          .data("sorting-val");
-        let val_2 = $(this)
-          .children("td." + col2)
-          .data("sorting-val");
+      pairs.forEach(function (pair) {
+        let sName = pair.name;
+        let val_1 = pair.val1;
+        let val_2 = pair.val2;
 
         // Get settings for this sample
         let settings = sampleSettings[samples.indexOf(sName)];
 
         // Skip hidden samples
         if (settings.hidden) {
-          return true;
+          return;
         }
 
         if (!isNaN(parseFloat(val_1)) && isFinite(val_1) && !isNaN(parseFloat(val_2)) && isFinite(val_2)) {
@@ -494,25 +543,30 @@ $(function () {
         $(target + "_config_modal_table ." + metric).removeClass("text-muted");
       }
     });
-    // Hide empty rows
-    $(target + " tbody tr").each(function () {
-      let trIsEmpty = true;
-      let tr = $(this);
-      tr.find("td").each(function () {
-        let td = $(this);
-        if (!td.hasClass("column-hidden") && !td.hasClass("sorthandle") && td.text() !== "") {
-          trIsEmpty = false;
+    if (mqc_virtual_tables[tableAnchor] !== undefined) {
+      // Hides empty rows and updates counts
+      mqc_virtual_tables[tableAnchor].refresh();
+    } else {
+      // Hide empty rows
+      $(target + " tbody tr").each(function () {
+        let trIsEmpty = true;
+        let tr = $(this);
+        tr.find("td").each(function () {
+          let td = $(this);
+          if (!td.hasClass("column-hidden") && !td.hasClass("sorthandle") && td.text() !== "") {
+            trIsEmpty = false;
+          }
+        });
+        if (trIsEmpty) {
+          tr.addClass("row-empty");
+        } else {
+          tr.removeClass("row-empty");
         }
       });
-      if (trIsEmpty) {
-        tr.addClass("row-empty");
-      } else {
-        tr.removeClass("row-empty");
-      }
-    });
-    // Update counts
-    $(target + "_numrows").text($(target + " tbody tr:visible").length);
-    $(target + "_numcols").text($(target + " thead th:visible").length - 1);
+      // Update counts
+      $(target + "_numrows").text($(target + " tbody tr:visible").length);
+      $(target + "_numcols").text($(target + " thead th:visible").length - 1);
+    }
 
     // Also update the violin plot
     if (violinAnchor !== undefined) {
@@ -584,4 +638,405 @@ function change_mqc_table_col_order(table) {
       }
     }
   });
+  // Rows of tables with virtual scrolling follow the order of the header cells
+  if (mqc_virtual_tables[tableAnchor] !== undefined) {
+    mqc_virtual_tables[tableAnchor].render();
+  }
+}
+
+////////////////////////////////////////////////
+// Tables with virtual scrolling. Rows are embedded as compressed column data,
+// and only the rows scrolled into view are rendered.
+////////////////////////////////////////////////
+
+let mqc_virtual_tables = {};
+
+function escapeHtmlAttr(s) {
+  return String(s).replace(/"/g, "&quot;").replace(/'/g, "&#39;").replace(/</g, "&lt;").replace(/>/g, "&gt;");
+}
+
+// Colour of a value in a sequential colour scale, same as mqc_colour_scale.get_colour() with lighten=0.3
+function mqcScaleColour(scale, val) {
+  if (val === null || val === undefined) return "";
+  let rgb = (hex) => [1, 3, 5].map((i) => parseInt(hex.substring(i, i + 2), 16) / 255);
+  let colour;
+  if (scale.colours.length === 1) {
+    colour = rgb(scale.colours[0]);
+  } else {
+    let stripped = String(val).replace(/[^0-9.\-e]/g, "");
+    let num;
+    if (stripped === "") {
+      num = scale.min;
+    } else {
+      if (!/^-?(\d+\.?\d*|\.\d+)(e-?\d+)?$/.test(stripped)) return "";
+      num = Math.min(Math.max(Number(stripped), scale.min), scale.max);
+    }
+    let n = scale.colours.length;
+    let step = (scale.max - scale.min) / (n - 1);
+    let domain = scale.colours.map((_, i) => (i === n - 1 ? scale.max : i * step + scale.min));
+    for (let i = 0; i < n - 1; i++) {
+      if (num >= domain[i] && num <= domain[i + 1]) {
+        let prop = (num - domain[i]) / (domain[i + 1] - domain[i]);
+        let c0 = rgb(scale.colours[i]);
+        let c1 = rgb(scale.colours[i + 1]);
+        colour = c0.map((u, j) => u * (1.0 - prop) + c1[j] * prop);
+        break;
+      }
+    }
+    if (colour === undefined) return "";
+  }
+  let alpha = Math.min(
+    ...colour.map((x) => {
+      if (Math.abs(x - 1.0) < 1e-6) return 1.0;
+      let lightened = Math.max(0, Math.min(1, 1 + (x - 1) * 0.3));
+      return Math.max(0, Math.min(1, (1 - lightened) / (1 - x)));
+    }),
+  );
+  let [r, g, b] = colour.map((x) => Math.trunc(x * 255));
+  return `rgba(${r},${g},${b},${Number.isInteger(alpha) ? alpha.toFixed(1) : alpha})`;
+}
+
+class VirtualTable {
+  constructor(table, data) {
+    this.table = table;
+    this.anchor = table.attr("id");
+    this.tbody = table.find("tbody");
+    this.container = table.closest(".mqc-table-responsive");
+    this.rows = data.rows; // [sample group, sample name]
+    this.columns = data.columns;
+    this.rowHeight = 24;
+    this.nonTrivialGroups = false;
+
+    // Position of each row in its group, and the size of the group
+    this.groupStart = [];
+    this.groupSize = {};
+    this.rows.forEach(([g], i) => {
+      this.groupStart.push(i > 0 && this.rows[i - 1][0] === g ? this.groupStart[i - 1] : i);
+      this.groupSize[g] = (this.groupSize[g] ?? 0) + 1;
+      if (this.groupSize[g] > 1) this.nonTrivialGroups = true;
+    });
+
+    this.names = this.rows.map(([, s]) => String(s));
+    this.hidden = this.rows.map(() => false);
+    this.highlight = this.rows.map(() => null);
+    this.expanded = {};
+    this.filter = "";
+    this.sortList = [];
+    this.order = this.rows.map((_, i) => i);
+    this.visible = [];
+
+    let sortlist = table.data("sortlist");
+    if (sortlist) {
+      this.sortList = (typeof sortlist === "string" ? JSON.parse(sortlist) : sortlist).map(([idx, dir]) => [
+        idx,
+        dir === 0 ? 1 : -1,
+      ]);
+    }
+
+    // Header cells sort the rows, like tablesorter does for the other tables
+    let vt = this;
+    table.find("thead th").each(function (idx) {
+      $(this).wrapInner('<div class="tablesorter-header-inner"></div>');
+      $(this).click(function () {
+        let current = vt.sortList.length > 0 && vt.sortList[0][0] === idx ? vt.sortList[0][1] : null;
+        vt.sortList = [[idx, current === -1 ? 1 : -1]];
+        vt.sort();
+      });
+    });
+    this.tbody.on("click", "tr.expandable-row-primary", function () {
+      if (window.getSelection().toString().length > 0) return;
+      let g = vt.rows[$(this).data("row-idx")][0];
+      vt.expanded[g] = !vt.expanded[g];
+      vt.refresh();
+    });
+
+    // Filter rows by sample name
+    let filter = $(
+      '<input type="search" class="form-control input-sm mqc_virtual_table_filter" placeholder="Filter samples" style="max-width: 250px; margin-bottom: 5px;">',
+    );
+    filter.on("input", function () {
+      vt.filter = $(this).val().toLowerCase();
+      vt.refresh();
+    });
+    this.container.before(filter);
+
+    let scheduled = false;
+    let onScroll = function () {
+      if (scheduled) return;
+      scheduled = true;
+      window.requestAnimationFrame(function () {
+        scheduled = false;
+        vt.render();
+      });
+    };
+    this.container.on("scroll", onScroll);
+    $(window).on("scroll resize", onScroll);
+
+    this.sort();
+  }
+
+  // Anchors of the table columns, in the order of the header cells
+  colAnchors() {
+    return this.table
+      .find("thead th")
+      .slice(1)
+      .map(function () {
+        return { anchor: $(this).attr("id").replace(/^header_/, ""), hidden: $(this).hasClass("column-hidden") };
+      })
+      .get();
+  }
+
+  // Value used to sort a row by a column: the value of the first row of its sample group
+  sortValue(col, rowIdx) {
+    let start = this.groupStart[rowIdx];
+    let end = start + this.groupSize[this.rows[rowIdx][0]];
+    for (let i = start; i < end; i++) {
+      if (col.val[i] !== null && col.val[i] !== undefined) return col.val[i];
+    }
+    return null;
+  }
+
+  sort() {
+    let vt = this;
+    let anchors = this.colAnchors();
+    let keys = this.sortList.map(([idx, dir]) => {
+      let col = idx > 0 ? vt.columns[anchors[idx - 1].anchor] : null;
+      let values = vt.rows.map((row, i) => {
+        let v = col ? vt.sortValue(col, i) : row[0];
+        if (v === null || v === "") return null;
+        let f = typeof v === "number" ? v : parseFloat(v);
+        return isNaN(f) ? String(v).toLowerCase() : f;
+      });
+      return { values: values, dir: dir };
+    });
+    this.order = this.rows.map((_, i) => i);
+    this.order.sort(function (a, b) {
+      for (let { values, dir } of keys) {
+        let va = values[vt.groupStart[a]];
+        let vb = values[vt.groupStart[b]];
+        if (va === vb) continue;
+        // Empty values always go last
+        if (va === null) return 1;
+        if (vb === null) return -1;
+        if (typeof va !== typeof vb) return (typeof va === "number" ? -1 : 1) * dir;
+        return (va < vb ? -1 : 1) * dir;
+      }
+      // Keep the rows of a group together and in their original order
+      return vt.groupStart[a] - vt.groupStart[b] || a - b;
+    });
+    this.table.find("thead th").removeClass("tablesorter-headerAsc tablesorter-headerDesc");
+    this.sortList.forEach(([idx, dir]) => {
+      this.table
+        .find("thead th")
+        .eq(idx)
+        .addClass(dir === 1 ? "tablesorter-headerAsc" : "tablesorter-headerDesc");
+    });
+    this.refresh();
+  }
+
+  sortByHighlight(direction) {
+    let vt = this;
+    let highlighted = this.order.filter((i) => vt.highlight[i] !== null);
+    let others = this.order.filter((i) => vt.highlight[i] === null);
+    highlighted.sort((a, b) => vt.highlight[a].idx - vt.highlight[b].idx);
+    if (direction === "desc") {
+      this.order = highlighted.reverse().concat(others);
+    } else {
+      this.order = others.concat(highlighted);
+    }
+    this.refresh();
+  }
+
+  // Whether the row has no values in the visible columns
+  isEmpty(rowIdx, anchors) {
+    let vt = this;
+    return anchors.every(({ anchor, hidden }) => {
+      let html = vt.columns[anchor].html[rowIdx];
+      return hidden || html === null || html === "";
+    });
+  }
+
+  // Recalculate which rows are shown, update the counts, and render
+  refresh() {
+    let vt = this;
+    let anchors = this.colAnchors();
+    this.visible = this.order.filter(function (i) {
+      if (vt.hidden[i] || vt.isEmpty(i, anchors)) return false;
+      if (vt.filter && !vt.names[i].toLowerCase().includes(vt.filter)) return false;
+      let g = vt.rows[i][0];
+      return vt.groupStart[i] === i || vt.expanded[g];
+    });
+    $("#" + this.anchor + "_numrows").text(this.visible.length);
+    $("#" + this.anchor + "_numcols").text(anchors.filter((a) => !a.hidden).length);
+    this.render();
+  }
+
+  // Render the rows that are in view, with spacers instead of the rows above and below
+  render() {
+    let tbody = this.tbody[0];
+    let containerRect = this.container[0].getBoundingClientRect();
+    let viewTop = Math.max(containerRect.top, 0);
+    let viewBottom = Math.min(containerRect.bottom, window.innerHeight);
+    let bodyTop = tbody.getBoundingClientRect().top;
+    let buffer = 20;
+    let start = Math.max(0, Math.floor((viewTop - bodyTop) / this.rowHeight) - buffer);
+    let end = Math.min(this.visible.length, Math.ceil((viewBottom - bodyTop) / this.rowHeight) + buffer);
+    end = Math.max(end, Math.min(this.visible.length, start + 2 * buffer));
+    if (start > end) start = end;
+
+    let anchors = this.colAnchors();
+    let html = `<tr class="mqc_virtual_spacer" style="height: ${start * this.rowHeight}px"></tr>`;
+    for (let i = start; i < end; i++) {
+      html += this.rowHtml(this.visible[i], anchors);
+    }
+    html += `<tr class="mqc_virtual_spacer" style="height: ${(this.visible.length - end) * this.rowHeight}px"></tr>`;
+    tbody.innerHTML = html;
+
+    // Measure the rendered rows, so the spacers match the height of the rows they replace
+    let rendered = this.tbody.find("tr:not(.mqc_virtual_spacer)");
+    if (rendered.length > 0) {
+      let height = rendered[0].getBoundingClientRect().height;
+      if (height > 0 && Math.abs(height - this.rowHeight) > 0.5) {
+        this.rowHeight = height;
+        this.render();
+      }
+    }
+  }
+
+  rowHtml(i, anchors) {
+    let [g, s] = this.rows[i];
+    let isPrimary = this.groupStart[i] === i;
+    let classes = [];
+    let prefix = "";
+    if (this.nonTrivialGroups) {
+      let caretCls = "";
+      if (this.groupSize[g] > 1 && isPrimary) {
+        caretCls = "expandable-row-caret";
+        classes.push("expandable-row-primary");
+        if (this.expanded[g]) classes.push("expanded");
+      }
+      prefix += `<div style="display: inline-block; width: 20px" class="${caretCls}">&nbsp;</div>`;
+    }
+    if (!isPrimary) {
+      prefix += "&nbsp;↳&nbsp;";
+      classes.push("expandable-row-secondary");
+    }
+    let highlight = this.highlight[i];
+    let thAttrs = highlight !== null ? ` style="color: ${highlight.colour}"` : "";
+    let html = `<tr data-sample-group="${escapeHtmlAttr(g)}" data-row-idx="${i}" class="${classes.join(" ")}">`;
+    html += `<th class="rowheader${highlight !== null ? " highlighted" : ""}"${thAttrs}>${prefix}<span class="th-sample-name" data-original-sn="${escapeHtmlAttr(s)}">${this.names[i]}</span></th>`;
+    for (let { anchor, hidden } of anchors) {
+      html += this.cellHtml(anchor, hidden ? "column-hidden" : "", i);
+    }
+    return html + "</tr>";
+  }
+
+  cellHtml(anchor, hideCls, i) {
+    let col = this.columns[anchor];
+    let valHtml = col.html[i];
+    if (valHtml === null) {
+      return `<td class="data-coloured ${anchor} ${hideCls}"></td>`;
+    }
+    let bar = col.bar ? col.bar[i] : null;
+    let colour = col.colour ? col.colour[i] : null;
+    if (bar === null && colour !== null) {
+      return `<td class="${anchor} ${hideCls}" style="background-color:${colour} !important;">${valHtml}</td>`;
+    }
+    if (bar !== null) {
+      if (colour === null) colour = col.scale ? mqcScaleColour(col.scale, col.val[i]) : "";
+      return (
+        `<td class="data-coloured ${anchor} ${hideCls}"><div class="wrapper">` +
+        `<span class="bar" style="width:${bar}%; background-color:${colour} !important;"></span>` +
+        `<span class="val">${valHtml}</span></div></td>`
+      );
+    }
+    return `<td class="${anchor} ${hideCls}">${valHtml}</td>`;
+  }
+
+  // Tab-separated text of the visible rows and columns
+  toTsv() {
+    let vt = this;
+    let anchors = this.colAnchors().filter((a) => !a.hidden);
+    let lines = [
+      [this.table.find("thead th").first().text()]
+        .concat(anchors.map((a) => $("#header_" + a.anchor, vt.table).text()))
+        .join("\t"),
+    ];
+    for (let i of this.visible) {
+      let cells = anchors.map(({ anchor }) => $("<div>" + (vt.columns[anchor].html[i] ?? "") + "</div>").text());
+      lines.push([this.names[i]].concat(cells).join("\t"));
+    }
+    return lines.join("\n");
+  }
+
+  // Values of two columns for each row, for the table scatter plot
+  columnPairs(col1, col2) {
+    let c1 = this.columns[col1];
+    let c2 = this.columns[col2];
+    if (!c1 || !c2) return [];
+    return this.rows.map((_, i) => ({ name: this.names[i], val1: c1.val[i], val2: c2.val[i] }));
+  }
+
+  applyHighlights(f_texts, f_cols, regex_mode) {
+    this.highlight = this.names.map(function (name) {
+      let res = null;
+      $.each(f_texts, function (idx, f_text) {
+        if ((regex_mode && name.match(f_text)) || (!regex_mode && name.indexOf(f_text) > -1)) {
+          res = { colour: f_cols[idx] ?? "#cccccc", idx: idx };
+        }
+      });
+      return res;
+    });
+    this.render();
+    return this.highlight.some((h) => h !== null);
+  }
+
+  applyRenames(f_texts, t_texts, regex_mode) {
+    this.names = this.rows.map(function ([, s]) {
+      let s_name = String(s);
+      $.each(f_texts, function (idx, f_text) {
+        if (regex_mode) {
+          s_name = s_name.replace(new RegExp(f_text, "g"), t_texts[idx]);
+        } else {
+          s_name = s_name.replace(f_text, t_texts[idx]);
+        }
+      });
+      return s_name;
+    });
+    this.render();
+  }
+
+  applyHides(f_texts, regex_mode) {
+    let vt = this;
+    this.hidden = this.rows.map(function ([g], i) {
+      let match = false;
+      let s_name = vt.names[i];
+      $.each(f_texts, function (idx, f_text) {
+        if (regex_mode) {
+          if (s_name.match(f_text) || String(g).match(f_text)) match = true;
+        } else {
+          if (s_name.indexOf(f_text) > -1 || String(g).indexOf(f_text) > -1) match = true;
+        }
+      });
+      return window.mqc_hide_mode === "show" ? !match : match;
+    });
+
+    // Hide the columns that are empty for all shown samples
+    let shown = this.rows.map((_, i) => i).filter((i) => !vt.hidden[i]);
+    this.colAnchors().forEach(function ({ anchor }) {
+      let html = vt.columns[anchor].html;
+      if (shown.length > 0 && shown.every((i) => html[i] === null || html[i] === "")) {
+        $("#header_" + anchor, vt.table).addClass("column-hidden");
+      }
+    });
+    this.refresh();
+  }
 }
+
+$(function () {
+  $(".mqc_virtual_table_data").each(function () {
+    let tableAnchor = $(this).data("table-anchor");
+    let data = decompressPlotDataSync($(this).text());
+    mqc_virtual_tables[tableAnchor] = new VirtualTable($("#" + tableAnchor), data);
+  });
+});
@@ -111,13 +111,37 @@ class MultiQCConfig(BaseModel):
 
     make_data_dir: Optional[bool] = Field(None, description="Create data directory")
     zip_data_dir: Optional[bool] = Field(None, description="Zip data directory")
+    data_tmp_dir_in_output: Optional[bool] = Field(
+        None,
+        description="Collect data files in a temporary directory inside the output directory instead of the system "
+        "temporary directory, so that they are moved to the data directory with a rename instead of copied",
+    )
     data_dump_file: Optional[bool] = Field(None, description="Write data to a file")
     data_dump_file_write_raw: Optional[bool] = Field(None, description="Write raw data to a file")
     megaqc_url: Optional[str] = Field(None, description="MegaQC URL to upload to")
     megaqc_access_token: Optional[str] = Field(None, description="MegaQC access token")
     megaqc_timeout: Optional[int] = Field(None, description="MegaQC timeout")
+    megaqc_retries: Optional[int] = Field(
+        None, description="Number of times to retry a MegaQC upload that couldn't connect or got a 502/503/504 response"
+    )
+    megaqc_chunk_size: Optional[int] = Field(
+        None, description="Bytes of multiqc_data.json read and compressed at a time when uploading to MegaQC"
+    )
     export_plots: Optional[bool] = Field(None, description="Export plots")
-    export_plots_timeout: Optional[int] = Field(None, description="Export plots timeout")
+    export_plots_timeout: Optional[int] = Field(None, description="Timeout in seconds for exporting each plot")
+    export_plots_workers: Optional[int] = Field(
+        None, description="Number of processes exporting flat plot images, each keeping its Kaleido instance running"
+    )
+    export_plots_cache: Optional[bool] = Field(
+        None, description="Reuse the images of unchanged plots exported by previous runs"
+    )
+    export_plots_cache_dir: Optional[str] = Field(
+        None, description="Directory of the plot image cache. Defaults to $XDG_CACHE_HOME/multiqc/plots"
+    )
+    export_plots_cache_size: Optional[int] = Field(
+        None,
+        description="Size limit of the plot image cache in MB, the least recently used images are removed above it",
+    )
     make_report: Optional[bool] = Field(None, description="Make report")
     make_pdf: Optional[bool] = Field(None, description="Make PDF")
 
@@ -156,6 +180,12 @@ class MultiQCConfig(BaseModel):
     plots_force_interactive: Optional[bool] = Field(None, description="Force interactive plots")
     plots_export_font_scale: Optional[float] = Field(None, description="Font scale for exported plots")
     plots_flat_numseries: Optional[int] = Field(None, description="Number of series to show in flat plots")
+    plots_webgl_numpoints: Optional[int] = Field(
+        None, description="Draw line and scatter plots with more data points than this with WebGL. 0 to disable"
+    )
+    plots_webgl_flat_numseries: Optional[int] = Field(
+        None, description="Number of series to show in flat plots, for plots drawn with WebGL"
+    )
     plots_defer_loading_numseries: Optional[int] = Field(
         None, description="Number of series to defer loading - user will need to press button to render plot"
     )
@@ -167,6 +197,12 @@ class MultiQCConfig(BaseModel):
     lineplot_number_of_points_to_hide_markers: Optional[int] = Field(
         None, description="Number of points to hide markers - sum of data points in all samples"
     )
+    lineplot_smooth_method: Optional[Literal["first", "minmax", "lttb"]] = Field(
+        None,
+        description="How line plot series with more points than `smooth_points` are downsampled: "
+        "'minmax' keeps the lowest and highest point of each bucket, 'lttb' uses Largest-Triangle-Three-Buckets, "
+        "'first' keeps the first point of each bucket",
+    )
     barplot_legend_on_bottom: Optional[bool] = Field(
         None, description="Place bar plot legend at the bottom (not recommended)"
     )
@@ -189,6 +225,11 @@ class MultiQCConfig(BaseModel):
 
     collapse_tables: Optional[bool] = Field(None, description="Collapse tables")
     max_table_rows: Optional[int] = Field(None, description="Maximum number of rows to show in tables")
+    table_virtual_scroll_rows: Optional[int] = Field(
+        None,
+        description="Tables with more rows than this are embedded as data and only the visible rows are rendered. "
+        "Set to 0 to disable",
+    )
     max_configurable_table_columns: Optional[int] = Field(
         None, description="Maximum number of columns to show in tables"
     )
@@ -252,6 +293,29 @@ class MultiQCConfig(BaseModel):
     data_format_extensions: Optional[Dict[str, str]] = Field(None, description="Data format extensions")
     export_plot_formats: Optional[List[str]] = Field(None, description="Export plot formats")
     filesearch_file_shared: Optional[List[str]] = Field(None, description="Filesearch file shared")
+    filesearch_workers: Optional[int] = Field(
+        None, description="Number of workers used to search files in parallel. 1 searches serially"
+    )
+    filesearch_executor: Optional[Literal["thread", "process"]] = Field(
+        None, description="Use a pool of threads (I/O-bound searches) or processes (regex-bound searches)"
+    )
+    filesearch_cache: Optional[bool] = Field(
+        None, description="Reuse the search results of files unchanged since previous runs from an on-disk cache"
+    )
+    filesearch_cache_dir: Optional[str] = Field(
+        None, description="Directory of the file search cache. Defaults to $XDG_CACHE_HOME/multiqc or ~/.cache/multiqc"
+    )
+    filesearch_contents_cache_size: Optional[int] = Field(
+        None,
+        description="Maximum number of characters of file contents read during the search to keep in memory for "
+        "the modules to reuse. 0 disables",
+    )
+    module_workers: Optional[int] = Field(
+        None, description="Number of processes used to run the modules in parallel. 1 runs them serially"
+    )
+    data_write_workers: Optional[int] = Field(
+        None, description="Number of threads writing data files in the background. 0 writes them straight away"
+    )
     custom_content: Optional[Dict[str, Any]] = Field(None, description="Custom content")
     fn_clean_sample_names: Optional[bool] = Field(None, description="Clean sample names")
     use_filename_as_sample_name: Optional[Union[bool, List[str]]] = Field(
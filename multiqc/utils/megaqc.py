@@ -1,10 +1,11 @@
 """MultiQC code to export data to MegaQC / flat JSON files"""
 
-import gzip
-import io
 import json
 import logging
+import time
+import zlib
 from pathlib import Path
+from typing import Iterator, Optional
 
 import requests
 
@@ -12,26 +13,81 @@ from multiqc import config
 
 log = logging.getLogger(__name__)
 
+# Responses that are worth retrying: the server or a proxy in front of it is temporarily unavailable
+RETRY_STATUS_CODES = {502, 503, 504}
+# Seconds to wait before the first retry, doubled for each following one
+RETRY_BACKOFF = 1.0
+
+_session: Optional[requests.Session] = None
+
+
+def _get_session() -> requests.Session:
+    """
+    Session shared by all uploads, so that connections to the server are reused
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def _gzip_request_body(out_path: Path, chunk_size: int) -> Iterator[bytes]:
+    """
+    Gzip-compressed request body `{"data": <contents of out_path>}`, compressed chunk by chunk
+    as the file is read, so that neither the file nor the compressed body is held in memory
+    """
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    # Empty chunks would end a chunked request, so only non-empty compressed data is yielded
+    if data := compressor.compress(b'{"data": '):
+        yield data
+    with out_path.open("rb") as fh:
+        while chunk := fh.read(chunk_size):
+            if data := compressor.compress(chunk):
+                yield data
+    yield compressor.compress(b"}") + compressor.flush()
+
+
+def _post_with_retries(out_path: Path, headers: dict) -> requests.Response:
+    """
+    POST the data file, streaming the request body. Uploads that couldn't connect, were cut off, or got a
+    "server unavailable" response are retried with exponential backoff. MegaQC can't resume a partial upload,
+    so each retry streams the body again from the file on disk.
+    """
+    session = _get_session()
+    attempt = 0
+    while True:
+        try:
+            r = session.post(
+                config.megaqc_url,
+                headers=headers,
+                data=_gzip_request_body(out_path, config.megaqc_chunk_size),
+                timeout=config.megaqc_timeout,
+            )
+        except requests.exceptions.ConnectionError as e:
+            # Covers connection timeouts. Read timeouts aren't retried: the server might have received the data
+            if attempt >= config.megaqc_retries:
+                raise
+            log.debug(f"Couldn't send data to MegaQC: {e}")
+        else:
+            if r.status_code not in RETRY_STATUS_CODES or attempt >= config.megaqc_retries:
+                return r
+            log.debug(f"MegaQC API status code was {r.status_code}")
+
+        delay = RETRY_BACKOFF * 2**attempt
+        attempt += 1
+        log.debug(f"Retrying MegaQC upload in {delay:g}s (attempt {attempt + 1}/{config.megaqc_retries + 1})")
+        time.sleep(delay)
+
 
 def multiqc_api_post(out_path: Path):
     headers = {"Content-Type": "application/json", "content-encoding": "gzip"}
     if config.megaqc_access_token is not None:
         headers["access_token"] = config.megaqc_access_token
 
-    with out_path.open("r") as fh:
-        post_data: str = f'{{"data": {fh.read()}}}'
-
-    # Gzip the JSON for massively decreased filesize
-    sio_obj = io.BytesIO()
-    gzfh = gzip.GzipFile(fileobj=sio_obj, mode="w")
-    gzfh.write(post_data.encode("utf-8"))
-    gzfh.close()
-    request_body = sio_obj.getvalue()
-
     log.debug("Sending data to MegaQC")
     log.debug(f"MegaQC URL: {config.megaqc_url}")
     try:
-        r = requests.post(config.megaqc_url, headers=headers, data=request_body, timeout=config.megaqc_timeout)
+        r = _post_with_retries(out_path, headers)
     except (requests.exceptions.ConnectTimeout, requests.exceptions.ReadTimeout) as e:
         log.error(f"Timed out when sending data: {e}")
     except requests.exceptions.ConnectionError:
@@ -7,8 +7,9 @@ import hashlib
 
 # Default logger will be replaced by caller
 import logging
+import math
 import re
-from typing import Optional, Tuple, Union
+from typing import Any, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import spectra  # type: ignore
@@ -24,6 +25,47 @@ def cached_spectra_colour_scale(colours: Tuple[str]):
     return spectra.scale(list(colours))
 
 
+@functools.lru_cache(128)
+def cached_colour_lookup_table(colours: Tuple[str]) -> np.ndarray:
+    """RGB values of the colours of a scale, as an array of shape (number of colours, 3)"""
+    return np.array([spectra.html(c).rgb for c in colours], dtype=float)
+
+
+def _hex_strings(rgb: np.ndarray) -> List[str]:
+    """Hex codes for an array of RGB values of shape (n, 3), rounded the same way as spectra"""
+    ints = np.floor(0.5 + np.clip(rgb, 0.0, 1.0) * 255).astype(int).tolist()
+    return [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in ints]
+
+
+def _rgba_strings(rgb: np.ndarray, lighten: float) -> List[str]:
+    """
+    rgba strings with alpha transparency for an array of RGB values of shape (n, 3),
+    same as mqc_colour_scale.lighten_colour()
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lightened = np.clip(1 + ((rgb - 1) * lighten), 0, 1)
+        alpha = (1 - lightened) / (1 - rgb)
+    # Alpha values clipped to (or equal to) the bounds are ints in lighten_colour(), so they are printed as 0 or 1
+    clipped = (alpha <= 0) | (alpha >= 1)
+    alpha = np.clip(alpha, 0, 1)
+    white = np.abs(rgb - 1.0) < 1e-6
+    alpha[white] = 1.0
+    clipped[white] = False
+    # Take the lowest alpha, keeping the first channel on ties like min()
+    min_alpha = alpha[:, 0]
+    min_clipped = clipped[:, 0]
+    for channel in (1, 2):
+        lower = alpha[:, channel] < min_alpha
+        min_alpha = np.where(lower, alpha[:, channel], min_alpha)
+        min_clipped = np.where(lower, clipped[:, channel], min_clipped)
+
+    ints = np.trunc(rgb * 255).astype(int).tolist()
+    return [
+        f"rgba({r},{g},{b},{int(a) if c else a})"
+        for (r, g, b), a, c in zip(ints, min_alpha.tolist(), min_clipped.tolist())
+    ]
+
+
 class mqc_colour_scale(object):
     """Class to hold a colour scheme."""
 
@@ -361,6 +403,67 @@ class mqc_colour_scale(object):
             logger.warning(f"{self.id + ': ' if self.id else ''}Error getting colour: {e}")
         return ""
 
+    def get_colours_for_values(
+        self,
+        vals: Sequence[Any],
+        lighten: float = 0.3,
+        source: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Given a column of values, return a colour for each of them, same as calling get_colour() for every
+        value. For sequential scales, all values are interpolated at once between the RGB values of the scale
+        colours, taken from a lookup table cached for each scale.
+        """
+        if self.name in mqc_colour_scale.qualitative_scales:
+            return [self.get_colour(val, lighten=lighten, source=source) for val in vals]
+        if len(self.colours) == 1:
+            colour = self.get_colour(0, lighten=lighten, source=source)
+            return ["" if val is None else colour for val in vals]
+
+        try:
+            colours = [""] * len(vals)
+            # Clip the values to the scale range, parsing them the same way as get_colour()
+            row_idxs: List[int] = []
+            floats: List[float] = []
+            for row_idx, val in enumerate(vals):
+                if val is None:
+                    continue
+                if type(val) in (int, float) and math.isfinite(val):
+                    val_float = float(val)
+                else:
+                    val_stripped = re.sub(r"[^0-9\.\-e]", "", str(val))
+                    if val_stripped == "":
+                        val_float = self.minval
+                    else:
+                        try:
+                            val_float = float(val_stripped)
+                        except ValueError:
+                            # No color formatting for non-numeric values
+                            continue
+                row_idxs.append(row_idx)
+                floats.append(min(max(val_float, self.minval), self.maxval))
+            if not row_idxs:
+                return colours
+
+            # Blend the two colours around each value, like spectra.Scale does
+            lookup = cached_colour_lookup_table(tuple(self.colours))
+            domain = np.linspace(self.minval, self.maxval, len(self.colours))
+            values = np.array(floats)
+            segment = np.clip(np.searchsorted(domain, values, side="left") - 1, 0, len(domain) - 2)
+            x0 = domain[segment]
+            ratio = (values - x0) / (domain[segment + 1] - x0)
+            keep = 1.0 - ratio
+            rgb = lookup[segment] * keep[:, None] + lookup[segment + 1] * ratio[:, None]
+
+            for row_idx, colour in zip(row_idxs, _rgba_strings(rgb, lighten) if lighten > 0 else _hex_strings(rgb)):
+                colours[row_idx] = colour
+            return colours
+
+        except Exception as e:
+            # Shouldn't crash all of MultiQC just for colours
+            logger.warning(f"{self.id + ': ' if self.id else ''}Error getting colours: {e}")
+        return [""] * len(vals)
+
     def get_colours(self, name="GnBu"):
         """Function to get a colour scale by name
         Input: Name of colour scale (suffix with -rev for reversed)
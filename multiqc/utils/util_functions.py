@@ -1,6 +1,7 @@
 """MultiQC Utility functions, used in a variety of places."""
 
 import array
+import functools
 import json
 import logging
 import math
@@ -9,10 +10,10 @@ import sys
 import time
 from collections import OrderedDict, defaultdict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
-import numpy as np
-from pydantic import BaseModel
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -89,73 +90,105 @@ def replace_defaultdicts(data: Any) -> Any:
     return _replace(data)
 
 
-def dump_json(data, filehandle=None, **kwargs):
+def _json_default(o):
+    """
+    Encode the types that JSON doesn't know about: array.array, numpy arrays and sets as lists, numpy scalars
+    as Python numbers, pydantic models as their JSON string, and lambdas as null. Used by both the orjson
+    and the standard library encoders, so that they accept the same data.
     """
-    Recursively replace non-JSON-conforming NaNs and lambdas with None.
-    Note that a custom JSONEncoder would not work for NaNs:
-    https://stackoverflow.com/a/28640141
+    if isinstance(o, array.array):
+        return o.tolist()
+    # numpy objects can only exist if numpy was imported, so there's no need to import it here
+    if (np := sys.modules.get("numpy")) is not None and isinstance(o, (np.ndarray, np.generic)):
+        return o.tolist()
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if isinstance(o, float):  # float subclasses that orjson doesn't take
+        return float(o)
+    if callable(o):
+        return None
+    from pydantic import BaseModel
+
+    if isinstance(o, BaseModel):  # special handling for pydantic models
+        return o.model_dump_json()
+    raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
+
+
+def _json_floatstr(o: float) -> str:
+    # NaN and infinity are not valid JSON
+    if o != o or o == math.inf or o == -math.inf:
+        return "null"
+    return float.__repr__(o)
+
+
+class JsonEncoder(json.JSONEncoder):
+    """
+    Standard library JSON encoder that writes NaN and infinity as null, and encodes the types
+    from `_json_default()`. A custom `default()` is not called for NaNs (https://stackoverflow.com/a/28640141),
+    so the float formatting is replaced in `iterencode()` instead of replacing the NaNs in the data first.
     """
 
-    def replace_nan(obj):
-        """
-        Recursively replace NaNs and Infinities with None
-        """
-        # Do checking in order of likelihood of occurrence
-        if isinstance(obj, float):
-            if math.isnan(obj) or math.isinf(obj):
-                return None
-            return obj
-        if isinstance(obj, (tuple, set)):
-            # JSON only knows list so convert tuples and sets to list.
-            obj = list(obj)
-        if isinstance(obj, list):
-            for i, item in enumerate(obj):
-                if isinstance(item, float) and (math.isnan(item) or math.isinf(item)):
-                    obj[i] = None
-                elif isinstance(item, (dict, list, tuple, set)):
-                    obj[i] = replace_nan(item)
-            return obj
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
-                    obj[key] = None
-                elif isinstance(value, (dict, list, tuple, set)):
-                    obj[key] = replace_nan(value)
-            return obj
-        return obj
+    def default(self, o):
+        return _json_default(o)
+
+    def iterencode(self, o, _one_shot=False):
+        encoder = json.encoder.encode_basestring_ascii if self.ensure_ascii else json.encoder.encode_basestring
+        indent = " " * self.indent if isinstance(self.indent, int) else self.indent
+        _iterencode = json.encoder._make_iterencode(  # type: ignore
+            {} if self.check_circular else None,
+            self.default,
+            encoder,
+            indent,
+            _json_floatstr,
+            self.key_separator,
+            self.item_separator,
+            self.sort_keys,
+            self.skipkeys,
+            _one_shot,
+        )
+        return _iterencode(o, 0)
+
+
+@functools.lru_cache(maxsize=None)
+def _orjson():
+    """
+    orjson module if it's installed, otherwise None
+    """
+    try:
+        import orjson  # type: ignore
+    except ImportError:
+        return None
+    return orjson
+
 
-    class JsonEncoderWithArraySupport(json.JSONEncoder):
-        """
-        Encode array.array instances to list. Use the default method
-        for this as it gets called only when an array instance is encountered
-        and is then immediately serialized into a string. This saves memory
-        compared to unpacking all arrays to list at once.
-        """
-
-        def default(self, o):
-            if isinstance(o, array.array):
-                return replace_nan(o.tolist())
-            if callable(o):
-                return None
-            if isinstance(o, BaseModel):  # special handling for pydantic models
-                return o.model_dump_json()
-            return super().default(o)
-
-    if filehandle:
+def dump_json(data, filehandle=None, **kwargs):
+    """
+    Serialize data to JSON, writing it to `filehandle` if given, otherwise returning the string.
+    NaN and infinity are written as null, and array.array, sets and pydantic models are supported.
+
+    Compact JSON, i.e. without `indent` or other formatting options, is encoded with orjson when it's
+    installed. Indented JSON is written in chunks by the standard library encoder, so that data files
+    keep their layout.
+    """
+    orjson = _orjson() if set(kwargs) <= {"ensure_ascii"} else None
+    if orjson is not None:
         try:
-            json.dump(replace_nan(data), filehandle, cls=JsonEncoderWithArraySupport, **kwargs)
-        except UnicodeEncodeError:
-            # If we get an error, try to write the JSON string directly
-            # First convert to a string with proper encoding
-            json_str = json.dumps(replace_nan(data), cls=JsonEncoderWithArraySupport, ensure_ascii=False, **kwargs)
-            # Write the string directly to avoid encoding issues
-            if hasattr(filehandle, "write"):
-                filehandle.write(json_str)
-            else:
-                with open(filehandle, "w", encoding="utf-8") as f:
-                    f.write(json_str)
-    else:
-        return json.dumps(replace_nan(data), cls=JsonEncoderWithArraySupport, **kwargs)
+            dumped = orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:  # e.g. integers over 64 bits, leaving it to the standard library encoder
+            dumped = None
+        # orjson doesn't escape non-ASCII characters
+        if dumped is not None and (not kwargs.get("ensure_ascii", True) or dumped.isascii()):
+            if filehandle is None:
+                return dumped.decode()
+            filehandle.write(dumped.decode())
+            return None
+
+    encoder = JsonEncoder(**kwargs)
+    if filehandle is None:
+        return encoder.encode(data)
+    for chunk in encoder.iterencode(data):
+        filehandle.write(chunk)
+    return None
 
 
 def is_running_in_notebook() -> bool:
@@ -256,7 +289,7 @@ def update_dict(
     return target
 
 
-def scipy_pdist(X: np.ndarray) -> np.ndarray:
+def scipy_pdist(X: "np.ndarray") -> "np.ndarray":
     """Calculate pairwise (euclidean) distances between observations in X.
 
     Reimplements scipy.spatial.distance.pdist to avoid heavy scipy dependency.
@@ -267,25 +300,48 @@ def scipy_pdist(X: np.ndarray) -> np.ndarray:
     Returns:
         Array of shape ((m * (m-1)) // 2,) containing condensed distance matrix
     """
+    import numpy as np
+
     m, n = X.shape
     # Initialize output array of correct size for condensed distance matrix
     out = np.zeros((m * (m - 1)) // 2)
+    # Compare each observation to the following ones in blocks of rows, to bound the memory used
+    block_size = max(1, _PDIST_BLOCK_VALUES // max(n, 1))
     k = 0
 
     # Calculate pairwise distances
     for i in range(m - 1):
-        for j in range(i + 1, m):
-            out[k] = np.sqrt(np.sum((X[i] - X[j]) ** 2))
-            k += 1
+        for start in range(i + 1, m, block_size):
+            end = min(start + block_size, m)
+            out[k : k + end - start] = np.sqrt(np.sum((X[start:end] - X[i]) ** 2, axis=1))
+            k += end - start
 
     return out
 
 
-def scipy_hierarchy_linkage(distances: np.ndarray, method: str = "complete") -> np.ndarray:
+# Maximum number of values in the blocks of differences computed by scipy_pdist
+_PDIST_BLOCK_VALUES = 1 << 20
+
+
+def _condensed_index(n: int, i: Union[int, "np.ndarray"], j: "np.ndarray") -> "np.ndarray":
+    """Positions of the distances between observations i and j (i != j) in a condensed distance matrix"""
+    import numpy as np
+
+    lo = np.minimum(i, j)
+    hi = np.maximum(i, j)
+    return n * lo - lo * (lo + 1) // 2 + hi - lo - 1
+
+
+def scipy_hierarchy_linkage(distances: "np.ndarray", method: str = "complete") -> "np.ndarray":
     """Perform hierarchical clustering using the specified linkage method.
 
     Reimplements scipy.hierarchy.linkage to avoid heavy scipy dependency.
 
+    At each step, the two closest clusters are merged, taking the pair with the lowest cluster indices
+    on ties. To find them without scanning all pairs, each cluster keeps track of its nearest neighbour
+    among the clusters with a higher index, which only has to be searched again when that neighbour is
+    merged. The merged cluster reuses the row of one of its parts in the condensed distance matrix.
+
     Args:
         distances: Condensed distance matrix from pdist
         method: Linkage method ('single', 'complete', 'average', 'weighted')
@@ -297,74 +353,88 @@ def scipy_hierarchy_linkage(distances: np.ndarray, method: str = "complete") ->
     if method not in ["single", "complete", "average", "weighted"]:
         raise ValueError(f"Unsupported linkage method: {method}")
 
-    # Convert condensed distance matrix to full matrix for easier manipulation
+    import numpy as np
+
     n = int((1 + np.sqrt(1 + 8 * len(distances))) / 2)
-    dist_matrix = np.zeros((n, n))
-    idx = np.triu_indices(n, k=1)
-    dist_matrix[idx] = distances
-    dist_matrix = dist_matrix + dist_matrix.T  # type: ignore
-
-    # Initialize arrays for clustering
-    n_clusters = n
-    active_nodes = list(range(n_clusters))
-    cluster_sizes = np.ones(n_clusters, dtype=int)
-    linkage_matrix = np.zeros((n_clusters - 1, 4))
-
-    for i in range(n_clusters - 1):
+    dist = np.array(distances, dtype=float)
+    linkage_matrix = np.zeros((n - 1, 4))
+    if n < 2:
+        return linkage_matrix
+
+    # Clusters are stored in slots, each slot being a row of the condensed distance matrix
+    cluster_ids = np.arange(n)
+    cluster_sizes = np.ones(n, dtype=int)
+    active = np.ones(n, dtype=bool)
+    # Distance to the nearest cluster with a higher index, and the slot of that cluster
+    nn_dist = np.full(n, np.inf)
+    nn_slot = np.full(n, -1)
+
+    def _find_nearest(slot: int) -> None:
+        candidates = np.flatnonzero(active & (cluster_ids > cluster_ids[slot]))
+        if len(candidates) == 0:
+            nn_dist[slot], nn_slot[slot] = np.inf, -1
+            return
+        cand_dist = dist[_condensed_index(n, slot, candidates)]
+        nearest = candidates[cand_dist == cand_dist.min()]
+        nn_slot[slot] = nearest[np.argmin(cluster_ids[nearest])]
+        nn_dist[slot] = cand_dist.min()
+
+    for slot in range(n - 1):
+        # Distances to the clusters with higher indices form a contiguous part of the condensed matrix
+        start = n * slot - slot * (slot + 1) // 2
+        row = dist[start : start + n - slot - 1]
+        nn_slot[slot] = slot + 1 + np.argmin(row)
+        nn_dist[slot] = row[nn_slot[slot] - slot - 1]
+
+    for i in range(n - 1):
         # Find minimum distance between clusters
-        valid_distances = dist_matrix[np.ix_(active_nodes, active_nodes)]
-        np.fill_diagonal(valid_distances, np.inf)
-        min_idx = np.unravel_index(np.argmin(valid_distances), valid_distances.shape)
-        cluster1, cluster2 = active_nodes[min_idx[0]], active_nodes[min_idx[1]]
+        min_dist = nn_dist.min()
+        closest = np.flatnonzero(nn_dist == min_dist)
+        slot1 = closest[np.argmin(cluster_ids[closest])]
+        slot2 = nn_slot[slot1]
+        size1, size2 = cluster_sizes[slot1], cluster_sizes[slot2]
 
         # Record merge in linkage matrix
-        linkage_matrix[i] = [
-            min(cluster1, cluster2),
-            max(cluster1, cluster2),
-            dist_matrix[cluster1, cluster2],
-            cluster_sizes[cluster1] + cluster_sizes[cluster2],
-        ]
-
-        # Create new cluster
-        new_cluster_idx = n_clusters + i
-        cluster_sizes = np.append(cluster_sizes, cluster_sizes[cluster1] + cluster_sizes[cluster2])  # type: ignore
+        linkage_matrix[i] = [cluster_ids[slot1], cluster_ids[slot2], min_dist, size1 + size2]
 
         # Calculate distances to new cluster based on chosen method
-        remaining_clusters = [x for x in active_nodes if x not in (cluster1, cluster2)]
-        new_distances = np.zeros(len(remaining_clusters))
-
-        for j, cluster in enumerate(remaining_clusters):
-            dist1 = dist_matrix[cluster1, cluster]
-            dist2 = dist_matrix[cluster2, cluster]
-
-            if method == "single":
-                new_dist = min(dist1, dist2)
-            elif method == "complete":
-                new_dist = max(dist1, dist2)
-            elif method == "average":
-                new_dist = (dist1 * cluster_sizes[cluster1] + dist2 * cluster_sizes[cluster2]) / (
-                    cluster_sizes[cluster1] + cluster_sizes[cluster2]
-                )
-            else:  # weighted
-                new_dist = (dist1 + dist2) / 2
-
-            new_distances[j] = new_dist
-
-        # Update distance matrix
-        dist_matrix = np.vstack((dist_matrix, np.zeros(dist_matrix.shape[1])))  # type: ignore
-        dist_matrix = np.hstack((dist_matrix, np.zeros((dist_matrix.shape[0], 1))))  # type: ignore
-        dist_matrix[new_cluster_idx, remaining_clusters] = new_distances  # type: ignore
-        dist_matrix[remaining_clusters, new_cluster_idx] = new_distances  # type: ignore
-
-        # Update active nodes
-        active_nodes.remove(cluster1)
-        active_nodes.remove(cluster2)
-        active_nodes.append(new_cluster_idx)
+        active[slot1] = active[slot2] = False
+        remaining = np.flatnonzero(active)
+        idx1 = _condensed_index(n, slot1, remaining)
+        dist1 = dist[idx1]
+        dist2 = dist[_condensed_index(n, slot2, remaining)]
+        if method == "single":
+            new_dist = np.minimum(dist1, dist2)
+        elif method == "complete":
+            new_dist = np.maximum(dist1, dist2)
+        elif method == "average":
+            new_dist = (dist1 * size1 + dist2 * size2) / (size1 + size2)
+        else:  # weighted
+            new_dist = (dist1 + dist2) / 2
+
+        # The new cluster takes the slot of the first merged cluster
+        dist[idx1] = new_dist
+        cluster_ids[slot1] = n + i
+        cluster_sizes[slot1] = size1 + size2
+        active[slot1] = True
+        nn_dist[slot2], nn_slot[slot2] = np.inf, -1
+        # ...and has the highest index, so it has no neighbours with higher indices
+        nn_dist[slot1], nn_slot[slot1] = np.inf, -1
+
+        # The new cluster becomes the nearest neighbour of the clusters that are closer to it. Ties keep
+        # the current neighbour, which has a lower index. Clusters that had one of the merged clusters
+        # as their nearest neighbour need to search again.
+        lost_neighbour = (nn_slot[remaining] == slot1) | (nn_slot[remaining] == slot2)
+        closer = ~lost_neighbour & (new_dist < nn_dist[remaining])
+        nn_dist[remaining[closer]] = new_dist[closer]
+        nn_slot[remaining[closer]] = slot1
+        for slot in remaining[lost_neighbour]:
+            _find_nearest(slot)
 
     return linkage_matrix
 
 
-def scipy_hierarchy_leaves_list(Z: np.ndarray) -> List[int]:
+def scipy_hierarchy_leaves_list(Z: "np.ndarray") -> List[int]:
     """Return the leaf nodes in the order they appear in the dendrogram.
 
     Reimplements scipy.hierarchy.leaves_list to avoid heavy scipy dependency.
@@ -376,18 +446,17 @@ def scipy_hierarchy_leaves_list(Z: np.ndarray) -> List[int]:
         List of original observation indices in the order they appear in the dendrogram
     """
     n = int(Z.shape[0] + 1)
-    # Initialize list of current clusters with original observations
-    clusters = [[i] for i in range(n)]
-
-    # Process merges in order
-    for i in range(len(Z)):
-        # Get the clusters being merged
-        cluster1 = int(Z[i, 0])
-        cluster2 = int(Z[i, 1])
-
-        # Merge clusters
-        new_cluster = clusters[cluster1] + clusters[cluster2]
-        clusters.append(new_cluster)
-
-    # Return the final ordering (last cluster created)
-    return clusters[-1]
+    children = Z[:, :2].astype(int).tolist()
+
+    # Walk the tree depth-first from the last merge, visiting the first merged cluster first
+    leaves: List[int] = []
+    stack = [2 * n - 2]
+    while stack:
+        cluster = stack.pop()
+        if cluster < n:
+            leaves.append(cluster)
+        else:
+            cluster1, cluster2 = children[cluster - n]
+            stack.append(cluster2)
+            stack.append(cluster1)
+    return leaves
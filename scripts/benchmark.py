@@ -0,0 +1,437 @@
+"""
+Benchmark the end-to-end MultiQC run on synthetic inputs of increasing size.
+
+Generates a tree of FastQC zips, samtools stats, Picard MarkDuplicates metrics and custom content
+files for each number of samples, runs MultiQC on it, and records the run time and the peak traced
+memory of the main stages of the run. The start-up time of `import multiqc`, `multiqc --version`
+and `multiqc --help` is measured with `python -X importtime` as well. Results are written as JSON,
+so that they can be compared between commits:
+
+    python scripts/benchmark.py --samples 10 1000 --output before.json
+    git checkout my-branch
+    python scripts/benchmark.py --samples 10 1000 --output after.json --compare before.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import importlib
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Stages of a run that are timed, as (module, function name). Functions are wrapped in the module
+# they are looked up from when called, so they can be timed without changing the MultiQC code.
+STAGES: List[Tuple[str, str]] = [
+    ("multiqc.core.file_search", "file_search"),
+    ("multiqc.core.exec_modules", "exec_modules"),
+    ("multiqc.core.order_modules_and_sections", "order_modules_and_sections"),
+    ("multiqc.core.write_results", "render_and_export_plots"),
+    ("multiqc.core.write_results", "_render_general_stats_table"),
+    ("multiqc.core.write_results", "_write_data_files"),
+    ("multiqc.core.write_results", "_write_html_report"),
+]
+
+# Relative slowdown of a stage reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.1
+
+# Commands whose start-up time is measured, as arguments to `python -X importtime`
+STARTUP_COMMANDS: Dict[str, List[str]] = {
+    "import": ["-c", "import multiqc"],
+    "version": ["-m", "multiqc", "--version"],
+    "help": ["-m", "multiqc", "--help"],
+}
+
+
+def _fastqc_data(s_name: str, rng: random.Random) -> str:
+    read_length = 100
+    total = rng.randint(1_000_000, 50_000_000)
+    lines = [
+        "##FastQC\t0.12.1",
+        ">>Basic Statistics\tpass",
+        "#Measure\tValue",
+        f"Filename\t{s_name}.fastq.gz",
+        "File type\tConventional base calls",
+        "Encoding\tSanger / Illumina 1.9",
+        f"Total Sequences\t{total}",
+        f"Total Bases\t{total * read_length / 1e9:.1f} Gbp",
+        "Sequences flagged as poor quality\t0",
+        f"Sequence length\t{read_length}",
+        f"%GC\t{rng.randint(38, 52)}",
+        ">>END_MODULE",
+        ">>Per base sequence quality\tpass",
+        "#Base\tMean\tMedian\tLower Quartile\tUpper Quartile\t10th Percentile\t90th Percentile",
+    ]
+    for pos in range(1, read_length + 1):
+        mean = 36 - pos * 0.05 + rng.random()
+        lines.append(f"{pos}\t{mean:.2f}\t{int(mean)}.0\t{int(mean) - 2}.0\t{int(mean) + 1}.0\t{int(mean) - 6}.0\t38.0")
+    lines += [">>END_MODULE", ">>Per sequence quality scores\tpass", "#Quality\tCount"]
+    for quality in range(2, 41):
+        lines.append(f"{quality}\t{rng.random() * 10 ** (quality / 8):.1f}")
+    lines += [">>END_MODULE", ">>Per base sequence content\twarn", "#Base\tG\tA\tT\tC"]
+    for pos in range(1, read_length + 1):
+        g, a, t = (25 + rng.uniform(-3, 3) for _ in range(3))
+        lines.append(f"{pos}\t{g:.2f}\t{a:.2f}\t{t:.2f}\t{100 - g - a - t:.2f}")
+    lines += [">>END_MODULE", ">>Per sequence GC content\tpass", "#GC Content\tCount"]
+    gc_mean = rng.randint(38, 52)
+    for gc in range(101):
+        lines.append(f"{gc}\t{total * 0.04 * 2.718 ** (-((gc - gc_mean) ** 2) / 50):.1f}")
+    lines += [">>END_MODULE", ">>Per base N content\tpass", "#Base\tN-Count"]
+    for pos in range(1, read_length + 1):
+        lines.append(f"{pos}\t{rng.random() * 0.01:.4f}")
+    lines += [
+        ">>END_MODULE",
+        ">>Sequence Length Distribution\tpass",
+        "#Length\tCount",
+        f"{read_length}\t{total}.0",
+        ">>END_MODULE",
+        ">>Sequence Duplication Levels\tpass",
+        f"#Total Deduplicated Percentage\t{rng.uniform(40, 95):.2f}",
+        "#Duplication Level\tPercentage of deduplicated\tPercentage of total",
+    ]
+    for level in ["1", "2", "3", "4", "5", "6", "7", "8", "9", ">10", ">50", ">100", ">500", ">1k", ">5k", ">10k+"]:
+        lines.append(f"{level}\t{rng.uniform(0, 10):.2f}\t{rng.uniform(0, 10):.2f}")
+    lines += [
+        ">>END_MODULE",
+        ">>Overrepresented sequences\tpass",
+        ">>END_MODULE",
+        ">>Adapter Content\tpass",
+        "#Position\tIllumina Universal Adapter\tNextera Transposase Sequence",
+    ]
+    for pos in range(1, read_length + 1):
+        lines.append(f"{pos}\t{pos * rng.random() * 0.001:.4f}\t0.0")
+    lines.append(">>END_MODULE")
+    return "\n".join(lines) + "\n"
+
+
+def _samtools_stats(s_name: str, rng: random.Random) -> str:
+    total = rng.randint(1_000_000, 50_000_000)
+    mapped = int(total * rng.uniform(0.8, 0.99))
+    lines = [
+        "# This file was produced by samtools stats (1.19+htslib-1.19) and can be plotted using plot-bamstats",
+        f"# The command line was:  stats {s_name}.bam",
+        f"SN\traw total sequences:\t{total}",
+        "SN\tfiltered sequences:\t0",
+        f"SN\tsequences:\t{total}",
+        "SN\tis sorted:\t1",
+        f"SN\t1st fragments:\t{total // 2}",
+        f"SN\tlast fragments:\t{total // 2}",
+        f"SN\treads mapped:\t{mapped}",
+        f"SN\treads mapped and paired:\t{mapped - 1000}",
+        f"SN\treads unmapped:\t{total - mapped}",
+        f"SN\treads properly paired:\t{mapped - 5000}",
+        f"SN\treads paired:\t{total}",
+        f"SN\treads duplicated:\t{int(mapped * rng.uniform(0.05, 0.3))}",
+        f"SN\treads MQ0:\t{rng.randint(0, 10000)}",
+        "SN\treads QC failed:\t0",
+        "SN\tnon-primary alignments:\t0",
+        f"SN\ttotal length:\t{total * 100}",
+        f"SN\tbases mapped:\t{mapped * 100}",
+        f"SN\tbases mapped (cigar):\t{mapped * 99}",
+        f"SN\tmismatches:\t{mapped // 10}",
+        f"SN\terror rate:\t{rng.uniform(0.002, 0.01):.6e}",
+        "SN\taverage length:\t100",
+        "SN\tmaximum length:\t100",
+        "SN\taverage quality:\t35.2",
+        f"SN\tinsert size average:\t{rng.uniform(200, 400):.1f}",
+        f"SN\tinsert size standard deviation:\t{rng.uniform(50, 100):.1f}",
+        "SN\tinward oriented pairs:\t100000",
+        "SN\toutward oriented pairs:\t1000",
+        "SN\tpairs with other orientation:\t10",
+        "SN\tpairs on different chromosomes:\t100",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _picard_markdups(s_name: str, rng: random.Random) -> str:
+    pairs = rng.randint(500_000, 25_000_000)
+    duplicates = int(pairs * rng.uniform(0.05, 0.3))
+    lines = [
+        "## htsjdk.samtools.metrics.StringHeader",
+        f"# MarkDuplicates INPUT=[{s_name}.bam] OUTPUT={s_name}.markdup.bam METRICS_FILE={s_name}.markdup.txt",
+        "## METRICS CLASS\tpicard.sam.DuplicationMetrics",
+        "\t".join(
+            [
+                "LIBRARY",
+                "UNPAIRED_READS_EXAMINED",
+                "READ_PAIRS_EXAMINED",
+                "SECONDARY_OR_SUPPLEMENTARY_RDS",
+                "UNMAPPED_READS",
+                "UNPAIRED_READ_DUPLICATES",
+                "READ_PAIR_DUPLICATES",
+                "READ_PAIR_OPTICAL_DUPLICATES",
+                "PERCENT_DUPLICATION",
+                "ESTIMATED_LIBRARY_SIZE",
+            ]
+        ),
+        f"{s_name}\t1000\t{pairs}\t0\t2000\t100\t{duplicates}\t{duplicates // 20}\t{duplicates / pairs:.6f}\t{pairs * 5}",
+        "",
+        "## HISTOGRAM\tjava.lang.Double",
+        "BIN\tCoverageMult\tall_sets\tnon_optical_sets",
+    ]
+    for i in range(1, 11):
+        lines.append(f"{i}.0\t{i * 0.9:.4f}\t{pairs // i}\t{pairs // i}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_inputs(data_dir: Path, num_samples: int, seed: int = 0) -> None:
+    """
+    Write the synthetic input files for a number of samples, spread over subdirectories
+    like the outputs of a pipeline
+    """
+    rng = random.Random(seed)
+    bar_rows = ["Sample\tCategory A\tCategory B\tCategory C"]
+    for i in range(num_samples):
+        s_name = f"sample_{i:05d}"
+        sample_dir = data_dir / f"batch_{i // 100:03d}" / s_name
+        sample_dir.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(sample_dir / f"{s_name}_fastqc.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(f"{s_name}_fastqc/", "")
+            zf.writestr(f"{s_name}_fastqc/fastqc_data.txt", _fastqc_data(s_name, rng))
+        (sample_dir / f"{s_name}.stats").write_text(_samtools_stats(s_name, rng))
+        (sample_dir / f"{s_name}.markdup.txt").write_text(_picard_markdups(s_name, rng))
+        bar_rows.append(f"{s_name}\t{rng.randint(0, 1000)}\t{rng.randint(0, 1000)}\t{rng.randint(0, 1000)}")
+    (data_dir / "benchmark_bargraph_mqc.tsv").write_text(
+        "# plot_type: 'bargraph'\n# section_name: 'Benchmark custom content'\n" + "\n".join(bar_rows) + "\n"
+    )
+
+
+@contextlib.contextmanager
+def timed_stages(results: Dict[str, Dict[str, float]], trace_memory: bool) -> Iterator[None]:
+    """
+    Wrap the functions of the run stages to record their run time and peak traced memory
+    """
+    originals: List[Tuple[Any, str, Callable]] = []
+
+    def _wrap(name: str, fn: Callable) -> Callable:
+        def _timed(*args, **kwargs):
+            if trace_memory and hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stage = results.setdefault(name, {"seconds": 0.0})
+                stage["seconds"] += time.perf_counter() - start
+                if trace_memory:
+                    stage["peak_memory_bytes"] = max(
+                        stage.get("peak_memory_bytes", 0), tracemalloc.get_traced_memory()[1]
+                    )
+
+        return _timed
+
+    for module_name, fn_name in STAGES:
+        module = importlib.import_module(module_name)
+        fn = getattr(module, fn_name)
+        originals.append((module, fn_name, fn))
+        setattr(module, fn_name, _wrap(fn_name, fn))
+    try:
+        yield
+    finally:
+        for module, fn_name, fn in originals:
+            setattr(module, fn_name, fn)
+
+
+def run_benchmark(data_dir: Path, out_dir: Path, trace_memory: bool, config_files: List[str]) -> Dict[str, Any]:
+    """
+    Run MultiQC on a directory once, and return the total run time and the stats of each stage
+    """
+    import multiqc
+    from multiqc.core.update_config import ClConfig
+
+    stages: Dict[str, Dict[str, float]] = {}
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with timed_stages(stages, trace_memory):
+            result = multiqc.run(
+                str(data_dir),
+                cfg=ClConfig(
+                    output_dir=str(out_dir),
+                    force=True,
+                    quiet=True,
+                    no_version_check=True,
+                    config_files=config_files,
+                ),
+            )
+    finally:
+        total = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+    if result.sys_exit_code != 0:
+        raise RuntimeError(f"MultiQC failed: {result.message}")
+
+    run: Dict[str, Any] = {"seconds": total, "stages": stages}
+    if peak is not None:
+        run["peak_memory_bytes"] = peak
+    return run
+
+
+def measure_startup(repeat: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Run each start-up command, keeping the best wall time, the total import time reported by
+    `python -X importtime`, and the slowest top-level imports
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, args in STARTUP_COMMANDS.items():
+        best: Optional[Dict[str, Any]] = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", *args], capture_output=True, text=True, check=True
+            )
+            seconds = time.perf_counter() - start
+            # Lines are "import time: self [us] | cumulative | imported package", indented by depth
+            top_level: Dict[str, int] = {}
+            for line in proc.stderr.splitlines():
+                fields = line.split("|")
+                if not line.startswith("import time:") or len(fields) != 3 or not fields[1].strip().isdigit():
+                    continue
+                module = fields[2].rstrip()
+                if module.startswith(" ") and not module.startswith("  "):
+                    top_level[module.strip()] = int(fields[1])
+            if best is None or seconds < best["seconds"]:
+                slowest = sorted(top_level.items(), key=lambda kv: kv[1], reverse=True)[:5]
+                best = {
+                    "seconds": seconds,
+                    "import_seconds": sum(top_level.values()) / 1e6,
+                    "slowest_imports": {module: us / 1e6 for module, us in slowest},
+                }
+        assert best is not None
+        results[name] = best
+        print(f"Start-up of '{name}': {best['seconds']:.2f}s", file=sys.stderr)
+    return results
+
+
+def _best_of(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine repeated runs, keeping the lowest time and the highest memory of each stage
+    """
+    best: Dict[str, Any] = {"seconds": min(r["seconds"] for r in runs), "stages": {}}
+    if "peak_memory_bytes" in runs[0]:
+        best["peak_memory_bytes"] = max(r["peak_memory_bytes"] for r in runs)
+    for name in runs[0]["stages"]:
+        stage_runs = [r["stages"][name] for r in runs if name in r["stages"]]
+        best["stages"][name] = {"seconds": min(s["seconds"] for s in stage_runs)}
+        if "peak_memory_bytes" in stage_runs[0]:
+            best["stages"][name]["peak_memory_bytes"] = max(s["peak_memory_bytes"] for s in stage_runs)
+    return best
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> int:
+    """
+    Print the change of each stage against a baseline. Returns the number of regressions
+    """
+    regressions = 0
+    if results.get("startup") and baseline.get("startup"):
+        print("\nStart-up")
+        for name, new in results["startup"].items():
+            old = baseline["startup"].get(name)
+            if old is None:
+                continue
+            change = (new["seconds"] - old["seconds"]) / old["seconds"] if old["seconds"] > 0 else 0.0
+            flag = ""
+            if change > REGRESSION_THRESHOLD:
+                flag = "  <-- slower"
+                regressions += 1
+            print(f"  {name:30s} {old['seconds']:9.3f}s -> {new['seconds']:9.3f}s ({change:+.0%}){flag}")
+    for num_samples, run in results["runs"].items():
+        base_run = baseline["runs"].get(num_samples)
+        if base_run is None:
+            continue
+        print(f"\n{num_samples} samples")
+        rows = [("total", run, base_run)] + [
+            (name, stage, base_run["stages"][name])
+            for name, stage in run["stages"].items()
+            if name in base_run["stages"]
+        ]
+        for name, new, old in rows:
+            change = (new["seconds"] - old["seconds"]) / old["seconds"] if old["seconds"] > 0 else 0.0
+            flag = ""
+            if change > REGRESSION_THRESHOLD:
+                flag = "  <-- slower"
+                regressions += 1
+            line = f"  {name:30s} {old['seconds']:9.3f}s -> {new['seconds']:9.3f}s ({change:+.0%}){flag}"
+            if "peak_memory_bytes" in new and "peak_memory_bytes" in old:
+                line += f"  memory {old['peak_memory_bytes'] / 1e6:,.1f}MB -> {new['peak_memory_bytes'] / 1e6:,.1f}MB"
+            print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--samples",
+        type=int,
+        nargs="*",
+        default=[10, 1000, 10000],
+        help="Numbers of samples, none to only measure start-up",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs for each number of samples, keeping the best")
+    parser.add_argument("--startup-repeat", type=int, default=5, help="Runs of each start-up command, keeping the best")
+    parser.add_argument("--output", type=Path, help="JSON file to write the results to")
+    parser.add_argument("--compare", type=Path, help="JSON results of a previous benchmark to compare to")
+    parser.add_argument("--no-memory", action="store_true", help="Don't trace memory, which slows down the run")
+    parser.add_argument("--data-dir", type=Path, help="Keep the generated inputs in this directory to reuse them")
+    parser.add_argument("-c", "--config", action="append", default=[], help="MultiQC config file for the runs")
+    args = parser.parse_args()
+
+    from multiqc import config
+
+    results: Dict[str, Any] = {
+        "multiqc_version": config.version,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "trace_memory": not args.no_memory,
+        "startup": measure_startup(args.startup_repeat),
+        "runs": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_samples in args.samples:
+            data_dir = (args.data_dir or Path(tmp)) / f"samples_{num_samples}"
+            if not (data_dir / "benchmark_bargraph_mqc.tsv").exists():
+                print(f"Generating inputs for {num_samples} samples in {data_dir}", file=sys.stderr)
+                generate_inputs(data_dir, num_samples)
+            runs = []
+            for i in range(args.repeat):
+                print(f"Running MultiQC on {num_samples} samples ({i + 1}/{args.repeat})", file=sys.stderr)
+                runs.append(run_benchmark(data_dir, Path(tmp) / "out", not args.no_memory, args.config))
+            results["runs"][str(num_samples)] = _best_of(runs)
+            print(f"{num_samples} samples: {results['runs'][str(num_samples)]['seconds']:.2f}s", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()))
+        if regressions:
+            print(f"\n{regressions} stages slower by more than {REGRESSION_THRESHOLD:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Test multiqc running in the command line
 import json
 import os
 import subprocess
+import sys
 
 import pytest
 
@@ -101,3 +102,27 @@ def test_no_files_found(tmp_path):
     assert result.returncode == 0
     err = result.stderr.decode()
     assert "No analysis results found" in err
+
+
+@pytest.mark.parametrize(
+    "args", [["-c", "import multiqc"], ["-m", "multiqc", "--version"], ["-m", "multiqc", "--help"]]
+)
+def test_startup_imports(args):
+    """
+    Verify that importing MultiQC and printing the version or help doesn't load the plotting and reporting code
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True, check=True)
+    imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+    heavy = {"numpy", "plotly", "polars", "jsonschema", "requests", "markdown", "multiqc.report", "multiqc.plots"}
+    assert not heavy & imported
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["multiqc.plots.plot", "multiqc.plots.table_object", "multiqc.utils.mqc_colour", "multiqc.core.plot_data_store"],
+)
+def test_import_before_report(module):
+    """
+    Verify that modules imported by the report can be imported on their own, without circular imports
+    """
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
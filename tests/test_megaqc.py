@@ -0,0 +1,118 @@
+"""
+Test uploading data to MegaQC, using a local HTTP server in place of MegaQC
+"""
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+import pytest
+
+from multiqc import config
+from multiqc.utils import megaqc
+
+
+class StandInMegaQC(BaseHTTPRequestHandler):
+    """
+    Responds to each upload with the next status code from `status_codes`, and keeps the uploaded JSON
+    """
+
+    status_codes: List[int] = []
+    uploads: List[Dict[str, Any]] = []
+    headers_seen: List[Dict[str, str]] = []
+
+    def do_POST(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            while size := int(self.rfile.readline().strip(), 16):
+                body += self.rfile.read(size)
+                self.rfile.readline()
+            self.rfile.readline()
+        else:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+        StandInMegaQC.headers_seen.append(dict(self.headers))
+        StandInMegaQC.uploads.append(json.loads(gzip.decompress(body)))
+
+        status = StandInMegaQC.status_codes.pop(0) if StandInMegaQC.status_codes else 200
+        message = "Data upload successful" if status == 200 else "Service unavailable"
+        response = json.dumps({"success": status == 200, "message": message}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture()
+def megaqc_server(monkeypatch):
+    StandInMegaQC.status_codes = []
+    StandInMegaQC.uploads = []
+    StandInMegaQC.headers_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInMegaQC)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(config, "megaqc_url", f"http://127.0.0.1:{server.server_address[1]}/api/upload_data")
+    monkeypatch.setattr(config, "megaqc_access_token", "token")
+    monkeypatch.setattr(megaqc, "RETRY_BACKOFF", 0.0)
+    yield StandInMegaQC
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def data_dump(tmp_path):
+    data = {"report_general_stats_data": [{f"sample{i}": {"reads": i * 1000} for i in range(5000)}]}
+    path = tmp_path / "multiqc_data.json"
+    path.write_text(json.dumps(data, indent=4))
+    return path, data
+
+
+def test_upload_streamed(megaqc_server, data_dump, monkeypatch, caplog):
+    """
+    Verify that the data file is compressed in chunks and sent as a single gzipped JSON body
+    """
+    path, data = data_dump
+    monkeypatch.setattr(config, "megaqc_chunk_size", 1024)
+    with caplog.at_level("INFO"):
+        megaqc.multiqc_api_post(path)
+
+    assert megaqc_server.uploads == [{"data": data}]
+    assert megaqc_server.headers_seen[0]["access_token"] == "token"
+    assert megaqc_server.headers_seen[0]["content-encoding"] == "gzip"
+    assert megaqc_server.headers_seen[0]["Transfer-Encoding"] == "chunked"
+    assert "Data upload successful" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "retries,expected_uploads,expected_message",
+    [(3, 3, "Data upload successful"), (1, 2, "Error - Service unavailable")],
+)
+def test_upload_retried(megaqc_server, data_dump, monkeypatch, caplog, retries, expected_uploads, expected_message):
+    """
+    Verify that uploads getting a "service unavailable" response are sent again, up to `megaqc_retries` times
+    """
+    path, data = data_dump
+    monkeypatch.setattr(config, "megaqc_retries", retries)
+    megaqc_server.status_codes = [503, 502]
+    with caplog.at_level("INFO"):
+        megaqc.multiqc_api_post(path)
+
+    assert megaqc_server.uploads == [{"data": data}] * expected_uploads
+    assert expected_message in caplog.text
+
+
+def test_upload_connection_error(data_dump, monkeypatch, caplog):
+    """
+    Verify that a server that can't be reached is reported after the retries, without raising
+    """
+    path, _ = data_dump
+    monkeypatch.setattr(config, "megaqc_url", "http://127.0.0.1:1/api/upload_data")
+    monkeypatch.setattr(megaqc, "RETRY_BACKOFF", 0.0)
+    megaqc.multiqc_api_post(path)
+
+    assert "Couldn't connect to MegaQC URL" in caplog.text
@@ -6,6 +6,7 @@ import pytest
 
 from multiqc import BaseMultiqcModule, config, parse_logs, report, reset
 from multiqc.base_module import ModuleNoSamplesFound
+from multiqc.core import data_file_writer, tmp_dir
 from multiqc.core.update_config import ClConfig, update_config
 from multiqc.types import SectionKey
 
@@ -76,6 +77,7 @@ def test_write_data_file(monkeypatch, tmp_path, config_options, expected_to_writ
     config.update(config_options)
     module = BaseMultiqcModule()
     module.write_data_file({"Sample": {"key": "value"}}, "multiqc_mymodule")
+    data_file_writer.wait()
 
     expected_path = tmp_path / "multiqc_tmp" / "multiqc_data" / "multiqc_mymodule.txt"
     if expected_to_write:
@@ -206,3 +208,50 @@ def test_path_filters(multiqc_reset, tmp_path, data_dir, anchors, expected_raw_d
     assert set(report.general_stats_data[SectionKey(anchors[1] or "adapterremoval-1")].keys()) == {
         Path(fn).name for fn in expected_pe_files
     }
+
+
+def test_module_workers_same_as_serial(tmp_path):
+    """
+    Test that running modules in worker processes gives the same report as running them serially,
+    including repeated modules
+    """
+    for s_name in ["A", "B"]:
+        (tmp_path / f"{s_name}.flagstat").write_text(
+            "1000 + 0 in total (QC-passed reads + QC-failed reads)\n"
+            "0 + 0 secondary\n"
+            "0 + 0 supplementary\n"
+            "10 + 0 duplicates\n"
+            "950 + 0 mapped (95.00% : N/A)\n"
+        )
+        (tmp_path / f"{s_name}.umitools.log").write_text(
+            f"# output generated by extract -I {s_name}.fastq.gz -S {s_name}.out.fastq.gz\n"
+            "2024-06-05 19:57:52,145 INFO Input Reads: 50000\n"
+            "2024-06-05 19:57:52,145 INFO Reads output: 40000\n"
+        )
+
+    def _run(workers: int):
+        reset()
+        config.module_workers = workers
+        parse_logs(
+            tmp_path,
+            module_order=["umitools", "samtools", {"samtools": {"name": "samtools (again)"}}],
+            preserve_module_raw_data=True,
+        )
+        # Compare representations, as NaN values are not equal to each other
+        return repr(
+            (
+                [(m.anchor, m.name, [s.anchor for s in m.sections]) for m in report.modules],
+                report.general_stats_data,
+                {
+                    mod: {section: dict(sources) for section, sources in s.items()}
+                    for mod, s in report.data_sources.items()
+                },
+                report.saved_raw_data,
+                list(report.plot_by_id),
+                sorted(p.name for p in tmp_dir.data_tmp_dir().iterdir()),
+            )
+        )
+
+    serial = _run(1)
+    assert "samtools (again)" in serial
+    assert _run(3) == serial
@@ -1,8 +1,18 @@
+import base64
+import errno
+import gzip
+import json
 import os
+import zipfile
+from typing import Dict, Union
 
+import polars as pl
 import pytest
 
-from multiqc import report, BaseMultiqcModule, write_report
+from multiqc import config, report, BaseMultiqcModule, write_report
+from multiqc.core import write_results
+from multiqc.plots import linegraph
+from multiqc.types import Anchor, ColumnKey, SectionKey
 
 
 @pytest.fixture()
@@ -23,6 +33,7 @@ def stub_modules():
         ({"make_data_dir": False}, {"multiqc_report.html"}),
         ({"make_report": False}, {"multiqc_data"}),
         ({"make_report": False, "make_data_dir": False}, set()),
+        ({"zip_data_dir": True}, {"multiqc_report.html", "multiqc_data.zip"}),
     ],
 )
 def test_filename(stub_modules, tmp_path, options, expected_files):
@@ -48,3 +59,106 @@ def test_write_stdout(stub_modules, tmp_path, capsys):
 
     files_after = set(os.listdir(tmp_path))
     assert files_before == files_after
+
+
+@pytest.mark.parametrize("in_output", [False, True])
+@pytest.mark.parametrize("rename_fails", [False, True])
+def test_data_dir_moved(stub_modules, tmp_path, monkeypatch, in_output, rename_fails):
+    """
+    Verify that data files are moved to the data directory, falling back to copying when the data tmp dir is
+    on another filesystem, and that no tmp dir is left in the output directory
+    """
+    monkeypatch.setattr(config, "data_tmp_dir_in_output", in_output)
+    if rename_fails:
+
+        def rename(src, dst):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        monkeypatch.setattr(write_results.os, "rename", rename)
+
+    report.write_data_file({"sample": {"x": 1}}, "multiqc_stub")
+    write_report(output_dir=tmp_path, make_report=False)
+
+    assert set(os.listdir(tmp_path)) == {"multiqc_data"}
+    assert "multiqc_stub.txt" in os.listdir(tmp_path / "multiqc_data")
+
+
+def test_zip_data_dir(stub_modules, tmp_path):
+    """
+    Verify that data files are written straight to the zip archive, without a data directory
+    """
+    report.write_data_file({"sample": {"x": 1}}, "multiqc_stub")
+    write_report(output_dir=tmp_path, make_report=False, zip_data_dir=True)
+
+    assert set(os.listdir(tmp_path)) == {"multiqc_data.zip"}
+    with zipfile.ZipFile(tmp_path / "multiqc_data.zip") as zf:
+        assert "multiqc_stub.txt" in zf.namelist()
+
+
+@pytest.mark.parametrize("data_write_workers", [0, 2])
+def test_data_file_written_in_background(stub_modules, tmp_path, monkeypatch, data_write_workers):
+    """
+    Verify that data files keep the data as it was when saved, even if the module changes it afterwards
+    """
+    monkeypatch.setattr(config, "data_write_workers", data_write_workers)
+    data: Dict[str, Dict[str, Union[int, float, str]]] = {f"sample{i}": {"x": i, "y": i / 3} for i in range(1000)}
+    report.write_data_file(data, "multiqc_stub")
+    report.write_data_file(data, "multiqc_stub_json", data_format="json")
+    data["sample0"]["x"] = "changed"
+    write_report(output_dir=tmp_path, make_report=False)
+
+    lines = (tmp_path / "multiqc_data" / "multiqc_stub.txt").read_text().splitlines()
+    assert lines[:2] == ["Sample\tx\ty", "sample0\t0\t0.0"]
+    assert len(lines) == 1001
+    assert json.loads((tmp_path / "multiqc_data" / "multiqc_stub_json.json").read_text())["sample0"]["x"] == 0
+
+
+@pytest.mark.parametrize("data_format", ["parquet", "arrow"])
+def test_data_file_columnar(stub_modules, tmp_path, data_format):
+    """
+    Verify that tables are saved as parquet/arrow files with their column types, and other data as YAML
+    """
+    report.write_data_file({"b": {"x": 2, "y": "two"}, "a": {"x": 1}}, "multiqc_stub", data_format=data_format)
+    report.write_data_file({"a": [1, 2]}, "multiqc_stub_list", data_format=data_format)
+    write_report(output_dir=tmp_path, make_report=False)
+
+    path = tmp_path / "multiqc_data" / f"multiqc_stub.{data_format}"
+    df = pl.read_parquet(path) if data_format == "parquet" else pl.read_ipc(path)
+    assert df.to_dicts() == [{"Sample": "a", "x": 1, "y": None}, {"Sample": "b", "x": 2, "y": "two"}]
+    assert df.schema["x"] == pl.Int64
+    assert (tmp_path / "multiqc_data" / "multiqc_stub_list.yaml").exists()
+
+
+def test_data_dump_file(stub_modules, tmp_path, capsys):
+    """
+    Verify that data keys that can't be encoded are left out of the JSON dump, with a warning
+    """
+    report.plot_data = {Anchor("plot"): {"values": [1.5, float("nan")], "unknown": object()}}
+    report.general_stats_headers = {SectionKey("section"): {ColumnKey("col"): {"title": "Col", "max": float("nan")}}}
+    write_report(output_dir=tmp_path, make_report=False)
+
+    dump = json.loads((tmp_path / "multiqc_data" / "multiqc_data.json").read_text())
+    assert "report_plot_data" not in dump
+    assert dump["report_general_stats_headers"] == {"section": {"col": {"title": "Col", "max": None}}}
+    assert "config_analysis_dir_abs" in dump
+    assert "Couldn't export data key 'report.plot_data'" in capsys.readouterr().err
+
+
+def test_plot_data_streamed_into_report(stub_modules, tmp_path):
+    """
+    Verify that the compressed plot data is written into the report in place of its placeholder
+    """
+    plot = linegraph.plot(
+        {"Sample1": {0: 1, 1: 2}}, linegraph.LinePlotConfig(id="streamed_linegraph", title="Test: Line Graph")
+    )
+    assert isinstance(plot, linegraph.LinePlot)
+    plot.add_to_report(module_anchor=Anchor("test"), section_anchor=Anchor("test"))
+    write_report(output_dir=tmp_path, make_data_dir=False)
+
+    html = (tmp_path / "multiqc_report.html").read_text()
+    assert write_results._PLOT_DATA_PLACEHOLDER not in html
+    embedded = html.split('id="mqc_compressed_plotdata">')[1].split("</script>")[0]
+    compressed = json.loads(embedded)
+    assert list(compressed) == [plot.anchor]
+    dump = json.loads(gzip.decompress(base64.b64decode(compressed[plot.anchor])))
+    assert dump["datasets"][0]["lines"][0]["pairs"] == [[0, 1], [1, 2]]
@@ -1,15 +1,32 @@
+import array
+import base64
+import gzip
+import json
+import multiprocessing
 import sys
 import tempfile
-from typing import Dict
+import time
+from typing import Dict, Union
 from unittest.mock import patch
 
+import numpy as np
+import plotly.graph_objects as go  # type: ignore
 import pytest
+from PIL import Image
 
 from multiqc import config, report
 from multiqc.core.exceptions import RunError
 from multiqc.plots import bargraph, box, heatmap, linegraph, scatter, table, violin
-from multiqc.plots.linegraph import LinePlotConfig, Series
-from multiqc.plots.plot import Plot, process_batch_exports
+from multiqc.plots.linegraph import LinePlot, LinePlotConfig, Series
+from multiqc.plots.plot import (
+    ExportWorkerPool,
+    Plot,
+    _export_map,
+    close_image_cache,
+    get_image_cache,
+    process_batch_exports,
+    shutdown_export_pool,
+)
 from multiqc.plots.table_object import ColumnDict
 from multiqc.types import Anchor
 from multiqc.validation import ModuleConfigValidationError
@@ -82,6 +99,26 @@ def test_violin():
     )
 
 
+def test_violin_outliers():
+    config.violin_min_threshold_outliers = 10
+    data: Dict[str, Dict[str, Union[float, str]]] = {f"sample{i}": {"x": 1.0 + i % 2, "y": i % 3} for i in range(50)}
+    data["sample50"] = {"x": 100.0, "y": "NA", "z": "text"}
+    plot = _verify_rendered(violin.plot(data=data, pconfig=table.TableConfig(id="violin_outliers", title="Violin")))
+
+    ds = plot.datasets[0]
+    assert list(ds.scatter_value_by_sample_by_metric.values())[0] == {"sample50": 100.0}
+    assert len(list(ds.violin_value_by_sample_by_metric.values())[0]) == 51
+    assert list(ds.scatter_value_by_sample_by_metric.values())[2] == {}
+
+    matrix = np.array([[1.0, 5.0], [1.1, np.nan], [0.9, 5.0], [10.0, 5.0]])
+    outliers = violin.find_outliers_in_columns(matrix, minvals=[None, 0], maxvals=[None, None])
+    for col_idx, minval in enumerate([None, 0]):
+        idxs = np.flatnonzero(~np.isnan(matrix[:, col_idx]))
+        expected = np.zeros(len(matrix), dtype=bool)
+        expected[idxs] = violin.find_outliers(matrix[idxs, col_idx].tolist(), minval=minval)
+        assert np.array_equal(outliers[:, col_idx], expected)
+
+
 def test_heatmap():
     _verify_rendered(
         heatmap.plot(
@@ -324,6 +361,45 @@ def test_linegraph_smooth():
         assert min(len(in_series), SMOOTH_TO) == len(out_series["pairs"])
 
 
+@pytest.mark.parametrize("method", ["minmax", "lttb", "first"])
+def test_linegraph_smooth_method(method):
+    SMOOTH_TO = 50
+    ys = [1] * 1000
+    ys[567] = 100
+    plot = _verify_rendered(
+        linegraph.plot(
+            {"Sample1": dict(enumerate(ys))},
+            {
+                "id": "test_linegraph_smooth_method",
+                "title": "Test: Line Graph",
+                "smooth_points": SMOOTH_TO,
+                "smooth_method": method,
+            },
+        )
+    )
+
+    pairs = report.plot_data[plot.anchor]["datasets"][0]["lines"][0]["pairs"]
+    assert len(pairs) <= SMOOTH_TO
+    assert tuple(pairs[0]) == (0, 1) and tuple(pairs[-1]) == (999, 1)
+    assert ((567, 100) in [tuple(p) for p in pairs]) == (method != "first")
+
+
+def test_linegraph_webgl():
+    config.plots_webgl_numpoints = 100
+    config.plots_flat_numseries = 2
+    data = {f"Sample{i}": {x: x for x in range(50)} for i in range(3)}
+
+    plot = _verify_rendered(linegraph.plot(data, {"id": "test_linegraph_webgl", "title": "Test: Line Graph"}))
+    assert plot.webgl and not plot.flat
+    assert report.plot_data[plot.anchor]["webgl"] is True
+    assert all(trace.type == "scattergl" for trace in plot.get_figure(0).data)
+
+    config.plots_webgl_flat_numseries = 2
+    flat_plot = linegraph.plot(data, {"id": "test_linegraph_webgl_flat", "title": "Test: Line Graph"})
+    assert isinstance(flat_plot, LinePlot)
+    assert flat_plot.flat
+
+
 def test_linegraph_multiple_datasets():
     plot = _verify_rendered(
         linegraph.plot(
@@ -392,6 +468,72 @@ def test_flat_plot(tmp_path, monkeypatch, development, export_plot_formats, expo
             assert (tmp_path / f"multiqc_plots/{fmt}/{plot_id}.{fmt}").stat().st_size > 0
 
 
+def _fake_write_image(fig, file, **kwargs):
+    """Write a blank PNG instead of running Kaleido, or freeze for figures titled "hang" """
+    if fig.layout.title.text == "hang":
+        time.sleep(60)
+    Image.new("RGB", (int(kwargs["width"]), int(kwargs["height"])), "white").save(file, format="PNG")
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="Workers need to inherit the patch")
+def test_export_worker_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(go.Figure, "write_image", _fake_write_image)
+
+    write_kwargs = {"width": 100, "height": 50}
+    figs = [go.Figure(layout={"title": title}) for title in ["a", "hang", "b", "c"]]
+    tasks = [(fig, tmp_path / f"{i}.png", write_kwargs) for i, fig in enumerate(figs)]
+    tasks.append((figs[0], None, write_kwargs))
+
+    pool = ExportWorkerPool(2)
+    try:
+        results = pool.map(tasks, timeout=10)
+        # The frozen worker is replaced, and the pool can be used again
+        assert pool.map(tasks[:1], timeout=30)[0].ok
+    finally:
+        pool.shutdown()
+
+    assert [result.ok for result in results] == [True, False, True, True, True]
+    assert results[1].timed_out
+    assert not (tmp_path / "1.png").exists()
+    assert all((tmp_path / f"{i}.png").stat().st_size > 0 for i in [0, 2, 3])
+    assert results[4].png is not None and results[4].png.startswith(b"\x89PNG")
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="Workers need to inherit the patch")
+def test_export_image_cache(tmp_path, monkeypatch, reset):
+    monkeypatch.setattr(go.Figure, "write_image", _fake_write_image)
+    config.export_plots_cache = True
+    config.export_plots_cache_dir = str(tmp_path / "cache")
+
+    def _export(title):
+        write_kwargs = {"width": 100, "height": 50}
+        fig = go.Figure(layout={"title": title})
+        results = _export_map([(fig, tmp_path / "out.png", write_kwargs), (fig, None, write_kwargs)], timeout=30)
+        image_cache = get_image_cache()
+        assert image_cache is not None
+        hits = image_cache.hits
+        shutdown_export_pool()
+        close_image_cache()
+        return results, hits
+
+    results, hits = _export("a")
+    assert hits == 0 and all(result.ok for result in results)
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+    (tmp_path / "out.png").unlink()
+    cached_results, hits = _export("a")
+    assert hits == 2
+    assert cached_results[1].png == results[1].png
+    assert (tmp_path / "out.png").stat().st_size > 0
+
+    _, hits = _export("b")
+    assert hits == 0
+
+    config.export_plots_cache_size = 0
+    _export("b")
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
 def test_missing_pconfig(reset):
     from multiqc import config
 
@@ -621,3 +763,164 @@ def test_table_default_sort():
     assert isinstance(p, Plot)
     sort_string = _get_sortlist_js(p.datasets[0].dt)
     assert sort_string == "[[2, 1], [1, 0]]"
+
+
+def test_table_virtual_scroll(monkeypatch):
+    """
+    Tables with more rows than `table_virtual_scroll_rows` embed their rows as data instead of HTML
+    """
+    from multiqc.plots.table_object import render_html
+
+    monkeypatch.setattr(config, "table_virtual_scroll_rows", 2)
+    headers: Dict[str, ColumnDict] = {"x": {"title": "Metric X", "suffix": "%"}, "y": {"title": "Metric Y"}}
+    p = table.plot(
+        data={f"sample{i}": {"x": i, "y": "yes" if i % 2 else "no"} for i in range(3)},
+        headers=headers,
+        pconfig=table.TableConfig(id="table", title="Table"),
+    )
+    assert isinstance(p, Plot)
+    html, _ = render_html(
+        p.datasets[0].dt, violin_anchor=Anchor("v"), module_anchor=Anchor("m"), section_anchor=Anchor("s")
+    )
+
+    assert "mqc_virtual_table" in html
+    assert "<tbody></tbody>" in html
+    compressed = html.split('class="mqc_virtual_table_data"')[1].split(">")[1].split("</script")[0]
+    data = json.loads(gzip.decompress(base64.b64decode(compressed)))
+    assert data["rows"] == [["sample0", "sample0"], ["sample1", "sample1"], ["sample2", "sample2"]]
+    assert data["columns"]["x"]["val"] == [0, 1, 2]
+    assert data["columns"]["x"]["html"][1] == "1<span class='mqc_small_space'></span>%"
+    assert data["columns"]["x"]["bar"] == [0.0, 50.0, 100.0]
+    assert data["columns"]["x"]["scale"]["max"] == 2.0
+    assert data["columns"]["y"]["val"] == ["no", "yes", "no"]
+
+    monkeypatch.setattr(config, "table_virtual_scroll_rows", 3)
+    html, _ = render_html(
+        p.datasets[0].dt, violin_anchor=Anchor("v"), module_anchor=Anchor("m"), section_anchor=Anchor("s")
+    )
+    assert "mqc_virtual_table" not in html
+    assert html.count("<tr data-sample-group=") == 3
+
+
+@pytest.mark.parametrize("scale", ["GnBu", "RdYlGn-rev", "Greys", "Set1", "red"])
+@pytest.mark.parametrize("lighten", [0, 0.3, 1])
+def test_colour_scale_column(scale, lighten):
+    """
+    Colours computed for a whole column match the colours of each value
+    """
+    from multiqc.utils.mqc_colour import mqc_colour_scale
+
+    c_scale = mqc_colour_scale(scale, minval=-5, maxval=50)
+    vals = [None, -10, -5, 0, 1, 12.5, 49.99, 50, 1e20, float("inf"), float("nan"), "25%", "", "abc", True, 3]
+    assert c_scale.get_colours_for_values(vals, lighten=lighten) == [
+        c_scale.get_colour(val, lighten=lighten) for val in vals
+    ]
+
+
+@pytest.mark.parametrize("method", ["single", "complete", "average", "weighted"])
+def test_heatmap_clustering_linkage(method):
+    """
+    Test that the linkage merges the same clusters as repeatedly merging the closest pair
+    of clusters, with the lowest indices on ties
+    """
+    import numpy as np
+
+    from multiqc.utils.util_functions import scipy_hierarchy_leaves_list, scipy_hierarchy_linkage, scipy_pdist
+
+    def _reference_linkage(X):
+        dist = {(i, j): np.sqrt(np.sum((X[i] - X[j]) ** 2)) for i in range(len(X)) for j in range(i + 1, len(X))}
+        sizes = {i: 1 for i in range(len(X))}
+        rows = []
+        for new in range(len(X), 2 * len(X) - 1):
+            (c1, c2), d = min(dist.items(), key=lambda item: (item[1], item[0]))
+            s1, s2 = sizes.pop(c1), sizes.pop(c2)
+            rows.append([c1, c2, d, s1 + s2])
+            for c in sizes:
+                d1, d2 = dist[(min(c, c1), max(c, c1))], dist[(min(c, c2), max(c, c2))]
+                if method == "single":
+                    dist[(c, new)] = min(d1, d2)
+                elif method == "complete":
+                    dist[(c, new)] = max(d1, d2)
+                elif method == "average":
+                    dist[(c, new)] = (d1 * s1 + d2 * s2) / (s1 + s2)
+                else:
+                    dist[(c, new)] = (d1 + d2) / 2
+            sizes[new] = s1 + s2
+            dist = {k: v for k, v in dist.items() if c1 not in k and c2 not in k}
+        return np.array(rows)
+
+    rng = np.random.default_rng(0)
+    # Small integer values give many ties between distances
+    for X in [rng.normal(size=(40, 5)), rng.integers(0, 3, size=(40, 3)).astype(float)]:
+        linkage = scipy_hierarchy_linkage(scipy_pdist(X), method=method)
+        expected = _reference_linkage(X)
+        assert np.array_equal(linkage, expected)
+        assert sorted(scipy_hierarchy_leaves_list(linkage)) == list(range(len(X)))
+
+
+def test_plot_data_compressed_per_plot():
+    """
+    Each plot is compressed separately, so the report can decompress only the plots that are viewed
+    """
+    for i in range(3):
+        plot = linegraph.plot(
+            {"Sample1": {0: i, 1: i}},
+            linegraph.LinePlotConfig(id=f"compressed_linegraph_{i}", title="Test: Line Graph"),
+        )
+        assert isinstance(plot, LinePlot)
+        plot.add_to_report(module_anchor=Anchor("test"), section_anchor=Anchor("test"))
+
+    compressed = json.loads(report.compress_plot_data(report.plot_data))
+
+    assert list(compressed.keys()) == list(report.plot_data.keys())
+    for anchor, chunk in compressed.items():
+        dump = json.loads(gzip.decompress(base64.b64decode(chunk)))
+        assert dump["anchor"] == anchor
+        pairs = report.plot_data[anchor]["datasets"][0]["lines"][0]["pairs"]
+        assert dump["datasets"][0]["lines"][0]["pairs"] == [list(pair) for pair in pairs]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_dump_json(monkeypatch, use_orjson, indent):
+    """
+    NaNs and the types that JSON doesn't know about are encoded without changing the data
+    """
+    from pydantic import BaseModel
+
+    from multiqc.utils import util_functions
+
+    class Model(BaseModel):
+        x: int = 1
+
+    if not use_orjson:
+        monkeypatch.setattr(util_functions, "_orjson", lambda: None)
+    data = {
+        "floats": [1.5, float("nan"), float("inf"), -float("inf"), 1e-05, np.float64(2.5)],
+        "array": array.array("d", [1.0, float("nan")]),
+        "ndarray": np.array([[1.0, np.nan], [3.0, 4.0]]),
+        "numpy scalars": [np.int64(3), np.bool_(True), np.float32(0.5)],
+        "set": {3},
+        "model": Model(),
+        "lambda": lambda x: x,
+        1: "int key",
+        "text": "µm ≥ 5",
+    }
+    dumped = util_functions.dump_json(data, indent=indent, ensure_ascii=False)
+
+    assert json.loads(dumped) == {
+        "floats": [1.5, None, None, None, 1e-05, 2.5],
+        "array": [1.0, None],
+        "ndarray": [[1.0, None], [3.0, 4.0]],
+        "numpy scalars": [3, True, 0.5],
+        "set": [3],
+        "model": '{"x":1}',
+        "lambda": None,
+        "1": "int key",
+        "text": "µm ≥ 5",
+    }
+    assert np.isnan(data["floats"][1])  # type: ignore
+    assert util_functions.dump_json({"text": "µm"}).isascii()
+    assert json.loads(util_functions.dump_json({"big int": 2**70})) == {"big int": 2**70}
+    if indent:
+        assert dumped.startswith('{\n    "floats": [\n        1.5,\n        null,')
@@ -9,7 +9,8 @@ from multiqc.core.update_config import ClConfig
 from multiqc.plots.bargraph import BarPlotConfig, BarPlotInputData, CatConf
 from multiqc.plots.linegraph import LinePlotConfig, LinePlotNormalizedInputData, Series
 from multiqc.plots.plot import PlotType, plot_anchor
-from multiqc.types import SampleName
+from multiqc.plots.table_object import DataTable, InputRow, TableConfig, TableSection
+from multiqc.types import Anchor, ColumnKey, SampleGroup, SampleName, SectionKey
 
 
 def test_rerun_parquet(data_dir, tmp_path):
@@ -272,3 +273,81 @@ def test_merge_bargraph():
     sample3_cat3 = merged_df.filter((pl.col("sample") == "Sample3") & (pl.col("category") == "Cat3"))
     assert sample3_cat3.height == 1
     assert float(sample3_cat3.select("bar_value").item()) == 45.0
+
+
+def test_merge_table():
+    """Test merging two data tables.
+    Values of the existing samples are overwritten, new samples and columns are added,
+    and the rows of each sample group are kept together.
+    """
+
+    def _create(data):
+        return DataTable.create(
+            data={SectionKey("section"): data},
+            table_id="test_table_merge",
+            table_anchor=Anchor("test_table_merge"),
+            pconfig=TableConfig(id="test_table_merge", title="Test Table Merge"),
+            headers={},
+        )
+
+    dt = _create(
+        {
+            "Group1": [InputRow(sample=SampleName("Sample1"), data={"A": 1, "B": 2})],
+            "Group2": [InputRow(sample=SampleName("Sample2"), data={"A": 3, "B": 4})],
+        }
+    )
+    dt.merge(
+        _create(
+            {
+                "Group1": [
+                    InputRow(sample=SampleName("Sample1"), data={"A": 10, "C": "x"}),
+                    InputRow(sample=SampleName("Sample1_R2"), data={"A": 5}),
+                ],
+            }
+        )
+    )
+
+    section = dt.section_by_id[SectionKey("section")]
+    assert [(row.group, row.sample) for row in section.rows] == [
+        ("Group1", "Sample1"),
+        ("Group1", "Sample1_R2"),
+        ("Group2", "Sample2"),
+    ]
+    assert section.values_by_key[ColumnKey("A")].raw == [10, 5, 3]
+    assert section.values_by_key[ColumnKey("B")].raw == [2, None, 4]
+    assert section.values_by_key[ColumnKey("C")].fmt == ["x", None, None]
+    assert section.column_by_key[ColumnKey("A")].dmax == 10
+
+    # Sections dumped by previous versions are converted on load
+    loaded = TableSection(
+        **{
+            **section.model_dump(exclude={"rows", "values_by_key"}),
+            "rows_by_sgroup": {
+                group: [row.model_dump() for row in rows] for group, rows in section.rows_by_sgroup.items()
+            },
+        }
+    )
+    assert loaded.rows == section.rows
+    assert loaded.values_by_key == section.values_by_key
+    assert loaded.rows_by_sgroup[SampleGroup("Group1")][1].sample == SampleName("Sample1_R2")
+
+
+def test_parquet_written_once_at_write_results(tmp_path):
+    """Test that plot data is buffered in memory while modules run, and the parquet file
+    is written once with all plots when the results are written.
+    """
+    from multiqc.core import tmp_dir
+
+    for plot_id in ["bar_one", "bar_two"]:
+        (tmp_path / f"{plot_id}_mqc.tsv").write_text(
+            f"# plot_type: 'bargraph'\n# id: '{plot_id}'\nSample\tA\tB\nS1\t1\t2\nS2\t3\t4\n"
+        )
+
+    multiqc.parse_logs(tmp_path, strict=True)
+    assert not tmp_dir.parquet_file().exists()
+
+    multiqc.write_report(output_dir=str(tmp_path / "out"))
+    df = pl.read_parquet(tmp_path / "out" / "multiqc_data" / "BETA-multiqc.parquet")
+    assert df.filter(pl.col("type") == "run_metadata").height == 1
+    plot_anchors = set(df.filter(pl.col("type") == "plot_input").get_column("anchor").to_list())
+    assert {"bar_one-section-plot", "bar_two-section-plot"} <= plot_anchors
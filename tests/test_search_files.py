@@ -2,8 +2,9 @@
 Tests for discovering and excluding files
 """
 
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, Set, Union
+from typing import Any, Dict, List, Set, Union
 
 import pytest
 import yaml
@@ -12,6 +13,7 @@ from importlib_metadata import EntryPoint
 from multiqc import config, report
 from multiqc.core.exceptions import RunError
 from multiqc.core.file_search import file_search
+from multiqc.types import ModuleId
 
 
 def _test_search_files(
@@ -211,3 +213,250 @@ tool2:
             "tool2": {tool2.name},
         },
     )
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_search_matches_serial(tmp_path, executor):
+    """
+    Test that searching with a pool of workers finds the same files in the same order
+    and collects the same stats as the serial search
+    """
+    for i in range(50):
+        (tmp_path / f"sample{i}_tool1.txt").write_text("tool1 output\n")
+        (tmp_path / f"sample{i}.log").write_text(f"metric: {i}\ntool2_header\n")
+        (tmp_path / f"sample{i}.other").write_text("nothing to see\n")
+
+    config.sp = {
+        "tool1": {"fn": "*_tool1.txt"},
+        "tool2": {"contents": "tool2_header", "num_lines": 5},
+    }
+    config.run_modules = list(config.sp.keys())
+    config.avail_modules = {k: EntryPoint(k, k, k) for k in config.run_modules}
+    config.analysis_dir = [str(tmp_path)]
+
+    file_search()
+    serial_files = report.files
+    serial_stats = report.file_search_stats
+
+    report.reset_file_search()
+    config.filesearch_workers = 4
+    config.filesearch_executor = executor
+    file_search()
+
+    assert report.files == serial_files
+    assert report.file_search_stats == serial_stats
+    assert len(report.files[ModuleId("tool1")]) == 50
+    assert len(report.file_search_stats["skipped_no_match"]) == 50
+
+
+def test_filename_matcher_same_as_fnmatch():
+    """
+    Test that the compiled file name matcher finds the same candidate patterns as
+    matching each `fn` and `fn_re` of the default search patterns one by one
+    """
+    import fnmatch
+    import re
+
+    from multiqc.core.search_matchers import FilenameMatcher
+
+    spatterns, _ = report.prep_ordered_search_files_list([ModuleId(k.split("/")[0]) for k in config.sp])
+    matcher = FilenameMatcher(spatterns, config.fn_ignore_files)
+
+    # File names built from the globs themselves, plus a few that shouldn't match anything specific
+    filenames = {"README.md", "sample.txt", "x", ".DS_Store", "sample_mqc.html", "summary.html", "a.html"}
+    for patterns in spatterns:
+        for sps in patterns.values():
+            for sp in sps:
+                if sp.fn:
+                    name = re.sub(r"\[!?(.)[^]]*]", r"\1", sp.fn).replace("?", "x")
+                    filenames |= {name.replace("*", ""), name.replace("*", "sample_1"), "pre_" + name}
+
+    for fn in sorted(filenames):
+        expected: Dict[str, Set[int]] = {}
+        for patterns in spatterns:
+            for module_id, sps in patterns.items():
+                for i, sp in enumerate(sps):
+                    if sp.fn is not None and not fnmatch.fnmatch(fn, sp.fn):
+                        continue
+                    if sp.fn_re is not None and not re.match(sp.fn_re, fn):
+                        continue
+                    expected.setdefault(module_id, set()).add(i)
+        assert matcher.match(fn) == expected, fn
+        assert matcher.is_ignored(fn) == any(fnmatch.fnmatch(fn, p) for p in config.fn_ignore_files), fn
+
+
+def test_content_matcher_same_as_search_file(tmp_path):
+    """
+    Test that scanning file contents once for all patterns gives the same matches as
+    searching the file separately for each pattern, including at the `num_lines` limit
+    """
+    from multiqc.core.search_matchers import ContentMatcher
+
+    filler = "".join(f"filler line {i}\n" for i in range(1000))
+    contents = {
+        "first_line.txt": "needle in line 1\n" + filler,
+        "line_3.txt": "a\nb\nneedle here\tFOUND 42\n" + filler,
+        "line_4.txt": "a\nb\nc\nneedle here\tFOUND 42\n" + filler,
+        "second_block.txt": filler + "needle again\nFOUND 43\n",
+        "both.txt": "tool: thing\nversion 1.2\n" + filler,
+        "no_newline.txt": "needle",
+        "empty.txt": "",
+    }
+    sp_dicts: List[Dict[str, Any]] = [
+        {"contents": "needle"},
+        {"contents": "needle", "num_lines": 3},
+        {"contents": ["needle", "FOUND"], "num_lines": 3},
+        {"contents_re": r"^needle.*\tFOUND \d+$", "num_lines": 3},
+        {"contents_re": [r"^tool: \w+", r"version [\d.]+"]},
+        {"contents_re": r"FOUND 4[0-9]", "num_lines": 5},
+        {"contents_re": r".*FOUND 43", "num_lines": 1002},
+        {"contents": "filler line 999", "num_lines": 1000},
+        {"contents": "filler line 999", "num_lines": 999},
+        {"contents": "needle", "contents_re": r"version"},
+    ]
+    spatterns: List[Dict[ModuleId, List[report.SearchPattern]]] = []
+    for i, d in enumerate(sp_dicts):
+        sp = report.SearchPattern.parse(d, f"mod_{i}")
+        assert sp is not None
+        spatterns.append({ModuleId(f"mod_{i}"): [sp]})
+    matcher = ContentMatcher(spatterns, config.filesearch_lines_limit)
+
+    for fn, text in contents.items():
+        path = tmp_path / fn
+        path.write_text(text)
+        expected = {}
+        for patterns in spatterns:
+            for module_id, (sp,) in patterns.items():
+                with report.SearchFile(path) as f:
+                    expected[module_id] = report.search_file(sp, f, module_id, stats=defaultdict(set))
+
+        with report.SearchFile(path) as f:
+            scan = matcher.scan(f)
+            found = {}
+            for patterns in spatterns:
+                for module_id, (sp,) in patterns.items():
+                    found[module_id] = report.search_file(sp, f, module_id, stats=defaultdict(set), content_scan=scan)
+        assert found == expected, fn
+
+
+def test_search_cache(tmp_path, monkeypatch):
+    """
+    Test that the search results of unchanged files are reused from the cache, and that
+    modified files and changed search patterns are searched again
+    """
+    analysis_dir = tmp_path / "analysis"
+    analysis_dir.mkdir()
+    for i in range(5):
+        (analysis_dir / f"sample{i}_tool1.txt").write_text("tool1 output\n")
+        (analysis_dir / f"sample{i}.log").write_text("tool2_header\n")
+    (analysis_dir / "other.txt").write_text("nothing to see\n")
+
+    sp = {"tool1": {"fn": "*_tool1.txt"}, "tool2": {"contents": "tool2_header"}}
+    searched = []
+    search_file_against_patterns = report.search_file_against_patterns
+
+    def _search(path, *args, **kwargs):
+        searched.append(path.name)
+        return search_file_against_patterns(path, *args, **kwargs)
+
+    monkeypatch.setattr(report, "search_file_against_patterns", _search)
+
+    def _run():
+        report.reset_file_search()
+        searched.clear()
+        config.sp = sp
+        config.run_modules = list(config.sp.keys())
+        config.avail_modules = {k: EntryPoint(k, k, k) for k in config.run_modules}
+        config.analysis_dir = [str(analysis_dir)]
+        config.filesearch_cache = True
+        config.filesearch_cache_dir = str(tmp_path / "cache")
+        file_search()
+        return report.files, report.file_search_stats
+
+    files, stats = _run()
+    assert len(searched) == 11
+
+    assert _run() == (files, stats)
+    assert searched == []
+
+    (analysis_dir / "other.txt").write_text("now with tool2_header\n")
+    (analysis_dir / "new.log").write_text("tool2_header\n")
+    files, stats = _run()
+    assert sorted(searched) == ["new.log", "other.txt"]
+    assert {f["fn"] for f in files["tool2"]} == {f"sample{i}.log" for i in range(5)} | {"new.log", "other.txt"}
+
+    sp = {"tool1": {"fn": "*_tool1.txt"}}
+    _run()
+    assert len(searched) == 12
+
+
+def test_find_log_files_reuses_search_contents(tmp_path):
+    """
+    Test that modules get the contents of small files read during the search from memory,
+    and that files over the memory budget are read from disk again
+    """
+    from multiqc.base_module import BaseMultiqcModule
+
+    small = tmp_path / "small.log"
+    small.write_text("tool1_header\nsmall: 1\r\nno newline at the end")
+    large = tmp_path / "large.log"
+    large.write_text("tool1_header\n" + "large: 2\n" * 100)
+
+    config.sp = {"tool1": {"contents": "tool1_header"}}
+    config.run_modules = list(config.sp.keys())
+    config.avail_modules = {k: EntryPoint(k, k, k) for k in config.run_modules}
+    config.analysis_dir = [str(tmp_path)]
+    config.filesearch_contents_cache_size = 200
+    file_search()
+    assert len(report.file_contents_cache) == 1
+
+    expected = {f.name: f.read_text() for f in [small, large]}
+    small.unlink()
+    large.write_text("changed on disk")
+    expected["large.log"] = "changed on disk"
+
+    found = {f["fn"]: f["f"] for f in BaseMultiqcModule().find_log_files("tool1")}
+    assert found == expected
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_walk_analysis_paths(tmp_path, workers):
+    """
+    Test that the directory walk finds files in the same depth-first order as recursing
+    with `Path.iterdir()`, skipping ignored directories and symlinks
+    """
+    for d in ["a/b/c", "a/d", "e", "a/skip_me/f", "g/work"]:
+        (tmp_path / d).mkdir(parents=True)
+        for i in range(3):
+            (tmp_path / d / f"file{i}.txt").write_text(d)
+    (tmp_path / "top.txt").write_text("top")
+    (tmp_path / "link.txt").symlink_to(tmp_path / "top.txt")
+    (tmp_path / "linked_dir").symlink_to(tmp_path / "e")
+
+    config.fn_ignore_dirs = ["skip_me"]
+    config.fn_ignore_paths = ["*/g/work"]
+    config.filesearch_workers = workers
+
+    def _expected_files(item: Path, ignore_symlinks: bool) -> List[Path]:
+        if item.is_symlink() and ignore_symlinks:
+            return []
+        if item.is_file():
+            return [item]
+        if item.name in ["skip_me", "work"]:
+            return []
+        return [f for child in item.iterdir() for f in _expected_files(child, ignore_symlinks)]
+
+    for ignore_symlinks in [False, True]:
+        report.reset_file_search()
+        config.ignore_symlinks = ignore_symlinks
+        searchfiles = report.walk_analysis_paths([tmp_path])
+        assert searchfiles == _expected_files(tmp_path, ignore_symlinks)
+        assert set(report.searchfile_stats) == {str(f) for f in searchfiles}
+        assert report.searchfile_stats[str(tmp_path / "top.txt")][0] == 3
+        assert report.file_search_stats["skipped_directory_fn_ignore_dirs"] == {
+            tmp_path / "a" / "skip_me",
+            tmp_path / "g" / "work",
+        }
+        assert report.file_search_stats["skipped_symlinks"] == (
+            {tmp_path / "link.txt", tmp_path / "linked_dir"} if ignore_symlinks else set()
+        )